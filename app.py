@@ -7,24 +7,54 @@ import sys
 import json
 import uuid
 import time
-from datetime import datetime
+import threading
+import mimetypes
+from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import quote
 from werkzeug.utils import secure_filename
-from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.security import safe_join
+from werkzeug.exceptions import ClientDisconnected, RequestEntityTooLarge
 
-from flask import Flask, request, jsonify, render_template, send_file, flash, redirect, url_for
+from flask import Flask, Request, Response, request, jsonify, render_template, send_file, flash, redirect, url_for, stream_with_context
 from flask_cors import CORS
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.video_processor import VideoProcessor
-from src.youtube_uploader import YouTubeUploader
-from src.json_storage import JsonStorageHandler
-from config import VIDEO_CONFIG, YOUTUBE_CONFIG, setup_directories
+from src.youtube_client import get_shared_uploader
+from src.storage import get_storage_handler
+from src.exporter import EXPORT_FORMATS, CONTENT_TYPES, iter_export
+from src.job_archive import JobArchive
+from src.job_pools import StagePool
+from src.upload_ingest import IngestFile, IngestRejected, commit_upload
+from src.file_index import OutputFileIndex
+from src.resumable_uploads import ResumableUploadStore, UploadSessionError, UploadSessionNotFound
+from config import VIDEO_CONFIG, YOUTUBE_CONFIG, DATA_CONFIG, JOB_CONFIG, RESUMABLE_CONFIG, DOWNLOAD_CONFIG, setup_directories
+
+class IngestRequest(Request):
+    """Request that streams uploaded files straight into the input folder"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = IngestFile(
+            VIDEO_CONFIG['input_folder'],
+            filename=filename,
+            chunk_size=VIDEO_CONFIG['ingest_chunk_size']
+        )
+        self.__dict__.setdefault('_ingest_files', []).append(stream)
+        return stream
+    
+    def close(self):
+        super().close()
+        # Remove any .part files the view did not commit
+        for stream in self.__dict__.get('_ingest_files', []):
+            stream.discard()
+
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = IngestRequest
 app.secret_key = 'video80s_secret_key_change_in_production'
 app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024 * 1024  # 1GB limit
 
@@ -37,6 +67,50 @@ setup_directories()
 # Global variables for tracking jobs
 processing_jobs = {}
 upload_jobs = {}
+jobs_lock = threading.Lock()
+
+# Finished jobs are moved here once they pass the retention policy
+job_archive = JobArchive(
+    JOB_CONFIG['archive_file'],
+    max_bytes=JOB_CONFIG['archive_max_bytes'],
+    backup_count=JOB_CONFIG['archive_backup_count']
+)
+# Only one eviction pass at a time, so the same jobs are never archived twice
+evict_lock = threading.Lock()
+job_metrics = {
+    'evicted_total': 0,
+    'evicted_ttl': 0,
+    'evicted_cap': 0
+}
+# Rendering (CPU-bound) and YouTube uploads (network-bound) run on separate pools;
+# a rendered video is handed off to the upload queue and frees its render slot
+render_pool = StagePool('render', JOB_CONFIG['render_workers'])
+upload_pool = StagePool('upload', JOB_CONFIG['upload_workers'])
+
+ingest_metrics = {
+    'uploads': 0,
+    'bytes': 0,
+    'disk_writes': 0,
+    'peak_rss': 0
+}
+
+
+# Partial uploads for the resumable upload API
+upload_sessions = ResumableUploadStore(
+    session_folder=RESUMABLE_CONFIG['session_folder'],
+    session_ttl=RESUMABLE_CONFIG['session_ttl'],
+    max_upload_size=RESUMABLE_CONFIG['max_upload_size'],
+    max_chunk_size=RESUMABLE_CONFIG['max_chunk_size']
+)
+
+# In-memory index of rendered files behind /api/files
+output_index = OutputFileIndex(
+    VIDEO_CONFIG['output_folder'],
+    reconcile_interval=VIDEO_CONFIG['output_index_interval']
+)
+output_index.start()
+
+VIDEO_EXTENSIONS = ['mp4', 'avi', 'mov', 'mkv', 'wmv', 'webm']
 
 
 class JobStatus:
@@ -45,6 +119,8 @@ class JobStatus:
     COMPLETED = 'completed'
     FAILED = 'failed'
 
+    FINISHED = (COMPLETED, FAILED)
+
 
 def create_job_id():
     """Generate unique job ID"""
@@ -56,6 +132,85 @@ def allowed_file(filename, extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in extensions
 
 
+def record_ingest(ingest_stats):
+    """Accumulate per-upload ingest stats into the metrics counters"""
+    if not ingest_stats:
+        return
+    with jobs_lock:
+        ingest_metrics['uploads'] += 1
+        ingest_metrics['bytes'] += ingest_stats['bytes']
+        ingest_metrics['disk_writes'] += ingest_stats['disk_writes']
+        ingest_metrics['peak_rss'] = max(ingest_metrics['peak_rss'], ingest_stats['peak_rss'])
+
+
+def finish_job(job, status, message):
+    """Mark a job as completed/failed and stamp the time it finished"""
+    job['status'] = status
+    job['message'] = message
+    job['finished_at'] = datetime.now().isoformat()
+
+
+def evict_finished_jobs():
+    """Move finished jobs past the TTL or over the count cap to the archive"""
+    cutoff = (datetime.now() - timedelta(seconds=JOB_CONFIG['retention_seconds'])).isoformat()
+    max_finished = JOB_CONFIG['max_finished_jobs']
+    
+    if not evict_lock.acquire(blocking=False):
+        # Another request is already evicting
+        return 0
+    try:
+        return _evict_finished_jobs(cutoff, max_finished)
+    finally:
+        evict_lock.release()
+
+
+def _evict_finished_jobs(cutoff, max_finished):
+    # Pick the jobs under jobs_lock, write the archive (which may rotate files)
+    # without it, then drop the archived jobs under jobs_lock again
+    with jobs_lock:
+        finished = []
+        for kind, jobs in (('process', processing_jobs), ('upload', upload_jobs)):
+            for job_id, job in jobs.items():
+                # A job whose upload stage is still queued/running is never evicted
+                if job.get('upload_status') in (JobStatus.PENDING, JobStatus.PROCESSING):
+                    continue
+                if job.get('status') in JobStatus.FINISHED and job.get('finished_at'):
+                    finished.append((job['finished_at'], kind, job_id))
+        
+        # Oldest first: TTL-expired jobs go first, then the overflow above the cap
+        finished.sort()
+        expired = [f for f in finished if f[0] < cutoff]
+        overflow = max(0, len(finished) - len(expired) - max_finished)
+        evict_ttl = expired
+        evict_cap = finished[len(expired):len(expired) + overflow]
+        
+        if not evict_ttl and not evict_cap:
+            return 0
+        
+        entries = []
+        for _, kind, job_id in evict_ttl + evict_cap:
+            jobs = processing_jobs if kind == 'process' else upload_jobs
+            entries.append((kind, jobs[job_id]))
+    
+    try:
+        job_archive.archive_jobs(entries)
+    except Exception as e:
+        # Keep the jobs in memory rather than lose them
+        print(f"⚠️ Job archive failed: {e}")
+        return 0
+    
+    with jobs_lock:
+        for kind, job in entries:
+            jobs = processing_jobs if kind == 'process' else upload_jobs
+            if jobs.get(job['id']) is job:
+                jobs.pop(job['id'])
+        
+        job_metrics['evicted_ttl'] += len(evict_ttl)
+        job_metrics['evicted_cap'] += len(evict_cap)
+        job_metrics['evicted_total'] += len(entries)
+        return len(entries)
+
+
 # ================================
 # Web Interface Routes
 # ================================
@@ -101,7 +256,7 @@ def process_video_api():
             return jsonify({'error': 'No file selected'}), 400
         
         # Validate file extension
-        if not allowed_file(video_file.filename, ['mp4', 'avi', 'mov', 'mkv', 'wmv', 'webm']):
+        if not allowed_file(video_file.filename, VIDEO_EXTENSIONS):
             return jsonify({'error': 'Invalid file format. Supported: mp4, avi, mov, mkv, wmv, webm'}), 400
         
         # Create job
@@ -111,57 +266,10 @@ def process_video_api():
         filename = secure_filename(video_file.filename)
         unique_filename = f"{job_id}_{filename}"
         input_path = os.path.join(VIDEO_CONFIG['input_folder'], unique_filename)
-        video_file.save(input_path)
-        
-        # Get processing options
-        background_style = request.form.get('background_style', 'blur')
-        # Handle checkbox: can be 'on' (checked) or 'true', or missing (unchecked)
-        auto_upload_value = request.form.get('auto_upload', 'false').lower()
-        auto_upload = auto_upload_value in ['true', 'on', '1']
-        print(f"📝 DEBUG: Form auto_upload = '{request.form.get('auto_upload')}' -> {auto_upload}")
-        
-        # Handle custom intro/outro images
-        custom_intro_path = None
-        custom_outro_path = None
-        
-        if 'intro_image' in request.files and request.files['intro_image'].filename != '':
-            intro_file = request.files['intro_image']
-            if allowed_file(intro_file.filename, ['png', 'jpg', 'jpeg']):
-                intro_filename = f"{job_id}_intro_{secure_filename(intro_file.filename)}"
-                custom_intro_path = os.path.join(VIDEO_CONFIG['temp_folder'], intro_filename)
-                intro_file.save(custom_intro_path)
-                
-        if 'outro_image' in request.files and request.files['outro_image'].filename != '':
-            outro_file = request.files['outro_image']
-            if allowed_file(outro_file.filename, ['png', 'jpg', 'jpeg']):
-                outro_filename = f"{job_id}_outro_{secure_filename(outro_file.filename)}"
-                custom_outro_path = os.path.join(VIDEO_CONFIG['temp_folder'], outro_filename)
-                outro_file.save(custom_outro_path)
-        
-        # Create output filename
-        output_filename = f"processed_{unique_filename.rsplit('.', 1)[0]}.mp4"
-        output_path = os.path.join(VIDEO_CONFIG['output_folder'], output_filename)
-        
-        # Initialize processing job
-        processing_jobs[job_id] = {
-            'id': job_id,
-            'status': JobStatus.PENDING,
-            'input_file': unique_filename,
-            'output_file': output_filename,
-            'progress': 0,
-            'message': 'Job queued',
-            'created_at': datetime.now().isoformat(),
-            'auto_upload': auto_upload,
-            'background_style': background_style,
-            'custom_intro_path': custom_intro_path,
-            'custom_outro_path': custom_outro_path
-        }
+        ingest_stats = commit_upload(video_file, input_path)
+        record_ingest(ingest_stats)
         
-        # Start processing in background
-        import threading
-        thread = threading.Thread(target=process_video_background, args=(job_id, input_path, output_path, background_style, auto_upload, custom_intro_path, custom_outro_path))
-        thread.daemon = True
-        thread.start()
+        start_processing_job(job_id, unique_filename, request.form, ingest_stats)
         
         return jsonify({
             'job_id': job_id,
@@ -171,17 +279,77 @@ def process_video_api():
         
     except RequestEntityTooLarge:
         return jsonify({'error': 'File too large. Maximum size: 1GB'}), 413
+    except IngestRejected as e:
+        return jsonify({'error': str(e)}), 415
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def save_custom_banners(job_id):
+    """Save optional intro/outro images from the current request"""
+    custom_paths = {}
+    
+    for field in ('intro', 'outro'):
+        image_file = request.files.get(f'{field}_image')
+        if image_file and image_file.filename != '' and allowed_file(image_file.filename, ['png', 'jpg', 'jpeg']):
+            image_filename = f"{job_id}_{field}_{secure_filename(image_file.filename)}"
+            custom_paths[field] = os.path.join(VIDEO_CONFIG['temp_folder'], image_filename)
+            commit_upload(image_file, custom_paths[field])
+    
+    return custom_paths.get('intro'), custom_paths.get('outro')
+
+
+def start_processing_job(job_id, unique_filename, options, ingest_stats=None):
+    """Register a processing job for a file already in the input folder and start it"""
+    input_path = os.path.join(VIDEO_CONFIG['input_folder'], unique_filename)
+    
+    # Get processing options
+    background_style = options.get('background_style', 'blur')
+    # Handle checkbox: can be 'on' (checked) or 'true', or missing (unchecked)
+    auto_upload_value = str(options.get('auto_upload', 'false')).lower()
+    auto_upload = auto_upload_value in ['true', 'on', '1']
+    print(f"📝 DEBUG: Form auto_upload = '{options.get('auto_upload')}' -> {auto_upload}")
+    
+    # Handle custom intro/outro images
+    custom_intro_path, custom_outro_path = save_custom_banners(job_id)
+    
+    # Create output filename
+    output_filename = f"processed_{unique_filename.rsplit('.', 1)[0]}.mp4"
+    output_path = os.path.join(VIDEO_CONFIG['output_folder'], output_filename)
+    
+    # Initialize processing job
+    evict_finished_jobs()
+    with jobs_lock:
+        processing_jobs[job_id] = {
+            'id': job_id,
+            'status': JobStatus.PENDING,
+            'input_file': unique_filename,
+            'output_file': output_filename,
+            'progress': 0,
+            'message': 'Job queued',
+            'created_at': datetime.now().isoformat(),
+            'auto_upload': auto_upload,
+            'render_status': JobStatus.PENDING,
+            'upload_status': JobStatus.PENDING if auto_upload else None,
+            'background_style': background_style,
+            'custom_intro_path': custom_intro_path,
+            'custom_outro_path': custom_outro_path,
+            'ingest': ingest_stats
+        }
+    
+    # Queue for the render pool
+    render_pool.submit(process_video_background, job_id, input_path, output_path, background_style, auto_upload, custom_intro_path, custom_outro_path)
+
+
 def process_video_background(job_id, input_path, output_path, background_style, auto_upload, custom_intro_path=None, custom_outro_path=None):
-    """Background video processing"""
+    """Render stage (render pool): encode the video, then hand it off to the upload pool if auto_upload is set"""
+    job = processing_jobs[job_id]
     try:
         # Update job status
-        processing_jobs[job_id]['status'] = JobStatus.PROCESSING
-        processing_jobs[job_id]['message'] = 'Processing video...'
-        processing_jobs[job_id]['progress'] = 10
+        job['status'] = JobStatus.PROCESSING
+        job['render_status'] = JobStatus.PROCESSING
+        job['message'] = 'Processing video...'
+        job['progress'] = 10
         
         # Determine intro/outro paths (custom uploaded or default)
         intro_path = custom_intro_path or VIDEO_CONFIG['banner_intro_path']
@@ -198,39 +366,32 @@ def process_video_background(job_id, input_path, output_path, background_style,
             banner_outro_path=outro_path
         )
         
-        processing_jobs[job_id]['progress'] = 30
-        processing_jobs[job_id]['message'] = 'Adding logo and banners...'
+        job['progress'] = 30
+        job['message'] = 'Adding logo and banners...'
         
         # Process video
         result = processor.process_video()
         
         if result['status'] == 'success':
-            processing_jobs[job_id]['status'] = JobStatus.COMPLETED
-            processing_jobs[job_id]['progress'] = 100
-            processing_jobs[job_id]['message'] = 'Video processing completed'
-            processing_jobs[job_id]['result'] = result
-            processing_jobs[job_id]['download_url'] = f'/api/download/{os.path.basename(output_path)}'
+            job['result'] = result
+            job['download_url'] = f'/api/download/{os.path.basename(output_path)}'
+            job['render_status'] = JobStatus.COMPLETED
+            output_index.add_file(output_path)
             
-            # Auto upload if requested
-            print(f"🔍 DEBUG: auto_upload = {auto_upload}")
             if auto_upload:
-                print(f"🚀 Starting auto-upload for job {job_id}")
-                processing_jobs[job_id]['message'] = 'Starting YouTube upload...'
-                processing_jobs[job_id]['progress'] = 85
-                upload_result = upload_processed_video_to_youtube(job_id, output_path)
-                print(f"📊 Upload result: {upload_result}")
-                if upload_result['status'] == 'success':
-                    processing_jobs[job_id]['result']['youtube_info'] = upload_result
-                    processing_jobs[job_id]['message'] = 'Processing and upload completed successfully'
-                    print(f"✅ Auto-upload successful for job {job_id}")
-                else:
-                    processing_jobs[job_id]['message'] = f"Processing completed, but upload failed: {upload_result.get('message', 'Unknown error')}"
-                    print(f"❌ Auto-upload failed for job {job_id}: {upload_result.get('message')}")
+                # Hand off to the upload pool - this render slot is free as soon as we return
+                job['progress'] = 80
+                job['message'] = 'Rendered, queued for YouTube upload'
+                upload_pool.submit(upload_rendered_video, job_id, output_path)
+                print(f"📤 Job {job_id} rendered, queued for YouTube upload")
             else:
+                job['progress'] = 100
+                finish_job(job, JobStatus.COMPLETED, 'Video processing completed')
                 print(f"⏭️ Auto-upload skipped for job {job_id} (auto_upload = {auto_upload})")
         else:
-            processing_jobs[job_id]['status'] = JobStatus.FAILED
-            processing_jobs[job_id]['message'] = f"Processing failed: {result.get('error_message', 'Unknown error')}"
+            job['render_status'] = JobStatus.FAILED
+            job['upload_status'] = None
+            finish_job(job, JobStatus.FAILED, f"Processing failed: {result.get('error_message', 'Unknown error')}")
         
         # Clean up input file
         if os.path.exists(input_path):
@@ -243,12 +404,43 @@ def process_video_background(job_id, input_path, output_path, background_style,
             os.remove(custom_outro_path)
             
     except Exception as e:
-        processing_jobs[job_id]['status'] = JobStatus.FAILED
-        processing_jobs[job_id]['message'] = f"Processing error: {str(e)}"
+        # Once handed off, the upload stage owns the job status
+        if job.get('render_status') != JobStatus.COMPLETED:
+            job['render_status'] = JobStatus.FAILED
+            job['upload_status'] = None
+            finish_job(job, JobStatus.FAILED, f"Processing error: {str(e)}")
+        else:
+            print(f"⚠️ Cleanup after render failed for job {job_id}: {e}")
+
+
+def upload_rendered_video(job_id, video_path):
+    """Upload stage (upload pool) of an auto_upload processing job"""
+    job = processing_jobs[job_id]
+    try:
+        job['upload_status'] = JobStatus.PROCESSING
+        job['message'] = 'Uploading to YouTube...'
+        job['progress'] = 85
+        print(f"🚀 Starting auto-upload for job {job_id}")
+        
+        upload_result = upload_processed_video_to_youtube(job_id, video_path)
+        print(f"📊 Upload result: {upload_result}")
+        if upload_result['status'] == 'success':
+            job['result']['youtube_info'] = upload_result
+            job['upload_status'] = JobStatus.COMPLETED
+            job['progress'] = 100
+            finish_job(job, JobStatus.COMPLETED, 'Processing and upload completed successfully')
+            print(f"✅ Auto-upload successful for job {job_id}")
+        else:
+            job['upload_status'] = JobStatus.FAILED
+            finish_job(job, JobStatus.COMPLETED, f"Processing completed, but upload failed: {upload_result.get('message', 'Unknown error')}")
+            print(f"❌ Auto-upload failed for job {job_id}: {upload_result.get('message')}")
+    except Exception as e:
+        job['upload_status'] = JobStatus.FAILED
+        finish_job(job, JobStatus.COMPLETED, f"Processing completed, but upload failed: {str(e)}")
 
 
 def upload_processed_video_to_youtube(job_id, video_path):
-    """Upload processed video to YouTube (synchronous for auto-upload)"""
+    """Upload processed video to YouTube (called from the upload pool for auto-upload)"""
     try:
         # Generate title from filename
         title = Path(video_path).stem.replace('processed_', '').replace('_', ' ').title()
@@ -259,10 +451,7 @@ def upload_processed_video_to_youtube(job_id, video_path):
         tags = ['Shorts', 'Video', 'Upload', 'Processed']
         
         # Create uploader
-        uploader = YouTubeUploader(
-            client_secrets_file=YOUTUBE_CONFIG['client_secrets_file'],
-            credentials_file=YOUTUBE_CONFIG['credentials_file']
-        )
+        uploader = get_shared_uploader(YOUTUBE_CONFIG)
         
         # Upload video
         result = uploader.upload_video(
@@ -299,7 +488,7 @@ def direct_upload_api():
             return jsonify({'error': 'No file selected'}), 400
         
         # Validate file extension
-        if not allowed_file(video_file.filename, ['mp4', 'avi', 'mov', 'mkv', 'wmv', 'webm']):
+        if not allowed_file(video_file.filename, VIDEO_EXTENSIONS):
             return jsonify({'error': 'Invalid file format'}), 400
         
         # Create job
@@ -309,15 +498,36 @@ def direct_upload_api():
         filename = secure_filename(video_file.filename)
         unique_filename = f"{job_id}_{filename}"
         video_path = os.path.join(VIDEO_CONFIG['input_folder'], unique_filename)
-        video_file.save(video_path)
+        ingest_stats = commit_upload(video_file, video_path)
+        record_ingest(ingest_stats)
         
-        # Get metadata
-        title = request.form.get('title', Path(filename).stem)
-        description = request.form.get('description', f'Video uploaded via Video80s API\n\nOriginal filename: {filename}\n\n#Video #YouTube')
-        tags = request.form.get('tags', 'Video,Upload').split(',')
-        privacy = request.form.get('privacy', 'public')
+        start_direct_upload_job(job_id, filename, video_path, request.form, ingest_stats)
         
-        # Initialize upload job
+        return jsonify({
+            'job_id': job_id,
+            'status': 'accepted',
+            'message': 'Upload started'
+        })
+        
+    except IngestRejected as e:
+        return jsonify({'error': str(e)}), 415
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def start_direct_upload_job(job_id, filename, video_path, options, ingest_stats=None):
+    """Register a direct YouTube upload job for a file in the input folder and start it"""
+    # Get metadata
+    title = options.get('title', Path(filename).stem)
+    description = options.get('description', f'Video uploaded via Video80s API\n\nOriginal filename: {filename}\n\n#Video #YouTube')
+    tags = options.get('tags', 'Video,Upload')
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    privacy = options.get('privacy', 'public')
+    
+    # Initialize upload job
+    evict_finished_jobs()
+    with jobs_lock:
         upload_jobs[job_id] = {
             'id': job_id,
             'status': JobStatus.PENDING,
@@ -325,21 +535,141 @@ def direct_upload_api():
             'title': title,
             'progress': 0,
             'message': 'Upload queued',
-            'created_at': datetime.now().isoformat()
+            'created_at': datetime.now().isoformat(),
+            'ingest': ingest_stats
         }
+    
+    # Queue for the upload pool
+    upload_pool.submit(upload_to_youtube_background, job_id, video_path, title, description, tags, privacy)
+
+
+# ================================
+# API Routes - Resumable Uploads
+# ================================
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload_session():
+    """Create a resumable upload session"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        filename = secure_filename(data.get('filename', ''))
+        if not filename or not allowed_file(filename, VIDEO_EXTENSIONS):
+            return jsonify({'error': 'Invalid file format. Supported: mp4, avi, mov, mkv, wmv, webm'}), 400
+        
+        try:
+            size = int(data.get('size', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid upload size'}), 400
+        
+        session = upload_sessions.create_session(filename, size)
+        return jsonify({
+            **session,
+            'chunk_size': RESUMABLE_CONFIG['chunk_size'],
+            'upload_url': f"/api/uploads/{session['upload_id']}"
+        }), 201
+        
+    except UploadSessionError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'HEAD'])
+def get_upload_session(upload_id):
+    """Get the received byte ranges / current offset of an upload session"""
+    session = upload_sessions.get_session(upload_id)
+    if session is None:
+        return jsonify({'error': 'Upload session not found'}), 404
+    
+    response = jsonify(session)
+    response.headers['Upload-Offset'] = str(session['offset'])
+    response.headers['Upload-Length'] = str(session['size'])
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT', 'PATCH'])
+def upload_chunk(upload_id):
+    """Write one chunk; the offset comes from Upload-Offset or Content-Range"""
+    try:
+        offset = request.headers.get('Upload-Offset')
+        content_range = request.headers.get('Content-Range', '')
+        if offset is None and content_range.startswith('bytes '):
+            # Content-Range: bytes <start>-<end>/<total>
+            offset = content_range[len('bytes '):].split('-', 1)[0]
+        if offset is None or request.content_length is None:
+            return jsonify({'error': 'Upload-Offset and Content-Length headers are required'}), 400
+        try:
+            offset = int(offset)
+        except ValueError:
+            return jsonify({'error': 'Invalid offset'}), 400
+        
+        session = upload_sessions.write_chunk(upload_id, offset, request.stream, request.content_length)
+        
+        response = jsonify(session)
+        response.headers['Upload-Offset'] = str(session['offset'])
+        return response
+        
+    except ClientDisconnected:
+        # The bytes that did arrive are recorded by write_chunk; the client resumes
+        # from the offset reported by HEAD
+        return jsonify({'error': 'Client disconnected during chunk upload'}), 400
+    except UploadSessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except UploadSessionError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload_session(upload_id):
+    """Abort an upload session and delete its partial data"""
+    if upload_sessions.delete_session(upload_id):
+        return jsonify({'status': 'deleted'})
+    return jsonify({'error': 'Upload session not found'}), 404
+
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload_session(upload_id):
+    """Turn a completed upload session into a processing or direct-upload job"""
+    try:
+        options = request.get_json(silent=True) or request.form
+        target = options.get('target', 'process')
+        if target not in ('process', 'direct'):
+            return jsonify({'error': 'target must be process or direct'}), 400
+        
+        session = upload_sessions.get_session(upload_id)
+        if session is None:
+            return jsonify({'error': 'Upload session not found'}), 404
         
-        # Start upload in background
-        import threading
-        thread = threading.Thread(target=upload_to_youtube_background, args=(job_id, video_path, title, description, tags, privacy))
-        thread.daemon = True
-        thread.start()
+        job_id = create_job_id()
+        filename = session['filename']
+        unique_filename = f"{job_id}_{filename}"
+        input_path = os.path.join(VIDEO_CONFIG['input_folder'], unique_filename)
+        ingest_stats = upload_sessions.finalize_session(upload_id, input_path)
+        
+        if ingest_stats['container'] is None:
+            os.remove(input_path)
+            return jsonify({'error': 'Uploaded data is not a supported video container'}), 415
+        
+        if target == 'process':
+            start_processing_job(job_id, unique_filename, options, ingest_stats)
+            message = 'Video processing started'
+        else:
+            start_direct_upload_job(job_id, filename, input_path, options, ingest_stats)
+            message = 'Upload started'
         
         return jsonify({
             'job_id': job_id,
             'status': 'accepted',
-            'message': 'Upload started'
+            'message': message
         })
         
+    except UploadSessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except UploadSessionError as e:
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -348,14 +678,15 @@ def upload_to_youtube_background(job_id, video_path, title=None, description=Non
     """Background YouTube upload"""
     try:
         # Update job status
-        if job_id not in upload_jobs:
-            upload_jobs[job_id] = {
-                'id': job_id,
-                'status': JobStatus.PENDING,
-                'progress': 0,
-                'message': 'Upload starting...',
-                'created_at': datetime.now().isoformat()
-            }
+        with jobs_lock:
+            if job_id not in upload_jobs:
+                upload_jobs[job_id] = {
+                    'id': job_id,
+                    'status': JobStatus.PENDING,
+                    'progress': 0,
+                    'message': 'Upload starting...',
+                    'created_at': datetime.now().isoformat()
+                }
         
         upload_jobs[job_id]['status'] = JobStatus.PROCESSING
         upload_jobs[job_id]['message'] = 'Connecting to YouTube...'
@@ -370,10 +701,7 @@ def upload_to_youtube_background(job_id, video_path, title=None, description=Non
             tags = ['Video', 'Upload']
         
         # Create uploader
-        uploader = YouTubeUploader(
-            client_secrets_file=YOUTUBE_CONFIG['client_secrets_file'],
-            credentials_file=YOUTUBE_CONFIG['credentials_file']
-        )
+        uploader = get_shared_uploader(YOUTUBE_CONFIG)
         
         upload_jobs[job_id]['progress'] = 30
         upload_jobs[job_id]['message'] = 'Uploading to YouTube...'
@@ -388,21 +716,18 @@ def upload_to_youtube_background(job_id, video_path, title=None, description=Non
         )
         
         if result['status'] == 'success':
-            upload_jobs[job_id]['status'] = JobStatus.COMPLETED
             upload_jobs[job_id]['progress'] = 100
-            upload_jobs[job_id]['message'] = 'Upload completed successfully'
             upload_jobs[job_id]['result'] = result
+            finish_job(upload_jobs[job_id], JobStatus.COMPLETED, 'Upload completed successfully')
         else:
-            upload_jobs[job_id]['status'] = JobStatus.FAILED
-            upload_jobs[job_id]['message'] = f"Upload failed: {result.get('message', 'Unknown error')}"
+            finish_job(upload_jobs[job_id], JobStatus.FAILED, f"Upload failed: {result.get('message', 'Unknown error')}")
         
         # Clean up file
         if os.path.exists(video_path):
             os.remove(video_path)
             
     except Exception as e:
-        upload_jobs[job_id]['status'] = JobStatus.FAILED
-        upload_jobs[job_id]['message'] = f"Upload error: {str(e)}"
+        finish_job(upload_jobs[job_id], JobStatus.FAILED, f"Upload error: {str(e)}")
 
 
 # ================================
@@ -412,13 +737,18 @@ def upload_to_youtube_background(job_id, video_path, title=None, description=Non
 @app.route('/api/job/<job_id>', methods=['GET'])
 def get_job_status(job_id):
     """Get job status"""
-    # Check in processing jobs
-    if job_id in processing_jobs:
-        return jsonify(processing_jobs[job_id])
+    # Check in processing jobs, then upload jobs
+    with jobs_lock:
+        job = processing_jobs.get(job_id) or upload_jobs.get(job_id)
+        if job is not None:
+            job = dict(job)
+    if job is not None:
+        return jsonify(job)
     
-    # Check in upload jobs
-    if job_id in upload_jobs:
-        return jsonify(upload_jobs[job_id])
+    # Fall back to jobs evicted by the retention policy
+    archived_job = job_archive.get_job(job_id)
+    if archived_job:
+        return jsonify(archived_job)
     
     return jsonify({'error': 'Job not found'}), 404
 
@@ -426,9 +756,12 @@ def get_job_status(job_id):
 @app.route('/api/jobs', methods=['GET'])
 def get_all_jobs():
     """Get all jobs"""
+    evict_finished_jobs()
+    
     all_jobs = {}
-    all_jobs.update({f"process_{k}": v for k, v in processing_jobs.items()})
-    all_jobs.update({f"upload_{k}": v for k, v in upload_jobs.items()})
+    with jobs_lock:
+        all_jobs.update({f"process_{k}": v for k, v in processing_jobs.items()})
+        all_jobs.update({f"upload_{k}": v for k, v in upload_jobs.items()})
     
     # Sort by created_at
     sorted_jobs = dict(sorted(all_jobs.items(), key=lambda x: x[1]['created_at'], reverse=True))
@@ -442,30 +775,137 @@ def get_all_jobs():
 
 @app.route('/api/download/<filename>')
 def download_file(filename):
-    """Download processed video"""
-    file_path = os.path.join(VIDEO_CONFIG['output_folder'], filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True)
-    return jsonify({'error': 'File not found'}), 404
+    """Download processed video (Range and conditional GET supported)"""
+    file_path = safe_join(VIDEO_CONFIG['output_folder'], filename)
+    if file_path is None or not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+    
+    if DOWNLOAD_CONFIG['accel_redirect']:
+        return accel_redirect_response(filename, file_path)
+    
+    stat = os.stat(file_path)
+    return send_file(
+        os.path.abspath(file_path),
+        as_attachment=True,
+        conditional=True,
+        etag=nginx_etag(stat),
+        last_modified=stat.st_mtime
+    )
+
+
+def nginx_etag(stat):
+    """ETag in nginx's static-file format, so both serving paths agree"""
+    return f"{int(stat.st_mtime):x}-{stat.st_size:x}"
+
+
+def accel_redirect_response(filename, file_path):
+    """Hand the transfer to nginx through its internal output location"""
+    stat = os.stat(file_path)
+    
+    response = app.response_class(status=200)
+    response.set_etag(nginx_etag(stat))
+    response.last_modified = stat.st_mtime
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+    
+    # nginx serves the body (with Range support) and keeps these headers
+    response.headers['X-Accel-Redirect'] = DOWNLOAD_CONFIG['accel_prefix'] + quote(filename)
+    response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
 
 
 @app.route('/api/files')
 def list_files():
-    """List available files"""
-    output_files = []
-    if os.path.exists(VIDEO_CONFIG['output_folder']):
-        for filename in os.listdir(VIDEO_CONFIG['output_folder']):
-            if filename.endswith(('.mp4', '.avi', '.mov')):
-                file_path = os.path.join(VIDEO_CONFIG['output_folder'], filename)
-                file_info = {
-                    'filename': filename,
-                    'size': os.path.getsize(file_path),
-                    'modified': datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
-                    'download_url': f'/api/download/{filename}'
-                }
-                output_files.append(file_info)
+    """List available files
+
+    Without query parameters this returns the full list (newest first).
+    With limit/offset it returns one page: {files, total, offset, limit}.
+    Query: sort=mtime|size, order=desc|asc, limit, offset
+    """
+    sort = request.args.get('sort', 'mtime')
+    descending = request.args.get('order', 'desc') != 'asc'
+    
+    if 'limit' not in request.args and 'offset' not in request.args:
+        _, files = output_index.list_files(sort=sort, descending=descending)
+        return jsonify(files)
     
-    return jsonify(output_files)
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(1000, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    
+    total, files = output_index.list_files(sort=sort, descending=descending, offset=offset, limit=limit)
+    return jsonify({
+        'files': files,
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
+
+
+@app.route('/api/videos')
+def search_videos():
+    """Search processed videos (newest first, paginated)
+
+    Query: q (words in filename/title, all must match), status, youtube_status,
+    youtube_id, from, to (ISO dates, inclusive), limit, offset
+    Returns {videos, total, offset, limit}
+    """
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(1000, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+
+    total, videos = get_storage_handler(DATA_CONFIG).query(
+        text=request.args.get('q'),
+        processing_status=request.args.get('status'),
+        youtube_status=request.args.get('youtube_status'),
+        youtube_video_id=request.args.get('youtube_id'),
+        date_from=request.args.get('from'),
+        date_to=request.args.get('to'),
+        limit=limit,
+        offset=offset
+    )
+    return jsonify({
+        'videos': videos,
+        'total': total,
+        'offset': offset,
+        'limit': limit
+    })
+
+
+@app.route('/api/export')
+def export_videos():
+    """Stream the video database as CSV or JSONL (chunked, constant memory)
+
+    Query: format=csv|jsonl, from, to (ISO dates, inclusive),
+    status (processing status), youtube_status (success, none, ...)
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    chunks = iter_export(
+        get_storage_handler(DATA_CONFIG), fmt,
+        date_from=request.args.get('from'),
+        date_to=request.args.get('to'),
+        processing_status=request.args.get('status'),
+        youtube_status=request.args.get('youtube_status')
+    )
+    filename = f"videos_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(chunks),
+        content_type=CONTENT_TYPES[fmt],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 
 # ================================
@@ -482,6 +922,27 @@ def health_check():
     })
 
 
+@app.route('/api/metrics')
+def metrics():
+    """In-process metrics (job retention, render/upload worker pools and upload ingest counters)"""
+    with jobs_lock:
+        jobs_info = {
+            'processing_in_memory': len(processing_jobs),
+            'upload_in_memory': len(upload_jobs),
+            'archived': job_archive.count(),
+            **job_metrics
+        }
+        workers_info = {'render': render_pool.stats(), 'upload': upload_pool.stats()}
+        ingest_info = dict(ingest_metrics)
+    
+    return jsonify({
+        'jobs': jobs_info,
+        'workers': workers_info,
+        'ingest': ingest_info,
+        'timestamp': datetime.now().isoformat()
+    })
+
+
 # ================================
 # Error Handlers
 # ================================
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Server giả lập YouTube Data API v3 (phần project dùng) để benchmark/test upload
+mà không gọi tới Google
+
+Hỗ trợ:
+    POST/PUT /upload/youtube/v3/videos      videos.insert resumable (session, chunk, offset)
+    POST     /upload/youtube/v3/thumbnails/set
+    GET      /youtube/v3/videos             videos.list (tối đa 50 id mỗi request)
+    GET      /youtube/v3/channels           channels.list (mine=true)
+
+Lỗi giả lập (theo profile hoặc tham số):
+    latency       giây chờ trước mỗi response
+    bandwidth     băng thông upload tối đa (bytes/s, dùng chung cho mọi kết nối)
+    error_every   cứ mỗi N request upload thì trả `error_burst` lỗi 5xx liên tiếp
+    reset_every   cứ mỗi N chunk thì đóng kết nối giữa chừng (mất mạng)
+    quota_after   sau N lần videos.insert thì trả 403 quotaExceeded
+
+Trỏ YouTubeUploader tới server bằng api_root (YOUTUBE_API_ROOT):
+    YouTubeUploader(..., api_root=server.url)
+
+Usage:
+    python benchmarks/fake_youtube_api.py --port 8090 --profile flaky
+"""
+import argparse
+import json
+import re
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+PROFILES = {
+    'clean': {},
+    'latency': {'latency': 0.08},
+    'slow-link': {'bandwidth': 8 * 1024 * 1024},
+    'flaky': {'error_every': 2, 'error_burst': 1},
+    'unstable': {'reset_every': 3},
+    'quota': {'quota_after': 0}
+}
+
+READ_BLOCK = 64 * 1024
+
+
+def api_error(code, reason, message, domain='youtube.api'):
+    return {'error': {'code': code, 'message': message,
+                      'errors': [{'domain': domain, 'reason': reason, 'message': message}]}}
+
+
+class FakeYouTubeAPI:
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, bandwidth=None,
+                 error_every=0, error_burst=1, error_status=503, reset_every=0, quota_after=None):
+        """
+        Khởi tạo server (gọi start() để chạy trong thread nền)
+
+        Args:
+            host, port: Địa chỉ lắng nghe (port 0 = chọn port trống)
+            latency: Giây chờ trước mỗi response
+            bandwidth: Bytes/s tối đa khi nhận dữ liệu upload (None = không giới hạn)
+            error_every: Mỗi N request upload trả lỗi 5xx (0 = tắt)
+            error_burst: Số lỗi 5xx liên tiếp mỗi lần
+            error_status: HTTP status của lỗi giả lập
+            reset_every: Mỗi N chunk đóng kết nối khi đang nhận dữ liệu (0 = tắt)
+            quota_after: Số lần videos.insert được phép trước khi trả quotaExceeded
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_every = error_every
+        self.error_burst = error_burst
+        self.error_status = error_status
+        self.reset_every = reset_every
+        self.quota_after = quota_after
+
+        self.lock = threading.Lock()
+        self.uploads = {}
+        self.videos = {}
+        self.counters = {'requests': 0, 'upload_requests': 0, 'chunks': 0, 'bytes_received': 0,
+                         'injected_errors': 0, 'connection_resets': 0, 'quota_errors': 0,
+                         'inserts': 0, 'videos_list_calls': 0, 'channels_list_calls': 0,
+                         'thumbnails_set_calls': 0}
+        self._link_free = 0.0
+
+        handler = type('FakeYouTubeHandler', (_Handler,), {'api': self})
+        self.httpd = _Server((host, port), handler)
+        self._thread = None
+
+    @classmethod
+    def from_profile(cls, name, **kwargs):
+        return cls(**{**PROFILES[name], **kwargs})
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, 'videos': len(self.videos),
+                    'open_sessions': sum(1 for u in self.uploads.values() if not u['video_id'])}
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+            return self.counters[name]
+
+    def throttle(self, size):
+        """
+        Chờ cho đủ thời gian truyền `size` byte qua đường truyền dùng chung
+        """
+        if not self.bandwidth:
+            return
+        with self.lock:
+            start = max(time.monotonic(), self._link_free)
+            self._link_free = start + size / self.bandwidth
+            done = self._link_free
+        delay = done - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def inject_error(self):
+        """
+        Request upload này có bị trả lỗi 5xx không (theo error_every/error_burst)
+        """
+        if not self.error_every:
+            return False
+        number = self.count('upload_requests')
+        return (number - 1) % (self.error_every + self.error_burst) >= self.error_every
+
+    def create_video(self, metadata):
+        with self.lock:
+            video_id = f"fake{len(self.videos) + 1:07d}"
+            snippet = metadata.get('snippet', {})
+            self.videos[video_id] = {
+                'kind': 'youtube#video',
+                'id': video_id,
+                'snippet': {
+                    'title': snippet.get('title', ''),
+                    'description': snippet.get('description', ''),
+                    'tags': snippet.get('tags', []),
+                    'categoryId': snippet.get('categoryId', '22'),
+                    'publishedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'channelId': 'UCfakechannel000000000'
+                },
+                'status': {
+                    'uploadStatus': 'uploaded',
+                    'privacyStatus': metadata.get('status', {}).get('privacyStatus', 'private')
+                },
+                'statistics': {'viewCount': '0', 'likeCount': '0', 'commentCount': '0'}
+            }
+            return self.videos[video_id]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Mặc định 5 - hàng chục upload mở kết nối cùng lúc sẽ bị reset ngay khi kết nối
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Client đóng kết nối giữa chừng (lỗi giả lập, client thử lại) là bình thường
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive như Google
+    api = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- helpers ---
+
+    def _send(self, status, payload=None, headers=None):
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self, reset_after=None):
+        """
+        Đọc body theo block (áp băng thông); reset_after = số byte đọc trước khi đóng kết nối
+        """
+        remaining = int(self.headers.get('Content-Length') or 0)
+        chunks = []
+        while remaining > 0:
+            block = self.rfile.read(min(READ_BLOCK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            self.api.throttle(len(block))
+            chunks.append(block)
+            if reset_after is not None and sum(len(c) for c in chunks) >= reset_after:
+                return None
+        return b''.join(chunks)
+
+    def _authorized(self):
+        if self.headers.get('Authorization', '').startswith('Bearer '):
+            return True
+        self._read_body()
+        self._send(401, api_error(401, 'authError', 'Invalid Credentials', 'global'))
+        return False
+
+    def _route(self):
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        return parts.path.rstrip('/'), query
+
+    # --- methods ---
+
+    def do_GET(self):
+        self.api.count('requests')
+        if not self._authorized():
+            return
+        path, query = self._route()
+        if path == '/youtube/v3/videos':
+            self._videos_list(query)
+        elif path == '/youtube/v3/channels':
+            self._channels_list()
+        else:
+            self._send(404, api_error(404, 'notFound', f'Không có route {path}'))
+
+    def do_POST(self):
+        self.api.count('requests')
+        if not self._authorized():
+            return
+        path, query = self._route()
+        if path == '/upload/youtube/v3/videos' and query.get('uploadType') == 'resumable':
+            self._start_upload(query)
+        elif path == '/upload/youtube/v3/thumbnails/set':
+            self._thumbnails_set(query)
+        else:
+            self._read_body()
+            self._send(404, api_error(404, 'notFound', f'Không có route {path}'))
+
+    def do_PUT(self):
+        self.api.count('requests')
+        path, query = self._route()
+        upload = self.api.uploads.get(query.get('upload_id', ''))
+        if path != '/upload/youtube/v3/videos' or upload is None:
+            self._read_body()
+            self._send(404, api_error(404, 'notFound', 'Upload session không tồn tại'))
+            return
+        self._put_chunk(upload)
+
+    # --- videos.insert (resumable) ---
+
+    def _start_upload(self, query):
+        api = self.api
+        metadata = json.loads(self._read_body() or b'{}')
+        if api.quota_after is not None and api.counters['inserts'] >= api.quota_after:
+            api.count('quota_errors')
+            self._send(403, api_error(403, 'quotaExceeded',
+                                      'The request cannot be completed because you have exceeded your quota.',
+                                      'youtube.quota'))
+            return
+        if api.inject_error():
+            api.count('injected_errors')
+            self._send(api.error_status, api_error(api.error_status, 'backendError', 'Backend Error'))
+            return
+
+        api.count('inserts')
+        with api.lock:
+            upload_id = f"up{len(api.uploads) + 1:06d}"
+            api.uploads[upload_id] = {
+                'metadata': metadata,
+                'size': int(self.headers.get('X-Upload-Content-Length') or 0) or None,
+                'received': 0,
+                'video_id': None
+            }
+        host, port = self.server.server_address[:2]
+        location = f"http://{host}:{port}/upload/youtube/v3/videos?uploadType=resumable&upload_id={upload_id}"
+        self._send(200, headers={'Location': location})
+
+    def _put_chunk(self, upload):
+        api = self.api
+        content_range = self.headers.get('Content-Range', '')
+        match = re.match(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range)
+        status_query = re.match(r'bytes \*/(\d+|\*)', content_range)
+
+        if match:
+            chunk_number = api.count('chunks')
+            if api.inject_error():
+                api.count('injected_errors')
+                self._read_body()
+                self._send(api.error_status, api_error(api.error_status, 'backendError', 'Backend Error'))
+                return
+            if api.reset_every and chunk_number % api.reset_every == 0:
+                # Mất kết nối giữa chừng chunk: server chỉ giữ phần đã nhận đủ trước đó
+                api.count('connection_resets')
+                self._read_body(reset_after=READ_BLOCK)
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+
+            body = self._read_body()
+            start, total = int(match.group(1)), match.group(3)
+            api.count('bytes_received', len(body))
+            with api.lock:
+                if total != '*':
+                    upload['size'] = int(total)
+                if start <= upload['received']:
+                    upload['received'] = max(upload['received'], start + len(body))
+        elif not status_query:
+            self._read_body()
+            self._send(400, api_error(400, 'badContent', 'Thiếu Content-Range'))
+            return
+        else:
+            self._read_body()
+            if status_query.group(1) != '*':
+                upload['size'] = int(status_query.group(1))
+
+        if upload['video_id'] is None and upload['size'] is not None and upload['received'] >= upload['size']:
+            upload['video_id'] = api.create_video(upload['metadata'])['id']
+        if upload['video_id'] is not None:
+            self._send(200, api.videos[upload['video_id']])
+            return
+        headers = {'Range': f"bytes=0-{upload['received'] - 1}"} if upload['received'] else {}
+        self._send(308, headers=headers)
+
+    # --- thumbnails.set, videos.list, channels.list ---
+
+    def _thumbnails_set(self, query):
+        api = self.api
+        api.count('thumbnails_set_calls')
+        body = self._read_body()
+        video_id = query.get('videoId')
+        if video_id not in api.videos:
+            self._send(404, api_error(404, 'videoNotFound', f'Không có video {video_id}'))
+            return
+        url = f"{api.url}thumbnails/{video_id}/default.jpg"
+        self._send(200, {'kind': 'youtube#thumbnailSetResponse',
+                         'items': [{'default': {'url': url, 'width': 120, 'height': 90}}],
+                         'size': len(body or b'')})
+
+    def _videos_list(self, query):
+        api = self.api
+        api.count('videos_list_calls')
+        ids = [video_id for video_id in query.get('id', '').split(',') if video_id]
+        if len(ids) > 50:
+            self._send(400, api_error(400, 'invalidParameter', 'Tối đa 50 id mỗi request'))
+            return
+        items = []
+        with api.lock:
+            for video_id in ids:
+                video = api.videos.get(video_id)
+                if video is None:
+                    continue
+                # Mỗi lần đọc tăng view để thấy được thống kê thay đổi
+                stats = video['statistics']
+                stats['viewCount'] = str(int(stats['viewCount']) + 1)
+                items.append(json.loads(json.dumps(video)))
+        self._send(200, {'kind': 'youtube#videoListResponse', 'items': items,
+                         'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)}})
+
+    def _channels_list(self):
+        api = self.api
+        api.count('channels_list_calls')
+        self._send(200, {'kind': 'youtube#channelListResponse', 'items': [{
+            'id': 'UCfakechannel000000000',
+            'snippet': {'title': 'Fake Channel', 'description': 'Kênh giả lập'},
+            'statistics': {'subscriberCount': '0', 'videoCount': str(len(api.videos)),
+                           'viewCount': '0'}
+        }]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Server giả lập YouTube Data API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='clean')
+    args = parser.parse_args()
+
+    server = FakeYouTubeAPI.from_profile(args.profile, host=args.host, port=args.port)
+    print(f"Fake YouTube API ({args.profile}) tại {server.url} - đặt YOUTUBE_API_ROOT={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage backend (JSON vs SQLite)
+
+Tạo N record giả trong thư mục tạm rồi đo thời gian các thao tác mà
+dashboard và CLI hay gọi.
+
+Usage:
+    python benchmarks/storage_benchmark.py --records 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage import create_storage_handler, STORAGE_BACKENDS
+
+
+def fake_video(i):
+    return {
+        'input_video': f'input/video_{i}.mp4',
+        'output_video': f'output/processed_video_{i}.mp4',
+        'original_duration': random.uniform(10, 120),
+        'final_duration': random.uniform(10, 60),
+        'status': random.choice(['success', 'success', 'success', 'error']),
+        'metadata': {'title': f'Video {i}'}
+    }
+
+
+def timed(fn, repeat=1):
+    """
+    Chạy fn `repeat` lần, trả về (kết quả lần cuối, ms trung bình mỗi lần)
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def run_backend(backend, records, workdir):
+    config = {
+        'backend': backend,
+        'storage_file': os.path.join(workdir, 'videos_database.json'),
+        'sqlite_file': os.path.join(workdir, 'videos_database.sqlite3'),
+        'journal_compact_threshold': max(1000, records // 10)
+    }
+    results = {}
+    # Handler in ra từng thao tác - tắt stdout khi đo
+    with contextlib.redirect_stdout(io.StringIO()):
+        storage = create_storage_handler(config)
+
+        ids, results['populate_s'] = timed(lambda: [storage.save_video_info(fake_video(i)) for i in range(records)])
+        results['populate_s'] /= 1000
+
+        _, results['save_ms'] = timed(lambda: storage.save_video_info(fake_video(0)), 200)
+        _, results['get_by_id_ms'] = timed(lambda: storage.get_video_by_id(random.choice(ids)), 200)
+        _, results['update_ms'] = timed(
+            lambda: storage.update_youtube_info(random.choice(ids), {'status': 'success', 'video_id': 'x'}), 200
+        )
+        _, results['latest_5_ms'] = timed(lambda: storage.get_all_videos(limit=5), 20)
+        _, results['by_status_ms'] = timed(lambda: storage.get_videos_by_status('error'), 5)
+        _, results['statistics_ms'] = timed(storage.get_statistics, 20)
+        storage.close_connection()
+
+        _, results['reopen_ms'] = timed(lambda: create_storage_handler(config).close_connection())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark storage backend')
+    parser.add_argument('--records', type=int, default=100000, help='Số record tạo trước khi đo')
+    parser.add_argument('--backend', choices=STORAGE_BACKENDS, action='append',
+                        help='Backend cần đo (mặc định tất cả)')
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"Storage benchmark - {args.records} records")
+    print("=" * 50)
+    for backend in args.backend or STORAGE_BACKENDS:
+        workdir = tempfile.mkdtemp(prefix=f'bench-{backend}-')
+        try:
+            results = run_backend(backend, args.records, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        print(f"\n[{backend}]")
+        for name, value in results.items():
+            print(f"  {name:<16} {value:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Stress benchmark đọc/ghi đồng thời trên JsonStorageHandler
+
+Chạy T thread đọc (get_all_videos, get_videos_page, get_statistics,
+get_videos_by_status) cùng lúc với một thread ghi liên tục, so sánh đọc không
+lock (seqlock) với đọc luôn lấy lock.
+
+Usage:
+    python benchmarks/storage_concurrency_benchmark.py --records 20000 --threads 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.json_storage import JsonStorageHandler
+
+
+class LockedReadHandler(JsonStorageHandler):
+    """Baseline: mọi lần đọc đều lấy self.lock"""
+
+    def _read(self, fn, attempts: int = 3):
+        self._refresh()
+        with self.lock:
+            return fn()
+
+
+def fake_video(i):
+    return {
+        'input_video': f'input/video_{i}.mp4',
+        'output_video': f'output/processed_video_{i}.mp4',
+        'final_duration': random.uniform(10, 60),
+        'status': random.choice(['success', 'success', 'success', 'error'])
+    }
+
+
+def read_mix(storage, ids):
+    op = random.random()
+    if op < 0.4:
+        storage.get_all_videos(limit=5)
+    elif op < 0.7:
+        storage.get_videos_page(limit=20, before=random.choice(ids))
+    elif op < 0.95:
+        storage.get_statistics()
+    else:
+        storage.get_videos_by_status('error')
+
+
+def run(handler_class, records, threads, seconds, write_interval):
+    workdir = tempfile.mkdtemp(prefix='bench-concurrency-')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            storage = handler_class(os.path.join(workdir, 'videos_database.json'),
+                                    compact_threshold=max(1000, records // 10))
+            ids = [storage.save_video_info(fake_video(i)) for i in range(records)]
+
+            stop = threading.Event()
+            reads = [0] * threads
+            writes = [0]
+
+            def reader(slot):
+                while not stop.is_set():
+                    read_mix(storage, ids)
+                    reads[slot] += 1
+
+            def writer():
+                while not stop.is_set():
+                    storage.update_youtube_info(random.choice(ids), {'status': 'success'})
+                    writes[0] += 1
+                    time.sleep(write_interval)
+
+            workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+            workers.append(threading.Thread(target=writer))
+            for worker in workers:
+                worker.start()
+            time.sleep(seconds)
+            stop.set()
+            for worker in workers:
+                worker.join()
+            storage.close_connection()
+
+        return {
+            'reads_per_s': sum(reads) / seconds,
+            'writes_per_s': writes[0] / seconds,
+            'read_retries': storage.read_retries,
+            'locked_reads': storage.locked_reads
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress benchmark đọc/ghi đồng thời')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--write-interval', type=float, default=0.001,
+                        help='Số giây nghỉ giữa hai lần ghi của thread ghi')
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"Concurrency benchmark - {args.records} records, {args.seconds}s mỗi lần chạy")
+    print(f"{'mode':<10} {'threads':>7} {'reads/s':>10} {'writes/s':>9} {'retries':>8} {'locked':>7}")
+    for name, handler_class in (('seqlock', JsonStorageHandler), ('locked', LockedReadHandler)):
+        for threads in args.threads:
+            r = run(handler_class, args.records, threads, args.seconds, args.write_interval)
+            print(f"{name:<10} {threads:>7} {r['reads_per_s']:>10.0f} {r['writes_per_s']:>9.0f} "
+                  f"{r['read_retries']:>8} {r['locked_reads']:>7}")
+
+
+if __name__ == "__main__":
+    main()
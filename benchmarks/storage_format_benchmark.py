@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark định dạng snapshot của JsonStorageHandler (json / jsonl / msgpack)
+
+Đo thời gian ghi snapshot, thời gian load và kích thước file ở nhiều cỡ
+database. msgpack chỉ được đo khi đã cài package msgpack.
+
+Usage:
+    python benchmarks/storage_format_benchmark.py --records 10000 100000 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import json_storage
+from src.json_storage import STORAGE_FORMATS, dump_snapshot, load_snapshot
+
+
+def fake_videos(count):
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield {
+            'id': str(uuid.uuid4()),
+            'input_video': f'input/video_{i}.mp4',
+            'output_video': f'output/processed_video_{i}.mp4',
+            'original_duration': random.uniform(10, 120),
+            'final_duration': random.uniform(10, 60),
+            'processing_status': random.choice(['success', 'success', 'error']),
+            'youtube_info': {'status': 'success', 'video_id': f'vid{i}',
+                             'shorts_url': f'https://youtube.com/shorts/vid{i}'} if i % 3 else {},
+            'processing_date': (start + timedelta(seconds=i * 30)).isoformat(),
+            'metadata': {'title': f'Video {i} - Tiếng Việt', 'tags': ['shorts', 'video80s']}
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark định dạng snapshot')
+    parser.add_argument('--records', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--stdlib', action='store_true', help='Bỏ qua orjson, đo json chuẩn')
+    args = parser.parse_args()
+
+    if args.stdlib:
+        json_storage.orjson = None
+
+    formats = [fmt for fmt in STORAGE_FORMATS if fmt != 'msgpack' or json_storage.msgpack is not None]
+    print(f"orjson: {'có' if json_storage.orjson is not None else 'không'}, "
+          f"msgpack: {'có' if json_storage.msgpack is not None else 'không'}")
+    print(f"{'records':>9} {'format':<8} {'save_s':>8} {'load_s':>8} {'size_MB':>8}")
+
+    random.seed(42)
+    workdir = tempfile.mkdtemp(prefix='bench-format-')
+    try:
+        for count in args.records:
+            videos = list(fake_videos(count))
+            statistics = {'total_processed': count, 'last_updated': datetime.now().isoformat()}
+            for fmt in formats:
+                path = os.path.join(workdir, f'snapshot.{fmt}')
+
+                started = time.perf_counter()
+                with open(path, 'wb') as f:
+                    dump_snapshot(f, videos, statistics, fmt)
+                save_seconds = time.perf_counter() - started
+
+                gc.collect()
+                started = time.perf_counter()
+                data, detected = load_snapshot(path)
+                load_seconds = time.perf_counter() - started
+
+                assert detected == fmt and data['videos'] == videos, f'{fmt} không round-trip được'
+                del data
+                print(f"{count:>9} {fmt:<8} {save_seconds:>8.3f} {load_seconds:>8.3f} "
+                      f"{os.path.getsize(path) / 1024 / 1024:>8.1f}")
+            del videos
+            gc.collect()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark thời gian chuẩn bị client YouTube cho mỗi lần upload
+
+So sánh:
+    per-upload - cách cũ: mỗi upload unpickle token.pickle và build('youtube', 'v3')
+                 (đọc + parse discovery document, HTTP client mới)
+    shared     - get_shared_uploader(): uploader dùng chung, mỗi upload chạy trên
+                 thread mới lấy service (kèm HTTP connection keep-alive) từ pool
+
+Dùng credentials giả (token cố định, không hết hạn) nên không gọi tới Google.
+
+Usage:
+    python benchmarks/youtube_client_benchmark.py --uploads 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import pickle
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from src.youtube_client import get_shared_uploader, reset_shared_uploader
+
+
+def setup_per_upload(credentials_file):
+    with open(credentials_file, 'rb') as token:
+        creds = pickle.load(token)
+    return build('youtube', 'v3', credentials=creds)
+
+
+def setup_shared(youtube_config):
+    return get_shared_uploader(youtube_config).youtube
+
+
+def run(setup, uploads):
+    """
+    Mỗi upload chạy trên một thread mới (như upload_to_youtube_background)
+    """
+    timings = []
+
+    def job():
+        started = time.perf_counter()
+        service = setup()
+        timings.append(time.perf_counter() - started)
+        assert service is not None
+
+    for _ in range(uploads):
+        thread = threading.Thread(target=job)
+        thread.start()
+        thread.join()
+        del thread  # Thread được thu hồi -> service quay về pool
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chuẩn bị YouTube client mỗi upload')
+    parser.add_argument('--uploads', type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-youtube-client-')
+    try:
+        credentials_file = os.path.join(workdir, 'token.pickle')
+        with open(credentials_file, 'wb') as token:
+            pickle.dump(Credentials(token='benchmark-token'), token)
+        youtube_config = {
+            'client_secrets_file': os.path.join(workdir, 'client_secrets.json'),
+            'credentials_file': credentials_file,
+            'quota_ledger_file': None,
+            'upload_session_folder': os.path.join(workdir, 'sessions')
+        }
+
+        print(f"YouTube client setup benchmark - {args.uploads} uploads")
+        print(f"{'mode':<12} {'first ms':>9} {'median ms':>10} {'p95 ms':>8} {'total s':>8}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = {
+                'per-upload': run(lambda: setup_per_upload(credentials_file), args.uploads),
+                'shared': run(lambda: setup_shared(youtube_config), args.uploads)
+            }
+        for name, timings in results.items():
+            ordered = sorted(timings)
+            print(f"{name:<12} {timings[0] * 1000:>9.2f} {statistics.median(timings) * 1000:>10.3f} "
+                  f"{ordered[int(len(ordered) * 0.95) - 1] * 1000:>8.3f} {sum(timings):>8.2f}")
+
+        pool = get_shared_uploader(youtube_config)._pool.stats()
+        print(f"\nService pool: {pool['created']} build, {pool['reused']} lần dùng lại")
+    finally:
+        reset_shared_uploader()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark upload YouTube với server giả lập (benchmarks/fake_youtube_api.py)
+
+Với mỗi profile lỗi (clean, latency, slow-link, flaky, unstable, quota) chạy
+server giả lập mới, upload video ngẫu nhiên bằng YouTubeUploader (api_root trỏ
+tới server) rồi báo thời gian hoàn tất, MB/s, số lỗi server đã giả lập và số
+thread phía client lúc cao nhất. Dùng credentials giả nên không gọi tới Google.
+
+--engine asyncio upload mọi file từ một thread qua upload_videos_concurrently
+(event loop nền) thay cho một thread mỗi upload.
+
+Usage:
+    python benchmarks/youtube_upload_benchmark.py --size-mb 32
+    python benchmarks/youtube_upload_benchmark.py --profile flaky --parallel 4
+    python benchmarks/youtube_upload_benchmark.py --profile latency --parallel 32 --engine asyncio
+"""
+import argparse
+import contextlib
+import io
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.oauth2.credentials import Credentials
+
+from fake_youtube_api import FakeYouTubeAPI, PROFILES
+from src.youtube_uploader import YouTubeUploader
+
+
+def make_files(workdir, count, size_mb):
+    paths = []
+    for i in range(count):
+        path = os.path.join(workdir, f'video_{i}.mp4')
+        with open(path, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        paths.append(path)
+    thumbnail = os.path.join(workdir, 'thumbnail.jpg')
+    with open(thumbnail, 'wb') as f:
+        f.write(os.urandom(100 * 1024))
+    return paths, thumbnail
+
+
+class ThreadSampler:
+    """
+    Đếm số thread phía client lúc cao nhất (bỏ thread xử lý request của server giả lập)
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            count = sum(1 for t in threading.enumerate() if 'process_request_thread' not in t.name)
+            self.peak = max(self.peak, count - 1)  # Không tính thread sampler
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_profile(profile, workdir, video_paths, thumbnail, chunk_mb, retry_base_delay, engine):
+    """
+    Upload các file song song lên server giả lập của profile
+
+    Returns:
+        (giây, list kết quả upload_video, stats của server, số thread client cao nhất)
+    """
+    credentials_file = os.path.join(workdir, 'token.pickle')
+    with FakeYouTubeAPI.from_profile(profile) as server:
+        uploader = YouTubeUploader(
+            client_secrets_file=os.path.join(workdir, 'client_secrets.json'),
+            credentials_file=credentials_file,
+            chunk_size=chunk_mb * 1024 * 1024,
+            session_folder=os.path.join(workdir, f'sessions-{profile}'),
+            api_root=server.url,
+            retry_base_delay=retry_base_delay,
+            upload_engine=engine
+        )
+        uploads = [dict(video_path=path, title=f'Benchmark {profile} {i}',
+                        description='Fake upload', thumbnail_path=thumbnail)
+                   for i, path in enumerate(video_paths)]
+        results = [None] * len(video_paths)
+
+        def upload(index):
+            results[index] = uploader.upload_video(**uploads[index])
+
+        with ThreadSampler() as sampler:
+            started = time.perf_counter()
+            if engine == 'asyncio':
+                results = uploader.upload_videos_concurrently(uploads)
+                uploader.stop_async_engine()
+            else:
+                threads = [threading.Thread(target=upload, args=(i,)) for i in range(len(uploads))]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.perf_counter() - started
+        return elapsed, results, server.stats(), sampler.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark upload YouTube với server giả lập')
+    parser.add_argument('--size-mb', type=int, default=32, help='Kích thước mỗi video (MB)')
+    parser.add_argument('--parallel', type=int, default=1, help='Số upload chạy song song')
+    parser.add_argument('--chunk-mb', type=int, default=8, help='Chunk upload ban đầu (MB)')
+    parser.add_argument('--retry-base-delay', type=float, default=1.0,
+                        help='Thời gian chờ lần thử lại đầu tiên (giây)')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='Profile lỗi cần đo (mặc định tất cả)')
+    parser.add_argument('--engine', choices=['googleapiclient', 'asyncio'], default='googleapiclient',
+                        help='Engine upload của YouTubeUploader')
+    parser.add_argument('--verbose', action='store_true', help='In log của uploader')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-youtube-upload-')
+    try:
+        with open(os.path.join(workdir, 'token.pickle'), 'wb') as token:
+            pickle.dump(Credentials(token='benchmark-token'), token)
+        video_paths, thumbnail = make_files(workdir, args.parallel, args.size_mb)
+        total_mb = args.size_mb * args.parallel
+
+        print(f"YouTube upload benchmark - {args.parallel} x {args.size_mb} MB, chunk {args.chunk_mb} MB, "
+              f"engine {args.engine}")
+        print(f"{'profile':<10} {'ok':>4} {'seconds':>8} {'MB/s':>7} {'chunks':>7} "
+              f"{'5xx':>4} {'resets':>6} {'retries':>7} {'backoff s':>9} {'requests':>8} {'threads':>7}  lỗi")
+        for profile in args.profile or list(PROFILES):
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                elapsed, results, stats, threads = run_profile(profile, workdir, video_paths, thumbnail,
+                                                                args.chunk_mb, args.retry_base_delay, args.engine)
+
+            succeeded = [r for r in results if r and r.get('status') == 'success']
+            errors = sorted({(r or {}).get('reason') or (r or {}).get('message', '?')[:40]
+                             for r in results if r not in succeeded})
+            mb_per_second = total_mb / elapsed if succeeded else 0.0
+            retries = sum((r or {}).get('retries', 0) for r in results)
+            backoff = sum((r or {}).get('backoff_seconds', 0) for r in results)
+            print(f"{profile:<10} {len(succeeded):>4} {elapsed:>8.2f} {mb_per_second:>7.1f} "
+                  f"{stats['chunks']:>7} {stats['injected_errors']:>4} {stats['connection_resets']:>6} "
+                  f"{retries:>7} {backoff:>9.1f} "
+                  f"{stats['requests']:>8} {threads:>7}  {', '.join(errors)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,51 @@ load_dotenv()
 
 # Database Configuration
 DATA_CONFIG = {
+    'backend': os.getenv('DATABASE_BACKEND', 'json').lower(),  # 'json' hoặc 'sqlite'
+    'sqlite_file': os.getenv('SQLITE_DATABASE_FILE', 'data/videos_database.sqlite3'),
     'storage_file': os.getenv('DATABASE_FILE', 'data/videos_database.json'),
+    'storage_format': os.getenv('DATABASE_FORMAT', 'json').lower(),  # định dạng snapshot JSON backend: json, jsonl, msgpack
     'backup_enabled': os.getenv('BACKUP_ENABLED', 'true').lower() == 'true',
-    'csv_export_path': os.getenv('CSV_EXPORT_PATH', 'data/videos_export.csv')
+    'csv_export_path': os.getenv('CSV_EXPORT_PATH', 'data/videos_export.csv'),
+    'journal_fsync_interval': float(os.getenv('JOURNAL_FSYNC_INTERVAL', '1.0')),  # giây giữa hai lần fsync journal, 0 = mỗi lần ghi
+    'journal_compact_threshold': int(os.getenv('JOURNAL_COMPACT_THRESHOLD', '1000'))  # số dòng journal trước khi ghi snapshot mới
+}
+
+# Job Retention Configuration
+JOB_CONFIG = {
+    'retention_seconds': int(os.getenv('JOB_RETENTION_SECONDS', '3600')),  # giữ job đã xong trong RAM bao lâu
+    'max_finished_jobs': int(os.getenv('JOB_MAX_FINISHED', '200')),  # số job đã xong tối đa trong RAM
+    'archive_file': os.getenv('JOB_ARCHIVE_FILE', 'data/jobs_archive.jsonl'),
+    'archive_max_bytes': int(os.getenv('JOB_ARCHIVE_MAX_BYTES', str(50 * 1024 * 1024))),  # 0 = không xoay vòng
+    'archive_backup_count': int(os.getenv('JOB_ARCHIVE_BACKUP_COUNT', '3')),  # số file archive cũ giữ lại
+    # Render (CPU) và upload YouTube (mạng) chạy trên hai pool riêng
+    'render_workers': int(os.getenv('RENDER_WORKERS', str(max(1, (os.cpu_count() or 2) // 2)))),
+    'upload_workers': int(os.getenv('UPLOAD_WORKERS', '4'))
+}
+
+# Resumable Upload Configuration (upload chia chunk qua /api/uploads)
+RESUMABLE_CONFIG = {
+    'session_folder': os.getenv('UPLOAD_SESSION_FOLDER', 'temp/uploads'),
+    'session_ttl': int(os.getenv('UPLOAD_SESSION_TTL', '86400')),  # session hết hạn sau 24h không hoạt động
+    'max_upload_size': int(os.getenv('UPLOAD_MAX_SIZE', str(1024 * 1024 * 1024))),
+    'chunk_size': int(os.getenv('UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024))),  # kích thước chunk gợi ý cho client
+    'max_chunk_size': int(os.getenv('UPLOAD_MAX_CHUNK_SIZE', str(64 * 1024 * 1024)))
+}
+
+# Upload Log Configuration (log các lần upload trực tiếp, JSONL append-only)
+UPLOAD_LOG_CONFIG = {
+    'log_file': os.getenv('UPLOAD_LOG_FILE', 'logs/direct_uploads.jsonl'),
+    'legacy_file': 'logs/direct_uploads.json',  # log cũ dạng JSON array, được chuyển tự động
+    'rotate': os.getenv('UPLOAD_LOG_ROTATE', 'size').lower(),  # 'size' hoặc 'daily'
+    'max_bytes': int(os.getenv('UPLOAD_LOG_MAX_BYTES', str(10 * 1024 * 1024))),
+    'backup_count': int(os.getenv('UPLOAD_LOG_BACKUP_COUNT', '10'))  # số file cũ giữ lại, 0 = tất cả
+}
+
+# Download Configuration
+DOWNLOAD_CONFIG = {
+    # Bật khi chạy sau nginx: Flask chỉ trả header X-Accel-Redirect, nginx gửi file
+    'accel_redirect': os.getenv('DOWNLOAD_ACCEL_REDIRECT', 'false').lower() == 'true',
+    'accel_prefix': os.getenv('DOWNLOAD_ACCEL_PREFIX', '/protected-output/')
 }
 
 # YouTube Configuration
@@ -20,7 +62,28 @@ YOUTUBE_CONFIG = {
     'credentials_file': 'token.pickle',
     'default_privacy': 'public',  # public, private, unlisted
     'category_id': '22',  # 22 = People & Blogs
-    'default_tags': ['Shorts', 'YouTube Shorts', 'Video']
+    'default_tags': ['Shorts', 'YouTube Shorts', 'Video'],
+    # Chunk upload ban đầu/tối đa - kích thước thực tế tự điều chỉnh theo thông lượng (bội số 256KB)
+    'upload_chunk_size': int(os.getenv('YOUTUBE_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024))),
+    'upload_max_chunk_size': int(os.getenv('YOUTUBE_UPLOAD_MAX_CHUNK_SIZE', str(64 * 1024 * 1024))),
+    # Upload hàng loạt: số upload song song, tốc độ bắt đầu upload và quota API mỗi ngày
+    'max_concurrent_uploads': int(os.getenv('YOUTUBE_MAX_CONCURRENT_UPLOADS', '2')),
+    'requests_per_second': float(os.getenv('YOUTUBE_REQUESTS_PER_SECOND', '0.5')),
+    'daily_quota': int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000')),
+    'quota_ledger_file': os.getenv('YOUTUBE_QUOTA_LEDGER_FILE', 'data/youtube_quota.json'),
+    # Session URI + offset của upload đang dở, để upload lại cùng file thì gửi tiếp thay vì từ đầu
+    'upload_session_folder': os.getenv('YOUTUBE_UPLOAD_SESSION_FOLDER', 'data/youtube_sessions'),
+    # Lỗi tạm thời (5xx, timeout, mất kết nối): số lần thử lại liên tiếp và thời gian chờ đầu tiên (giây, x2 mỗi lần)
+    'upload_max_retries': int(os.getenv('YOUTUBE_UPLOAD_MAX_RETRIES', '5')),
+    'upload_retry_base_delay': float(os.getenv('YOUTUBE_UPLOAD_RETRY_BASE_DELAY', '1.0')),
+    # Số giây cache kết quả videos.list/channels.list (thống kê view, like...)
+    'metadata_cache_ttl': int(os.getenv('YOUTUBE_METADATA_CACHE_TTL', '300')),
+    # Engine upload: googleapiclient (mỗi upload chiếm một thread) hoặc asyncio
+    # (mọi upload chạy trên một event loop nền, dùng chung pool kết nối)
+    'upload_engine': os.getenv('YOUTUBE_UPLOAD_ENGINE', 'googleapiclient'),
+    # Gốc URL của YouTube Data API - để trống dùng Google; đặt http://127.0.0.1:8090/
+    # để chạy với server giả lập (benchmarks/fake_youtube_api.py)
+    'api_root': os.getenv('YOUTUBE_API_ROOT') or None
 }
 
 # Video Processing Configuration
@@ -37,6 +100,8 @@ VIDEO_CONFIG = {
     'background_style': os.getenv('BACKGROUND_STYLE', 'blur'),  # blur, gradient, solid
     'banner_intro_path': os.getenv('DEFAULT_INTRO_PATH', 'assets/intro.png'),
     'banner_outro_path': os.getenv('DEFAULT_OUTRO_PATH', 'assets/outro.png'),
+    'ingest_chunk_size': int(os.getenv('INGEST_CHUNK_SIZE', str(4 * 1024 * 1024))),  # block ghi khi nhận upload
+    'output_index_interval': int(os.getenv('OUTPUT_INDEX_INTERVAL', '60')),  # giây giữa các lần quét lại thư mục output
 }
 
 # Supported video formats
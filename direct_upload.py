@@ -6,12 +6,25 @@ import os
 import sys
 import argparse
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 
 # Import module YouTube uploader
-from src.youtube_uploader import YouTubeUploader
-from config import YOUTUBE_CONFIG, setup_directories
+from src.youtube_client import get_shared_uploader
+from src.upload_log import UploadLog, convert_json_log
+from src.upload_scheduler import UploadScheduler, upload_cost
+from config import YOUTUBE_CONFIG, UPLOAD_LOG_CONFIG, setup_directories
+
+
+def create_upload_scheduler():
+    """Tạo scheduler upload hàng loạt theo YOUTUBE_CONFIG"""
+    return UploadScheduler(
+        max_concurrent=YOUTUBE_CONFIG['max_concurrent_uploads'],
+        requests_per_second=YOUTUBE_CONFIG['requests_per_second'],
+        # Cùng sổ quota với uploader dùng chung để phần giữ chỗ và phần đã dùng khớp nhau
+        ledger=get_shared_uploader(YOUTUBE_CONFIG).quota_ledger
+    )
 
 
 def direct_upload_video(video_path, title=None, description=None, tags=None, 
@@ -69,10 +82,7 @@ Thời gian upload: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
     
     # Khởi tạo uploader
     try:
-        uploader = YouTubeUploader(
-            client_secrets_file=YOUTUBE_CONFIG['client_secrets_file'],
-            credentials_file=YOUTUBE_CONFIG['credentials_file']
-        )
+        uploader = get_shared_uploader(YOUTUBE_CONFIG)
     except Exception as e:
         return {'status': 'error', 'message': f'Lỗi khởi tạo uploader: {str(e)}'}
     
@@ -135,27 +145,23 @@ def upload_from_folder(folder_path, privacy='public', filter_ext=None):
         print(f"❌ Không tìm thấy video nào trong folder: {folder_path}")
         return []
     
+    scheduler = create_upload_scheduler()
+    quota = scheduler.ledger.snapshot()
     print(f"📂 Tìm thấy {len(video_files)} video trong folder")
-    print("🕐 Bắt đầu upload batch...")
+    print(f"🕐 Bắt đầu upload batch ({scheduler.max_concurrent} song song, "
+          f"quota còn {quota['remaining']}/{quota['limit']} unit)...")
     
-    results = []
-    for i, video_path in enumerate(video_files, 1):
-        print(f"\n[{i}/{len(video_files)}] Processing: {os.path.basename(video_path)}")
-        
-        result = direct_upload_video(
-            video_path=video_path,
-            privacy=privacy
-        )
-        results.append({
-            'file': video_path,
-            'result': result
-        })
-        
-        # Delay giữa các upload
-        if i < len(video_files):
-            print("⏳ Đợi 15 giây trước video tiếp theo...")
-            import time
-            time.sleep(15)
+    def make_task(i, video_path):
+        def upload():
+            print(f"\n[{i}/{len(video_files)}] Processing: {os.path.basename(video_path)}")
+            return direct_upload_video(
+                video_path=video_path,
+                privacy=privacy
+            )
+        return os.path.basename(video_path), upload, upload_cost()
+    
+    upload_results = scheduler.run(make_task(i, path) for i, path in enumerate(video_files, 1))
+    results = [{'file': path, 'result': result} for path, result in zip(video_files, upload_results)]
     
     # Tổng kết
     success_count = sum(1 for r in results if r['result']['status'] == 'success')
@@ -166,23 +172,39 @@ def upload_from_folder(folder_path, privacy='public', filter_ext=None):
     return results
 
 
+_upload_log = None
+_upload_log_lock = threading.Lock()
+
+
+def open_upload_log():
+    """Upload log JSONL dùng chung trong process (lần mở đầu tiên chuyển log JSON cũ sang nếu còn)"""
+    global _upload_log
+    with _upload_log_lock:
+        if _upload_log is not None:
+            return _upload_log
+        
+        upload_log = UploadLog(
+            UPLOAD_LOG_CONFIG['log_file'],
+            max_bytes=UPLOAD_LOG_CONFIG['max_bytes'],
+            rotate=UPLOAD_LOG_CONFIG['rotate'],
+            backup_count=UPLOAD_LOG_CONFIG['backup_count']
+        )
+        
+        legacy_file = UPLOAD_LOG_CONFIG['legacy_file']
+        if os.path.exists(legacy_file):
+            try:
+                count = convert_json_log(legacy_file, upload_log)
+                if count:
+                    print(f"📦 Đã chuyển {count} entry từ {legacy_file} sang {upload_log.log_file}")
+            except Exception as e:
+                print(f"⚠️  Không thể chuyển log cũ {legacy_file}: {e}")
+        
+        _upload_log = upload_log
+        return upload_log
+
+
 def save_upload_log(result):
-    """Lưu thông tin upload vào file log"""
-    log_file = 'logs/direct_uploads.json'
-    
-    # Tạo folder logs nếu chưa có
-    os.makedirs('logs', exist_ok=True)
-    
-    # Load existing data
-    log_data = []
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                log_data = json.load(f)
-        except:
-            log_data = []
-    
-    # Add new entry
+    """Lưu thông tin upload vào file log (append một dòng JSONL)"""
     log_entry = {
         'timestamp': datetime.now().isoformat(),
         'video_id': result.get('video_id'),
@@ -193,17 +215,27 @@ def save_upload_log(result):
         'privacy_status': result.get('privacy_status'),
         'tags': result.get('tags', [])
     }
-    log_data.append(log_entry)
     
-    # Save to file
     try:
-        with open(log_file, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, indent=2, ensure_ascii=False)
-        print(f"📝 Đã lưu thông tin upload vào {log_file}")
+        upload_log = open_upload_log()
+        upload_log.append(log_entry)
+        print(f"📝 Đã lưu thông tin upload vào {upload_log.log_file}")
     except Exception as e:
         print(f"⚠️  Không thể lưu log: {e}")
 
 
+def show_upload_log(count=20):
+    """Hiển thị các upload gần nhất trong log"""
+    entries = open_upload_log().tail(count)
+    if not entries:
+        print("Chưa có upload nào trong log")
+        return
+    
+    for entry in entries:
+        print(f"{(entry.get('timestamp') or '')[:19]}  {entry.get('video_id', 'N/A'):<12} "
+              f"{entry.get('shorts_url') or entry.get('video_url') or ''}  {entry.get('title') or ''}")
+
+
 def load_metadata_from_file(metadata_file):
     """
     Load metadata cho video từ file JSON
@@ -274,6 +306,9 @@ Ví dụ sử dụng:
   
   # Tạo template metadata
   python direct_upload.py --create-template
+  
+  # Xem 50 upload gần nhất
+  python direct_upload.py --log 50
         """
     )
     
@@ -337,6 +372,15 @@ Ví dụ sử dụng:
         help='Tạo template file metadata'
     )
     
+    parser.add_argument(
+        '--log',
+        nargs='?',
+        type=int,
+        const=20,
+        metavar='N',
+        help='Hiển thị N upload gần nhất trong log (default: 20)'
+    )
+    
     args = parser.parse_args()
     
     # Setup directories
@@ -347,6 +391,10 @@ Ví dụ sử dụng:
         create_metadata_template()
         return
     
+    if args.log is not None:
+        show_upload_log(args.log)
+        return
+    
     # Parse tags
     tags = None
     if args.tags:
@@ -367,12 +415,12 @@ Ví dụ sử dụng:
         if metadata:
             # Upload với metadata
             print("📋 Sử dụng metadata từ file...")
-            results = []
-            for filename, meta in metadata.items():
-                video_path = os.path.join(args.folder, filename)
-                if os.path.exists(video_path):
+            scheduler = create_upload_scheduler()
+            
+            def make_task(filename, video_path, meta):
+                def upload():
                     print(f"\n📤 Upload: {filename}")
-                    result = direct_upload_video(
+                    return direct_upload_video(
                         video_path=video_path,
                         title=meta.get('title'),
                         description=meta.get('description'),
@@ -380,13 +428,16 @@ Ví dụ sử dụng:
                         privacy=meta.get('privacy', args.privacy),
                         category_id=meta.get('category_id', args.category)
                     )
-                    results.append({'file': filename, 'result': result})
-                    
-                    # Delay
-                    import time
-                    time.sleep(15)
+                return filename, upload, upload_cost()
+            
+            tasks = []
+            for filename, meta in metadata.items():
+                video_path = os.path.join(args.folder, filename)
+                if os.path.exists(video_path):
+                    tasks.append(make_task(filename, video_path, meta))
                 else:
                     print(f"⚠️  File không tồn tại: {video_path}")
+            scheduler.run(tasks)
         else:
             # Upload folder bình thường
             results = upload_from_folder(args.folder, args.privacy, filter_ext)
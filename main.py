@@ -8,14 +8,23 @@ import argparse
 from datetime import datetime
 
 # Import các module đã tạo
-from src import VideoProcessor, process_batch_videos, YouTubeUploader, batch_upload_videos, JsonStorageHandler
+from src import VideoProcessor, process_batch_videos, get_shared_uploader, get_storage_handler
+from src.exporter import EXPORT_FORMATS, export_to_file
+from src.youtube_metadata import refresh_youtube_stats
 from config import (
-    YOUTUBE_CONFIG, VIDEO_CONFIG, 
+    YOUTUBE_CONFIG, VIDEO_CONFIG, DATA_CONFIG,
     SUPPORTED_FORMATS,
     setup_directories, validate_config
 )
 
 
+def open_storage():
+    """
+    Lấy storage backend (JSON hoặc SQLite) theo DATA_CONFIG - một handler dùng chung cho cả process
+    """
+    return get_storage_handler(DATA_CONFIG)
+
+
 def process_single_video(input_video, auto_upload=False, save_to_db=True):
     """
     Xử lý một video đơn lẻ
@@ -69,7 +78,7 @@ def process_single_video(input_video, auto_upload=False, save_to_db=True):
         video_id = None
         if save_to_db:
             try:
-                storage_handler = JsonStorageHandler()
+                storage_handler = open_storage()
                 video_id = storage_handler.save_video_info(video_data)
                 print(f"\n✓ Đã lưu thông tin vào database")
                 print(f"  Video ID: {video_id}")
@@ -85,10 +94,7 @@ def process_single_video(input_video, auto_upload=False, save_to_db=True):
             print("=" * 50)
             
             try:
-                uploader = YouTubeUploader(
-                    client_secrets_file=YOUTUBE_CONFIG['client_secrets_file'],
-                    credentials_file=YOUTUBE_CONFIG['credentials_file']
-                )
+                uploader = get_shared_uploader(YOUTUBE_CONFIG)
                 
                 # Chuẩn bị metadata cho YouTube
                 title = f"{base_name} - {datetime.now().strftime('%d/%m/%Y')}"
@@ -112,7 +118,7 @@ def process_single_video(input_video, auto_upload=False, save_to_db=True):
                     # Cập nhật database với thông tin YouTube
                     if video_id and save_to_db:
                         try:
-                            storage_handler = JsonStorageHandler()
+                            storage_handler = open_storage()
                             storage_handler.update_youtube_info(video_id, upload_result)
                             storage_handler.close_connection()
                         except Exception as e:
@@ -173,7 +179,7 @@ def process_folder(input_folder, auto_upload=False, save_to_db=True):
 def show_statistics():
     """Hiển thị thống kê từ database"""
     try:
-        storage_handler = JsonStorageHandler()
+        storage_handler = open_storage()
         
         stats = storage_handler.get_statistics()
         recent_videos = storage_handler.get_all_videos(limit=5)
@@ -208,6 +214,76 @@ def show_statistics():
         print(f"Lỗi khi lấy thống kê: {e}")
 
 
+def show_history(limit=20, before=None):
+    """Hiển thị lịch sử video theo trang (mới nhất trước)"""
+    try:
+        storage_handler = open_storage()
+        videos = storage_handler.get_videos_page(limit=limit, before=before)
+        
+        print("\n" + "=" * 50)
+        print("LỊCH SỬ VIDEO")
+        print("=" * 50)
+        for video in videos:
+            input_name = os.path.basename(video.get('input_video') or 'Unknown')
+            print(f"{video.get('processing_date', '')[:19]}  {video.get('processing_status', 'N/A'):<8} {input_name}")
+        
+        if len(videos) == limit:
+            print(f"\nTrang tiếp theo: --history --before {videos[-1]['id']}")
+        elif not videos:
+            print("Không có video nào")
+        
+        storage_handler.close_connection()
+        
+    except Exception as e:
+        print(f"Lỗi khi lấy lịch sử: {e}")
+
+
+def find_videos(text=None, limit=20, **filters):
+    """Tìm video theo tên file/tiêu đề và bộ lọc (mới nhất trước)"""
+    try:
+        storage_handler = open_storage()
+        total, videos = storage_handler.query(text=text, limit=limit, **filters)
+        
+        print("\n" + "=" * 50)
+        print(f"KẾT QUẢ TÌM KIẾM: {total} video")
+        print("=" * 50)
+        for video in videos:
+            input_name = os.path.basename(video.get('input_video') or 'Unknown')
+            youtube_url = (video.get('youtube_info') or {}).get('shorts_url', '')
+            print(f"{video.get('processing_date', '')[:19]}  {video.get('processing_status', 'N/A'):<8} "
+                  f"{video['id']}  {input_name}  {youtube_url}")
+        
+        if total > len(videos):
+            print(f"\nĐang hiển thị {len(videos)}/{total} video (tăng --limit để xem thêm)")
+        
+        storage_handler.close_connection()
+        
+    except Exception as e:
+        print(f"Lỗi khi tìm video: {e}")
+
+
+def refresh_stats():
+    """Cập nhật view/like/comment của mọi video đã upload (videos.list theo lô 50 id)"""
+    try:
+        uploader = get_shared_uploader(YOUTUBE_CONFIG)
+        if not uploader.authenticated:
+            print("Lỗi: Chưa xác thực với YouTube API")
+            return
+        storage_handler = open_storage()
+        summary = refresh_youtube_stats(storage_handler, uploader)
+        storage_handler.close_connection()
+        
+        print(f"✓ Đã cập nhật thống kê {summary['updated']}/{summary['videos']} video "
+              f"với {summary['api_calls']} lệnh videos.list")
+        if summary['missing']:
+            print(f"  {summary['missing']} video không còn trên YouTube")
+        if summary['failed']:
+            print(f"  {summary['failed']} video chưa cập nhật được do lỗi API")
+        
+    except Exception as e:
+        print(f"Lỗi khi cập nhật thống kê YouTube: {e}")
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
@@ -240,7 +316,76 @@ def main():
     parser.add_argument(
         '--export',
         action='store_true',
-        help='Export dữ liệu ra file CSV'
+        help='Export dữ liệu ra file CSV/JSONL (dùng với --format, --output và các bộ lọc)'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=EXPORT_FORMATS,
+        default='csv',
+        help='Định dạng file export'
+    )
+    
+    parser.add_argument(
+        '--output',
+        help='File export (mặc định CSV_EXPORT_PATH, đổi đuôi theo --format)'
+    )
+    
+    parser.add_argument(
+        '--from',
+        dest='date_from',
+        help='Chỉ lấy video xử lý từ ngày này (ISO, ví dụ 2025-01-01) khi --export/--find'
+    )
+    
+    parser.add_argument(
+        '--to',
+        dest='date_to',
+        help='Chỉ lấy video xử lý đến hết ngày này (ISO) khi --export/--find'
+    )
+    
+    parser.add_argument(
+        '--status',
+        help='Chỉ lấy video có processing status này (success, error, ...)'
+    )
+    
+    parser.add_argument(
+        '--youtube-status',
+        help='Chỉ lấy video có YouTube status này (success, none, ...)'
+    )
+    
+    parser.add_argument(
+        '--find',
+        metavar='TEXT',
+        help='Tìm video theo từ trong tên file/tiêu đề (dùng với --status, --from, --to, --limit)'
+    )
+    
+    parser.add_argument(
+        '--youtube-id',
+        help='Tìm video theo YouTube video id'
+    )
+    
+    parser.add_argument(
+        '--history',
+        action='store_true',
+        help='Hiển thị lịch sử video theo trang (dùng với --before, --limit)'
+    )
+    
+    parser.add_argument(
+        '--before',
+        help='Video id hoặc ngày (ISO) - chỉ lấy video cũ hơn mốc này'
+    )
+    
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Số video mỗi trang khi dùng --history/--find'
+    )
+    
+    parser.add_argument(
+        '--refresh-stats',
+        action='store_true',
+        help='Cập nhật view/like/comment từ YouTube cho mọi video đã upload'
     )
     
     parser.add_argument(
@@ -256,18 +401,25 @@ def main():
     
     # Validate configuration
     errors = validate_config()
-    if errors and not args.stats and not args.export:
+    searching = args.find is not None or args.youtube_id
+    if errors and not args.stats and not args.export and not args.history and not searching \
+            and not args.refresh_stats:
         print("LỖI CẤU HÌNH:")
         for error in errors:
             print(f"  - {error}")
         print("\nVui lòng kiểm tra lại cấu hình và thử lại.")
         sys.exit(1)
     
-    # Export to CSV if requested
+    # Export to CSV/JSONL if requested
     if args.export:
-        storage_handler = JsonStorageHandler()
-        if storage_handler.export_to_csv():
-            print("✓ Export thành công!")
+        output_file = args.output or os.path.splitext(DATA_CONFIG['csv_export_path'])[0] + f'.{args.format}'
+        storage_handler = open_storage()
+        count = export_to_file(
+            storage_handler, output_file, args.format,
+            date_from=args.date_from, date_to=args.date_to,
+            processing_status=args.status, youtube_status=args.youtube_status
+        )
+        print(f"✓ Đã export {count} videos ra file: {output_file}")
         storage_handler.close_connection()
         return
     
@@ -276,6 +428,22 @@ def main():
         show_statistics()
         return
     
+    if args.history:
+        show_history(args.limit, args.before)
+        return
+    
+    if args.refresh_stats:
+        refresh_stats()
+        return
+    
+    if searching:
+        find_videos(
+            args.find, args.limit,
+            processing_status=args.status, youtube_status=args.youtube_status,
+            youtube_video_id=args.youtube_id, date_from=args.date_from, date_to=args.date_to
+        )
+        return
+    
     # Direct upload mode
     if args.direct_upload:
         from direct_upload import direct_upload_video
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script migrate database JSON (snapshot + journal) sang SQLite, hoặc đổi định dạng snapshot
+
+Usage:
+    python migrate_storage.py
+    python migrate_storage.py --json data/videos_database.json --sqlite data/videos_database.sqlite3
+    python migrate_storage.py --convert jsonl     # json <-> jsonl <-> msgpack, không mất dữ liệu
+"""
+import argparse
+import os
+import sys
+import time
+
+from src.json_storage import JsonStorageHandler, STORAGE_FORMATS
+from src.sqlite_storage import SqliteStorageHandler
+from config import DATA_CONFIG
+
+
+def migrate(json_file, sqlite_file, batch_size=5000):
+    """
+    Copy toàn bộ video từ JSON sang SQLite (giữ nguyên id, chạy lại nhiều lần vẫn an toàn)
+
+    Returns:
+        Số video đã migrate
+    """
+    if not os.path.exists(json_file) and not os.path.exists(f"{json_file}.journal"):
+        print(f"❌ Không tìm thấy file JSON: {json_file}")
+        return 0
+
+    started = time.time()
+    source = JsonStorageHandler(json_file)
+    target = SqliteStorageHandler(sqlite_file)
+
+    videos = source.get_all_videos()
+    last_updated = source.data['statistics'].get('last_updated')
+    migrated = 0
+    for start in range(0, len(videos), batch_size):
+        migrated += target.import_videos(videos[start:start + batch_size], last_updated)
+        print(f"   {migrated}/{len(videos)} videos")
+
+    source.close_connection()
+    target.close_connection()
+
+    print(f"✅ Đã migrate {migrated} videos sang {sqlite_file} trong {time.time() - started:.2f}s")
+    return migrated
+
+
+def convert(json_file, storage_format):
+    """
+    Ghi lại snapshot theo định dạng mới (gộp luôn journal)
+
+    Returns:
+        True nếu thành công
+    """
+    if not os.path.exists(json_file) and not os.path.exists(f"{json_file}.journal"):
+        print(f"❌ Không tìm thấy database: {json_file}")
+        return False
+
+    started = time.time()
+    storage = JsonStorageHandler(json_file, storage_format=storage_format)
+    source_format = storage.snapshot_format or 'journal'
+    ok = storage.compact()
+    storage.close_connection()
+
+    if ok:
+        print(f"✅ Đã chuyển {json_file}: {source_format} -> {storage.storage_format} "
+              f"trong {time.time() - started:.2f}s")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate database JSON sang SQLite')
+    parser.add_argument('--json', default=DATA_CONFIG['storage_file'], help='File JSON nguồn')
+    parser.add_argument('--sqlite', default=DATA_CONFIG['sqlite_file'], help='File SQLite đích')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Số video mỗi transaction')
+    parser.add_argument('--convert', choices=STORAGE_FORMATS,
+                        help='Chỉ đổi định dạng snapshot JSON backend (không migrate sang SQLite)')
+    args = parser.parse_args()
+
+    if args.convert:
+        print("🔄 CHUYỂN ĐỊNH DẠNG SNAPSHOT")
+        print("=" * 50)
+        print(f"\n💡 Đặt DATABASE_FORMAT={args.convert} để giữ định dạng này khi compact")
+        sys.exit(0 if convert(args.json, args.convert) else 1)
+
+    print("🔄 MIGRATE JSON -> SQLITE")
+    print("=" * 50)
+    migrate(args.json, args.sqlite, args.batch_size)
+
+    print("\n💡 Đặt DATABASE_BACKEND=sqlite để dùng database mới")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ import sys
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.youtube_uploader import YouTubeUploader
+from src.youtube_client import get_shared_uploader
 from config import YOUTUBE_CONFIG, setup_directories
 
 
@@ -32,10 +32,7 @@ def quick_upload(video_path, title=None):
     
     try:
         # Tạo uploader
-        uploader = YouTubeUploader(
-            client_secrets_file=YOUTUBE_CONFIG['client_secrets_file'],
-            credentials_file=YOUTUBE_CONFIG['credentials_file']
-        )
+        uploader = get_shared_uploader(YOUTUBE_CONFIG)
         
         # Upload video
         result = uploader.upload_video(
@@ -4,12 +4,19 @@ Video Processing Package
 
 from .video_processor import VideoProcessor, process_batch_videos
 from .youtube_uploader import YouTubeUploader, batch_upload_videos  
+from .youtube_client import get_shared_uploader
 from .json_storage import JsonStorageHandler
+from .sqlite_storage import SqliteStorageHandler
+from .storage import create_storage_handler, get_storage_handler
 
 __all__ = [
     'VideoProcessor',
     'process_batch_videos',
     'YouTubeUploader', 
     'batch_upload_videos',
-    'JsonStorageHandler'
+    'get_shared_uploader',
+    'JsonStorageHandler',
+    'SqliteStorageHandler',
+    'create_storage_handler',
+    'get_storage_handler'
 ]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Module chọn kích thước chunk upload YouTube theo thông lượng đo được
+
+Resumable upload của YouTube gửi mỗi chunk bằng một HTTP request tuần tự, nên
+chunk nhỏ trên đường truyền có độ trễ cao làm thông lượng thấp hơn nhiều so
+với băng thông thực. AdaptiveChunkSize bắt đầu ở kích thước vừa phải, tăng
+gấp đôi khi thông lượng của chunk đầy đủ vẫn còn cải thiện, dừng tăng khi
+không cải thiện nữa và giảm một nửa sau lỗi. Kích thước luôn là bội số của
+256 KiB theo yêu cầu của API (trừ chunk cuối cùng).
+"""
+import time
+from typing import Dict, Optional
+
+from googleapiclient.http import MediaFileUpload
+
+
+CHUNK_ALIGNMENT = 256 * 1024
+
+
+def align_chunk_size(size: int) -> int:
+    """
+    Làm tròn xuống bội số 256 KiB (tối thiểu 256 KiB)
+    """
+    return max(CHUNK_ALIGNMENT, size // CHUNK_ALIGNMENT * CHUNK_ALIGNMENT)
+
+
+class AdaptiveChunkSize:
+    # Thông lượng phải tăng ít nhất 10% mới coi là cải thiện
+    IMPROVEMENT = 1.10
+
+    def __init__(self, initial: int = 8 * 1024 * 1024, minimum: int = CHUNK_ALIGNMENT,
+                 maximum: int = 64 * 1024 * 1024):
+        """
+        Args:
+            initial: Kích thước chunk đầu tiên (byte)
+            minimum: Kích thước nhỏ nhất khi giảm sau lỗi
+            maximum: Kích thước lớn nhất khi tăng
+        """
+        self.minimum = align_chunk_size(minimum)
+        self.maximum = max(self.minimum, align_chunk_size(maximum))
+        self.size = min(self.maximum, max(self.minimum, align_chunk_size(initial)))
+
+        self._growing = True
+        self._best_rate = 0.0
+        self._best_size = self.size
+
+        self.bytes_sent = 0
+        self.seconds = 0.0
+        self.chunks = 0
+        self.errors = 0
+
+    def record_chunk(self, nbytes: int, seconds: float, chunk_size: Optional[int] = None):
+        """
+        Ghi nhận một chunk đã gửi xong và điều chỉnh kích thước cho chunk sau
+
+        Args:
+            nbytes: Số byte server đã nhận thêm
+            seconds: Thời gian gửi chunk
+            chunk_size: Kích thước chunk được dùng cho request đó (mặc định self.size)
+        """
+        self.bytes_sent += nbytes
+        self.seconds += seconds
+        self.chunks += 1
+
+        chunk_size = chunk_size or self.size
+        if nbytes < chunk_size or seconds <= 0:
+            # Chunk cuối (thiếu byte) không phản ánh thông lượng của kích thước này
+            return
+
+        rate = nbytes / seconds
+        if rate >= self._best_rate * self.IMPROVEMENT:
+            self._best_rate, self._best_size = rate, chunk_size
+            if self._growing and self.size < self.maximum:
+                self.size = min(self.maximum, self.size * 2)
+        elif self._growing:
+            # Tăng không còn lợi - quay về kích thước tốt nhất và giữ nguyên
+            self._growing = False
+            self.size = self._best_size
+        else:
+            self._best_rate = max(self._best_rate, rate)
+
+    def record_error(self):
+        """
+        Chunk bị lỗi - giảm một nửa và không tăng lại trong lần upload này
+        """
+        self.errors += 1
+        self._growing = False
+        self.size = max(self.minimum, align_chunk_size(self.size // 2))
+        self._best_size = self.size
+        self._best_rate = 0.0
+
+    def stats(self) -> Dict:
+        """
+        Thông lượng trung bình (MB/s), kích thước chunk cuối và thời gian upload
+        """
+        return {
+            'upload_seconds': round(self.seconds, 3),
+            'upload_mb_per_second': round(self.bytes_sent / self.seconds / (1024 * 1024), 3) if self.seconds else None,
+            'chunk_size': self.size,
+            'chunk_count': self.chunks,
+            'chunk_errors': self.errors
+        }
+
+
+class AdaptiveMediaFileUpload(MediaFileUpload):
+    """
+    MediaFileUpload lấy kích thước chunk từ AdaptiveChunkSize ở mỗi next_chunk()
+    """
+
+    def __init__(self, filename: str, controller: AdaptiveChunkSize, mimetype: Optional[str] = None):
+        self.controller = controller
+        super().__init__(filename, mimetype=mimetype, chunksize=controller.size, resumable=True)
+
+    def chunksize(self):
+        return self.controller.size
+
+    def has_stream(self):
+        # Gửi chunk dạng bytes thay cho lát cắt stream: khi kết nối rớt, httplib2 tự
+        # kết nối lại và gửi lại body - stream đã đọc dở sẽ gửi thiếu byte so với
+        # Content-Length và request treo đến khi socket timeout
+        return False
+
+
+def timed_next_chunk(request, controller: AdaptiveChunkSize, total_size: int):
+    """
+    Gọi request.next_chunk() và ghi nhận thông lượng vào controller
+
+    Returns:
+        (status, response) như next_chunk()
+    """
+    chunk_size = controller.size
+    start_offset = request.resumable_progress
+    started = time.monotonic()
+    status, response = request.next_chunk()
+    elapsed = time.monotonic() - started
+
+    end_offset = total_size if response is not None else request.resumable_progress
+    controller.record_chunk(max(0, end_offset - start_offset), elapsed, chunk_size)
+    return status, response
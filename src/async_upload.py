@@ -0,0 +1,322 @@
+"""
+Module upload YouTube resumable bằng asyncio (không dùng googleapiclient/httplib2)
+
+Mỗi upload qua googleapiclient chiếm một thread chờ next_chunk(). Module này
+cài giao thức resumable upload của YouTube Data API trên asyncio streams:
+
+- AsyncConnectionPool: HTTP/1.1 keep-alive dùng chung, body chunk được gửi bằng
+  loop.sendfile() thẳng từ file (không đọc chunk vào bộ nhớ; với HTTPS asyncio
+  tự đọc theo block)
+- AsyncYouTubeClient: tạo session (POST uploadType=resumable), PUT chunk theo
+  Content-Range, hỏi offset đã nhận (bytes */size), thumbnails.set
+- EventLoopThread: event loop chạy trên thread nền cho code đồng bộ
+
+Logic upload (session lưu đĩa, retry, quota, chunk thích ứng) nằm ở
+YouTubeUploader.upload_video_async.
+"""
+import asyncio
+import json
+import mimetypes
+import os
+import socket
+import ssl
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .upload_retry import RETRYABLE_EXCEPTIONS, RETRYABLE_STATUS_CODES
+from .upload_sessions import UploadSessionExpired
+
+
+DEFAULT_API_ROOT = 'https://youtube.googleapis.com/'
+
+
+class AsyncHTTPError(Exception):
+    """Response HTTP không như mong đợi (status, content giống HttpError của googleapiclient)"""
+
+    def __init__(self, status: int, content: bytes):
+        self.status = status
+        self.content = content
+        super().__init__(f"HTTP {status}")
+
+
+class HTTPProtocolError(Exception):
+    """Server trả về dữ liệu không đúng HTTP/1.1 (thường do kết nối bị cắt)"""
+
+
+def is_async_retryable(error: BaseException) -> bool:
+    """
+    Lỗi tạm thời của engine asyncio (5xx/429, mất kết nối, timeout, DNS)
+    """
+    if isinstance(error, AsyncHTTPError):
+        return error.status in RETRYABLE_STATUS_CODES
+    if isinstance(error, ssl.SSLCertVerificationError):
+        return False
+    return isinstance(error, RETRYABLE_EXCEPTIONS + (
+        asyncio.TimeoutError, asyncio.IncompleteReadError, HTTPProtocolError, socket.gaierror))
+
+
+class AsyncConnectionPool:
+    def __init__(self, max_idle_per_host: int = 16, timeout: float = 60.0):
+        """
+        Pool kết nối HTTP/1.1 keep-alive (dùng trên một event loop)
+
+        Args:
+            max_idle_per_host: Số kết nối rảnh giữ lại cho mỗi host
+            timeout: Giây tối đa cho một request (gửi body + nhận response)
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.created = 0
+        self.reused = 0
+        self._idle: Dict[tuple, List[tuple]] = {}
+        self._ssl_context = ssl.create_default_context()
+
+    async def _acquire(self, key: tuple) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        idle = self._idle.get(key, [])
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self._ssl_context if scheme == 'https' else None)
+        self.created += 1
+        return reader, writer, False
+
+    def _release(self, key: tuple, reader, writer, keep_alive: bool):
+        idle = self._idle.setdefault(key, [])
+        if keep_alive and len(idle) < self.max_idle_per_host:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: bytes = b'', file=None, offset: int = 0,
+                      count: int = 0) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Gửi một request
+
+        Args:
+            method, url, headers: Request
+            body: Body dạng bytes (khi không có file)
+            file: File mở ở chế độ nhị phân - gửi `count` byte từ `offset` làm body
+
+        Returns:
+            (status, headers chữ thường, content)
+        """
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        length = count if file is not None else len(body)
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", f"Content-Length: {length}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        # Kết nối keep-alive có thể đã bị server đóng - request nhỏ được gửi lại một lần
+        # trên kết nối mới; chunk (file) thì để người gọi hỏi server offset đã nhận
+        for attempt in range(2):
+            reader, writer, reused = await self._acquire(key)
+            try:
+                response = await asyncio.wait_for(
+                    self._exchange(reader, writer, method, head, body, file, offset, count), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError, HTTPProtocolError):
+                writer.close()
+                if reused and attempt == 0 and file is None:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            status, response_headers, content = response
+            self._release(key, reader, writer, response_headers.get('connection', '').lower() != 'close')
+            return response
+
+    async def _exchange(self, reader, writer, method, head, body, file, offset, count):
+        writer.write(head)
+        if file is not None:
+            if count:
+                await writer.drain()
+                await asyncio.get_running_loop().sendfile(writer.transport, file, offset, count)
+        elif body:
+            writer.write(body)
+        await writer.drain()
+        return await self._read_response(reader, method)
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader, method: str):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Server đóng kết nối trước khi trả response')
+        parts = status_line.decode('latin-1').split(' ', 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            raise HTTPProtocolError(f'Status line không hợp lệ: {status_line[:80]!r}')
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise asyncio.IncompleteReadError(b'', None)
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            content = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            pieces = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass  # Bỏ trailer
+                    break
+                pieces.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b''.join(pieces)
+        elif 'content-length' in headers:
+            content = await reader.readexactly(int(headers['content-length']))
+        else:
+            content = await reader.read()
+            headers['connection'] = 'close'
+        return status, headers, content
+
+    def close(self):
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+    def stats(self) -> Dict:
+        return {'created': self.created, 'reused': self.reused,
+                'idle': sum(len(idle) for idle in self._idle.values())}
+
+
+class AsyncYouTubeClient:
+    def __init__(self, get_token: Callable[[], str], api_root: Optional[str] = None,
+                 pool: Optional[AsyncConnectionPool] = None):
+        """
+        Client các request upload của YouTube Data API v3
+
+        Args:
+            get_token: Hàm đồng bộ trả access token còn hạn (refresh nếu cần) -
+                chạy trong executor để không chặn event loop
+            api_root: Gốc URL của API (None = Google)
+            pool: Pool kết nối dùng chung (mặc định tạo mới)
+        """
+        self.get_token = get_token
+        self.api_root = (api_root or DEFAULT_API_ROOT).rstrip('/') + '/'
+        self.pool = pool or AsyncConnectionPool()
+
+    async def _headers(self, extra: Dict[str, str]) -> Dict[str, str]:
+        token = await asyncio.get_running_loop().run_in_executor(None, self.get_token)
+        return {'Authorization': f'Bearer {token}', **extra}
+
+    async def create_session(self, body: Dict, size: int, mimetype: str = 'video/*') -> str:
+        """
+        Tạo session resumable upload cho videos.insert
+
+        Returns:
+            Session URI
+        """
+        query = urlencode({'uploadType': 'resumable', 'part': ','.join(body.keys())})
+        payload = json.dumps(body).encode('utf-8')
+        headers = await self._headers({
+            'Content-Type': 'application/json; charset=UTF-8',
+            'X-Upload-Content-Type': mimetype,
+            'X-Upload-Content-Length': str(size)
+        })
+        status, response_headers, content = await self.pool.request(
+            'POST', f"{self.api_root}upload/youtube/v3/videos?{query}", headers, body=payload)
+        if status != 200 or 'location' not in response_headers:
+            raise AsyncHTTPError(status, content)
+        return response_headers['location']
+
+    @staticmethod
+    def _progress(status: int, headers: Dict[str, str], content: bytes, size: int) -> Tuple[int, Optional[Dict]]:
+        if status in (200, 201):
+            return size, json.loads(content.decode('utf-8'))
+        if status == 308:
+            # Range: bytes=0-<byte cuối> ; không có header = chưa nhận byte nào
+            byte_range = headers.get('range')
+            return (int(byte_range.rsplit('-', 1)[1]) + 1 if byte_range else 0), None
+        raise AsyncHTTPError(status, content)
+
+    async def put_chunk(self, session_uri: str, file, offset: int, count: int,
+                        size: int) -> Tuple[int, Optional[Dict]]:
+        """
+        Gửi `count` byte của file từ `offset`
+
+        Returns:
+            (offset server đã xác nhận, resource video khi upload hoàn tất)
+        """
+        headers = await self._headers({'Content-Range': f'bytes {offset}-{offset + count - 1}/{size}'})
+        status, response_headers, content = await self.pool.request(
+            'PUT', session_uri, headers, file=file, offset=offset, count=count)
+        return self._progress(status, response_headers, content, size)
+
+    async def query_offset(self, session_uri: str, size: int) -> Tuple[int, Optional[Dict]]:
+        """
+        Hỏi số byte server đã nhận của session (giống upload_sessions.query_upload_offset)
+
+        Raises:
+            UploadSessionExpired: Session không còn trên server
+        """
+        headers = await self._headers({'Content-Range': f'bytes */{size}'})
+        status, response_headers, content = await self.pool.request('PUT', session_uri, headers)
+        if status in (404, 410):
+            raise UploadSessionExpired(f'Session upload hết hạn (HTTP {status})')
+        return self._progress(status, response_headers, content, size)
+
+    async def set_thumbnail(self, video_id: str, thumbnail_path: str) -> Dict:
+        """
+        thumbnails.set - gửi file ảnh làm body (uploadType=media)
+        """
+        query = urlencode({'videoId': video_id, 'uploadType': 'media'})
+        mimetype = mimetypes.guess_type(thumbnail_path)[0] or 'application/octet-stream'
+        headers = await self._headers({'Content-Type': mimetype})
+        with open(thumbnail_path, 'rb') as f:
+            status, _, content = await self.pool.request(
+                'POST', f"{self.api_root}upload/youtube/v3/thumbnails/set?{query}", headers,
+                file=f, count=os.fstat(f.fileno()).st_size)
+        if status != 200:
+            raise AsyncHTTPError(status, content)
+        return json.loads(content.decode('utf-8'))
+
+
+class EventLoopThread:
+    def __init__(self, name: str = 'youtube-async-upload'):
+        """
+        Event loop chạy trên một thread nền - code đồng bộ gửi coroutine vào qua run()
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro):
+        """
+        Chạy coroutine trên loop và chờ kết quả (gọi từ thread khác loop)
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self):
+        """
+        Dừng loop, chờ executor mặc định (token, quota) rồi đóng loop
+        """
+        self.run(self.loop.shutdown_default_executor())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,106 @@
+"""
+Module export dữ liệu video dạng streaming (CSV / JSONL)
+
+Các hàm ở đây đọc record từ storage.iter_videos() và sinh ra từng khối text
+nhỏ, nên export cả năm lịch sử vẫn chỉ tốn bộ nhớ cố định - dùng được cho cả
+ghi file (main.py --export) lẫn HTTP chunked response (/api/export).
+"""
+import csv
+import io
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+CSV_HEADERS = ['ID', 'Input Video', 'Output Video', 'Duration', 'Status',
+               'YouTube URL', 'Processing Date']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8'
+}
+
+
+def csv_row(video: Dict) -> List:
+    """
+    Một dòng CSV (cùng cột với export_to_csv)
+    """
+    return [
+        video.get('id', ''),
+        os.path.basename(video.get('input_video') or ''),
+        os.path.basename(video.get('output_video') or ''),
+        f"{video.get('final_duration') or 0:.2f}s",
+        video.get('processing_status', ''),
+        (video.get('youtube_info') or {}).get('shorts_url', 'N/A'),
+        (video.get('processing_date') or '')[:10]  # Chỉ lấy ngày
+    ]
+
+
+def iter_export(storage, fmt: str = 'csv', rows_per_chunk: int = 500,
+                date_from: Optional[str] = None, date_to: Optional[str] = None,
+                processing_status: Optional[str] = None,
+                youtube_status: Optional[str] = None,
+                stats: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Sinh dữ liệu export theo từng khối text
+
+    Args:
+        storage: JsonStorageHandler hoặc SqliteStorageHandler
+        fmt: 'csv' hoặc 'jsonl'
+        rows_per_chunk: Số record gộp vào một khối
+        date_from, date_to, processing_status, youtube_status: Bộ lọc (xem iter_videos)
+        stats: Dict tùy chọn, được ghi số record đã export vào key 'rows'
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    videos = storage.iter_videos(
+        date_from=date_from, date_to=date_to,
+        processing_status=processing_status, youtube_status=youtube_status
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == 'csv':
+        writer.writerow(CSV_HEADERS)
+
+    rows = 0
+    for video in videos:
+        if fmt == 'csv':
+            writer.writerow(csv_row(video))
+        else:
+            buffer.write(json.dumps(video, ensure_ascii=False, default=str))
+            buffer.write('\n')
+        rows += 1
+
+        if rows % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if stats is not None:
+        stats['rows'] = rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_to_file(storage, output_file: str, fmt: str = 'csv', **filters) -> int:
+    """
+    Export ra file (ghi file tạm rồi rename)
+
+    Returns:
+        Số video đã export
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    stats = {}
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', newline='', encoding='utf-8') as f:
+        for chunk in iter_export(storage, fmt, stats=stats, **filters):
+            f.write(chunk)
+    os.replace(tmp_file, output_file)
+    return stats['rows']
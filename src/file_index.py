@@ -0,0 +1,172 @@
+"""
+Module index các file output trong RAM (thay cho listdir + stat mỗi request)
+
+Index giữ (size, mtime) của từng file và hai danh sách đã sắp xếp theo mtime
+và size, nên một trang kết quả chỉ tốn O(limit) thay vì stat toàn bộ thư mục.
+Index được cập nhật trực tiếp khi render xong và được đối chiếu định kỳ với
+thư mục bằng os.scandir (bắt các file do CLI/process khác tạo hoặc bị xóa tay).
+"""
+import bisect
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+SORT_KEYS = ('mtime', 'size')
+
+
+class OutputFileIndex:
+    def __init__(self, folder: str, extensions=('.mp4', '.avi', '.mov'), reconcile_interval: int = 60):
+        """
+        Khởi tạo index
+
+        Args:
+            folder: Thư mục output cần index
+            extensions: Các đuôi file được liệt kê
+            reconcile_interval: Số giây giữa hai lần quét đối chiếu nền
+        """
+        self.folder = folder
+        self.extensions = tuple(extensions)
+        self.reconcile_interval = reconcile_interval
+        self.lock = threading.Lock()
+
+        self._files: Dict[str, Tuple[int, float]] = {}
+        self._sorted: Dict[str, List[Tuple[float, str]]] = {key: [] for key in SORT_KEYS}
+        self._thread: Optional[threading.Thread] = None
+        self.last_reconcile = None
+
+    # --- cập nhật index (gọi khi đang giữ lock) ---
+
+    def _insert(self, name: str, size: int, mtime: float):
+        self._remove(name)
+        self._files[name] = (size, mtime)
+        bisect.insort(self._sorted['mtime'], (mtime, name))
+        bisect.insort(self._sorted['size'], (size, name))
+
+    def _remove(self, name: str):
+        entry = self._files.pop(name, None)
+        if entry is None:
+            return
+        size, mtime = entry
+        for key, value in (('mtime', mtime), ('size', size)):
+            items = self._sorted[key]
+            pos = bisect.bisect_left(items, (value, name))
+            if pos < len(items) and items[pos] == (value, name):
+                del items[pos]
+
+    # --- API public ---
+
+    def add_file(self, filename: str) -> bool:
+        """
+        Thêm/cập nhật một file (ví dụ ngay sau khi render xong)
+        """
+        name = os.path.basename(filename)
+        if not name.endswith(self.extensions):
+            return False
+        try:
+            stat = os.stat(os.path.join(self.folder, name))
+        except OSError:
+            self.remove_file(name)
+            return False
+
+        with self.lock:
+            self._insert(name, stat.st_size, stat.st_mtime)
+        return True
+
+    def remove_file(self, filename: str):
+        """
+        Xóa một file khỏi index
+        """
+        with self.lock:
+            self._remove(os.path.basename(filename))
+
+    def reconcile(self) -> Dict:
+        """
+        Quét thư mục bằng os.scandir và đồng bộ index
+
+        Returns:
+            Dict số file được thêm/cập nhật/xóa
+        """
+        seen = {}
+        if os.path.exists(self.folder):
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.extensions) and entry.is_file():
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        seen[entry.name] = (stat.st_size, stat.st_mtime)
+
+        changes = {'added': 0, 'updated': 0, 'removed': 0}
+        with self.lock:
+            for name in [n for n in self._files if n not in seen]:
+                self._remove(name)
+                changes['removed'] += 1
+            for name, (size, mtime) in seen.items():
+                current = self._files.get(name)
+                if current == (size, mtime):
+                    continue
+                changes['updated' if current else 'added'] += 1
+                self._insert(name, size, mtime)
+            self.last_reconcile = time.time()
+        return changes
+
+    def start(self):
+        """
+        Quét lần đầu và chạy thread đối chiếu định kỳ
+        """
+        self.reconcile()
+        if self._thread is None and self.reconcile_interval > 0:
+            self._thread = threading.Thread(target=self._reconcile_loop, daemon=True)
+            self._thread.start()
+
+    def _reconcile_loop(self):
+        while True:
+            time.sleep(self.reconcile_interval)
+            try:
+                self.reconcile()
+            except Exception as e:
+                print(f"Lỗi khi quét thư mục output: {e}")
+
+    def count(self) -> int:
+        return len(self._files)
+
+    def list_files(self, sort: str = 'mtime', descending: bool = True,
+                   offset: int = 0, limit: Optional[int] = None) -> Tuple[int, List[Dict]]:
+        """
+        Lấy một trang danh sách file
+
+        Args:
+            sort: 'mtime' hoặc 'size'
+            descending: True = mới nhất/lớn nhất trước
+            offset: Bỏ qua bao nhiêu file đầu
+            limit: Số file tối đa (None = tất cả)
+
+        Returns:
+            (tổng số file, list dict thông tin file của trang)
+        """
+        if sort not in SORT_KEYS:
+            sort = 'mtime'
+
+        with self.lock:
+            items = self._sorted[sort]
+            total = len(items)
+            end = total if limit is None else min(total, offset + limit)
+            if descending:
+                page = [items[total - 1 - i][1] for i in range(offset, end)]
+            else:
+                page = [items[i][1] for i in range(offset, end)]
+            entries = [(name, self._files[name]) for name in page]
+
+        return total, [
+            {
+                'filename': name,
+                'size': size,
+                'modified': datetime.fromtimestamp(mtime).isoformat(),
+                'download_url': f'/api/download/{name}'
+            }
+            for name, (size, mtime) in entries
+        ]
@@ -0,0 +1,90 @@
+"""
+Module khóa file (advisory lock) để nhiều process phối hợp ghi cùng dữ liệu
+
+Dùng fcntl.flock trên Linux/macOS. Mỗi lần lấy lock mở một file descriptor
+mới nên lock cũng loại trừ giữa các thread trong cùng process. Trên Windows
+fallback sang msvcrt.locking (chỉ có lock độc quyền).
+"""
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    def __init__(self, lock_file: str):
+        """
+        Args:
+            lock_file: Đường dẫn file lock (được tạo nếu chưa có, nội dung không dùng)
+        """
+        self.lock_file = lock_file
+
+    def _acquire(self, exclusive: bool, blocking: bool):
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                if not blocking:
+                    flags |= fcntl.LOCK_NB
+                fcntl.flock(fd, flags)
+            else:
+                mode = msvcrt.LK_NBLCK
+                while True:
+                    try:
+                        msvcrt.locking(fd, mode, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(0.05)
+        except OSError:
+            os.close(fd)
+            raise
+        return fd
+
+    @staticmethod
+    def _release(fd: int):
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def exclusive(self):
+        fd = self._acquire(exclusive=True, blocking=True)
+        try:
+            yield
+        finally:
+            self._release(fd)
+
+    @contextmanager
+    def shared(self):
+        fd = self._acquire(exclusive=False, blocking=True)
+        try:
+            yield
+        finally:
+            self._release(fd)
+
+    def try_exclusive(self):
+        """
+        Lấy lock độc quyền không chờ
+
+        Returns:
+            fd cần truyền cho release(), hoặc None nếu lock đang bị giữ
+        """
+        try:
+            return self._acquire(exclusive=True, blocking=False)
+        except OSError:
+            return None
+
+    def release(self, fd: int):
+        self._release(fd)
@@ -0,0 +1,157 @@
+"""
+Module lưu trữ các job đã hoàn thành ra file JSONL (archive)
+
+File archive được xoay vòng khi vượt `max_bytes`: file cũ đổi tên thành
+<tên>.<thời điểm>.jsonl, chỉ giữ `backup_count` file gần nhất. Job trong file
+đã bị xóa cũng bị bỏ khỏi index nên cả file lẫn index đều có giới hạn.
+"""
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from threading import Lock
+
+
+class JobArchive:
+    def __init__(self, archive_file='data/jobs_archive.jsonl', max_bytes=50 * 1024 * 1024,
+                 backup_count=3):
+        """
+        Khởi tạo Job Archive
+
+        Mỗi dòng trong file là một job đã bị đẩy ra khỏi bộ nhớ. Archive giữ
+        index job_id -> byte offset trong RAM (một index cho mỗi file) để tra
+        cứu theo id mà không phải đọc lại toàn bộ file.
+
+        Args:
+            archive_file: Đường dẫn đến file JSONL lưu job
+            max_bytes: Kích thước tối đa của file archive trước khi xoay vòng (0 = không giới hạn)
+            backup_count: Số file đã xoay vòng được giữ lại (0 = không giữ, job cũ bị xóa khi xoay vòng)
+        """
+        self.archive_file = archive_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = Lock()
+        # (đường dẫn file, index id -> offset), file cũ trước, file hiện tại ở cuối
+        self._segments: List[Tuple[str, Dict[str, int]]] = []
+
+        archive_dir = os.path.dirname(archive_file)
+        if archive_dir and not os.path.exists(archive_dir):
+            os.makedirs(archive_dir)
+
+        self._build_index()
+
+    def _rotated_files(self) -> List[str]:
+        """
+        Các file đã xoay vòng, cũ trước (tên chứa thời điểm nên sort theo tên là đủ)
+        """
+        stem, ext = os.path.splitext(self.archive_file)
+        return sorted(glob.glob(f"{glob.escape(stem)}.*{ext}"))
+
+    def _build_index(self):
+        """
+        Đọc các file archive một lần để dựng index id -> offset
+        """
+        for path in self._rotated_files() + [self.archive_file]:
+            self._segments.append((path, self._index_file(path)))
+
+    @staticmethod
+    def _index_file(path: str) -> Dict[str, int]:
+        offsets: Dict[str, int] = {}
+        if not os.path.exists(path):
+            return offsets
+
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    offsets[entry['job']['id']] = offset
+                except (ValueError, KeyError, TypeError):
+                    # Dòng hỏng (ví dụ bị cắt khi crash) - bỏ qua
+                    pass
+                offset += len(line)
+        return offsets
+
+    def _rotate(self):
+        """
+        Đổi tên file hiện tại, xóa các file cũ vượt backup_count cùng index của chúng
+        """
+        path, offsets = self._segments.pop()
+        stem, ext = os.path.splitext(path)
+        target = f"{stem}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+        os.replace(path, target)
+        self._segments.append((target, offsets))
+
+        while len(self._segments) > self.backup_count:
+            old_file, _ = self._segments.pop(0)
+            try:
+                os.remove(old_file)
+            except OSError:
+                pass
+        self._segments.append((self.archive_file, {}))
+
+    def archive_jobs(self, entries: List[Tuple[str, Dict]]) -> int:
+        """
+        Ghi thêm các job vào cuối file archive
+
+        Args:
+            entries: List các tuple (kind, job), kind là 'process' hoặc 'upload'
+
+        Returns:
+            Số job đã được ghi
+        """
+        if not entries:
+            return 0
+
+        archived_at = datetime.now().isoformat()
+        with self.lock:
+            f = open(self.archive_file, 'ab')
+            try:
+                offset = f.seek(0, os.SEEK_END)
+                for kind, job in entries:
+                    line = json.dumps(
+                        {'kind': kind, 'archived_at': archived_at, 'job': job},
+                        ensure_ascii=False, default=str
+                    ).encode('utf-8') + b'\n'
+                    if self.max_bytes and offset and offset + len(line) > self.max_bytes:
+                        f.close()
+                        self._rotate()
+                        f = open(self.archive_file, 'ab')
+                        offset = 0
+                    f.write(line)
+                    self._segments[-1][1][job['id']] = offset
+                    offset += len(line)
+            finally:
+                f.close()
+        return len(entries)
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Lấy job đã archive theo id (None nếu không có)
+        """
+        try:
+            with self.lock:
+                # Mở file trong lock: file mở rồi vẫn đọc được dù bị xoay vòng/xóa sau đó
+                for path, offsets in reversed(self._segments):
+                    if job_id in offsets:
+                        f = open(path, 'rb')
+                        offset = offsets[job_id]
+                        break
+                else:
+                    return None
+            with f:
+                f.seek(offset)
+                entry = json.loads(f.readline())
+            job = entry['job']
+            job['archived_at'] = entry.get('archived_at')
+            return job
+        except Exception as e:
+            print(f"Lỗi khi đọc job archive: {e}")
+            return None
+
+    def count(self) -> int:
+        """
+        Số job đang nằm trong archive
+        """
+        return sum(len(offsets) for _, offsets in self._segments)
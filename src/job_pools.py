@@ -0,0 +1,72 @@
+"""
+Module pool worker cho từng stage của job (render video, upload YouTube)
+
+Render là việc nặng CPU, upload chủ yếu chờ mạng - mỗi stage có pool thread
+riêng để một upload kéo dài vài phút không giữ chỗ của render. Job render xong
+thì được chuyển sang hàng đợi của pool upload (submit) và slot render được trả
+ngay cho job tiếp theo.
+"""
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+class StagePool:
+    def __init__(self, name: str, max_workers: int):
+        """
+        Khởi tạo pool của một stage
+
+        Args:
+            name: Tên stage (dùng cho tên thread và metrics)
+            max_workers: Số job của stage chạy cùng lúc tối đa
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix=f'{name}-worker')
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Đưa job vào hàng đợi của stage
+        """
+        with self.lock:
+            self.queued += 1
+        return self._executor.submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            result = fn(*args, **kwargs)
+            with self.lock:
+                self.completed += 1
+            return result
+        except Exception:
+            # Lỗi không được bắt trong job - future giữ exception, in ra để không mất dấu
+            print(f"Lỗi trong {self.name} worker:\n{traceback.format_exc()}")
+            with self.lock:
+                self.failed += 1
+            raise
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'workers': self.max_workers,
+                'active': self.active,
+                'queued': self.queued,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -1,49 +1,602 @@
 """
 Module xử lý lưu trữ thông tin vào JSON file
+
+Dữ liệu gồm 2 phần:
+    <storage_file>          - snapshot JSON đầy đủ (cùng format như trước)
+    <storage_file>.journal  - journal append-only, mỗi dòng là một thay đổi
+
+Mỗi lần ghi chỉ append một dòng vào journal (O(1) theo kích thước database).
+Journal được fsync theo nhóm (group commit) mỗi `fsync_interval` giây. Khi
+journal đủ dài, một thread nền ghi snapshot mới ra file tạm rồi rename
+(atomic) và bỏ journal cũ. Lúc khởi động: load snapshot rồi replay journal.
+
+Nhiều process (API server, CLI, ...) có thể dùng chung database: mọi lần ghi
+giữ flock độc quyền trên <storage_file>.lock và trước khi ghi/đọc, handler
+chỉ replay phần journal mà process khác mới append (hoặc load lại toàn bộ
+khi snapshot đã được compact bởi process khác).
+
+Trong một process, writer tuần tự hóa qua self.lock còn reader không lấy lock:
+mỗi lần đọc ghi nhận số thứ tự `_seq` (seqlock - writer tăng lên số lẻ khi bắt
+đầu sửa, số chẵn khi xong) và đọc lại nếu có writer chen vào giữa. Record
+không bao giờ bị sửa tại chỗ nên kết quả trả về luôn là một trạng thái nhất quán.
 """
+import bisect
+import gc
 import json
 import os
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
-from threading import Lock
+from threading import Lock, Thread, Timer
+
+from .file_lock import FileLock
+from .video_search import tokenize, video_tokens, youtube_video_id
+
+try:
+    import orjson
+except ImportError:  # orjson là optional - fallback về json chuẩn (chậm hơn)
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack là optional, chỉ cần khi DATABASE_FORMAT=msgpack
+    msgpack = None
+
+
+# Định dạng snapshot:
+#   json    - một document JSON indent=2 (định dạng cũ, dễ đọc bằng mắt)
+#   jsonl   - dòng đầu là header {format, statistics}, mỗi dòng sau là một video
+#   msgpack - header rồi từng video nối tiếp nhau dạng msgpack
+# Lúc load định dạng được tự nhận diện, nên đổi DATABASE_FORMAT chỉ có hiệu lực
+# từ lần compact tiếp theo và luôn đọc được file cũ.
+STORAGE_FORMATS = ('json', 'jsonl', 'msgpack')
+_SNAPSHOT_MAGIC = 'video80s-snapshot'
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_snapshot(f, videos: List[Dict], statistics: Dict, storage_format: str = 'json'):
+    """
+    Ghi snapshot ra file object mở ở chế độ binary
+    """
+    if storage_format == 'json':
+        document = {'videos': videos, 'statistics': statistics}
+        if orjson is not None:
+            f.write(orjson.dumps(document, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            f.write(json.dumps(document, indent=2, ensure_ascii=False, default=str).encode('utf-8'))
+        return
+    
+    header = {'format': _SNAPSHOT_MAGIC, 'version': 1, 'count': len(videos), 'statistics': statistics}
+    if storage_format == 'jsonl':
+        f.write(_dumps(header) + b'\n')
+        for video in videos:
+            f.write(_dumps(video) + b'\n')
+    elif storage_format == 'msgpack':
+        packer = msgpack.Packer(default=str)
+        f.write(packer.pack(header))
+        for video in videos:
+            f.write(packer.pack(video))
+    else:
+        raise ValueError(f"Unknown storage format: {storage_format}")
+
+
+def load_snapshot(path: str) -> Tuple[Dict, str]:
+    """
+    Đọc snapshot, tự nhận diện định dạng
+    
+    Returns:
+        (data {'videos', 'statistics'}, định dạng của file)
+    """
+    # Tạo hàng triệu dict liên tục làm GC quét lại nhiều lần - tắt trong lúc parse
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(path)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _load_snapshot(path: str) -> Tuple[Dict, str]:
+    with open(path, 'rb') as f:
+        first = f.read(1)
+        f.seek(0)
+        
+        if first and first not in b'{ \t\r\n':
+            # Không phải text JSON - msgpack (header là một map)
+            if msgpack is None:
+                raise RuntimeError('Snapshot is msgpack but the msgpack package is not installed')
+            unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+            header = next(unpacker)
+            return {'videos': list(unpacker), 'statistics': header['statistics']}, 'msgpack'
+        
+        first_line = f.readline()
+        try:
+            header = _loads(first_line)
+        except ValueError:
+            header = None  # JSON indent=2: dòng đầu chỉ có '{'
+        
+        if isinstance(header, dict) and header.get('format') == _SNAPSHOT_MAGIC:
+            return {'videos': [_loads(line) for line in f if line.strip()],
+                    'statistics': header['statistics']}, 'jsonl'
+        if isinstance(header, dict) and 'videos' in header:
+            return header, 'json'  # JSON một dòng (không indent)
+        
+        f.seek(0)
+        return _loads(f.read()), 'json'
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
 
 class JsonStorageHandler:
-    def __init__(self, storage_file='data/videos_database.json'):
+    # Số record iter_videos() cắt ra mỗi lần giữ lock
+    ITER_BATCH = 1000
+    
+    def __init__(self, storage_file='data/videos_database.json', fsync_interval=1.0, compact_threshold=1000,
+                 storage_format='json'):
         """
         Khởi tạo JSON Storage Handler
         
         Args:
             storage_file: Đường dẫn đến file JSON lưu trữ dữ liệu
+            fsync_interval: Số giây tối đa giữa hai lần fsync journal (0 = fsync mỗi lần ghi)
+            compact_threshold: Số dòng journal để kích hoạt compaction nền
+            storage_format: Định dạng khi ghi snapshot ('json', 'jsonl', 'msgpack')
         """
         self.storage_file = storage_file
+        self.journal_file = f"{storage_file}.journal"
+        self.rotated_journal_file = f"{storage_file}.journal.old"
         self.data_dir = os.path.dirname(storage_file) if os.path.dirname(storage_file) else 'data'
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        if storage_format not in STORAGE_FORMATS:
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        if storage_format == 'msgpack' and msgpack is None:
+            print("Chưa cài msgpack - dùng định dạng jsonl cho snapshot")
+            storage_format = 'jsonl'
+        self.storage_format = storage_format
+        self.snapshot_format = None  # Định dạng của file snapshot đang có trên disk
         self.lock = Lock()  # Thread-safe operations
+        self._compact_lock = Lock()  # Chỉ một compaction tại một thời điểm
+        
+        # Lock giữa các process: ghi journal / compaction
+        self._write_lock = FileLock(f"{storage_file}.lock")
+        self._compact_file_lock = FileLock(f"{storage_file}.compact.lock")
+        
+        # Thế hệ dữ liệu trên disk đã được load vào RAM
+        self._snapshot_key = None
+        self._journal_ino = None
+        self._journal_offset = 0
+        
+        # Seqlock cho reader không lấy lock
+        self._seq = 0
+        self.read_retries = 0
+        self.locked_reads = 0
+        
+        self._journal = None
+        self._journal_entries = 0
+        self._last_fsync = 0.0
+        self._fsync_timer = None
+        self._compacting = False
+        
+        # Index id -> record và id -> vị trí trong self.data['videos'].
+        # Xóa chỉ đặt None (tombstone) tại vị trí đó; list được dọn lại khi
+        # tombstone chiếm quá nửa. self.data['videos'] luôn được giữ theo thứ
+        # tự processing_date tăng dần, _dates là list song song để bisect.
+        self._by_id: Dict[str, Dict] = {}
+        self._positions: Dict[str, int] = {}
+        self._dates: List[str] = []
+        self._tombstones = 0
+        
+        # Index phụ cho query(): status -> tập id, YouTube video id -> id và
+        # inverted index token (tên file, tiêu đề) -> tập id
+        self._by_processing: Dict[str, set] = {}
+        self._by_youtube: Dict[str, set] = {}
+        self._by_youtube_id: Dict[str, str] = {}
+        self._tokens: Dict[str, set] = {}
         
         # Tạo thư mục data nếu chưa tồn tại
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
         
         # Load dữ liệu hiện tại hoặc tạo mới
-        self.data = self._load_data()
+        with self._write_lock.exclusive(), self.lock:
+            self.data = self._load_data()
+            self._truncate_partial_tail()
+        self._recover_rotated_journal()
         print(f"Đã khởi tạo JSON storage: {self.storage_file}")
     
     def _load_data(self) -> Dict:
         """
-        Load dữ liệu từ file JSON
+        Load snapshot từ file JSON rồi replay journal (gọi khi đang giữ file lock)
         """
+        self._close_journal()
+        self._snapshot_key = _stat_key(self.storage_file)
+        
+        data = self._create_empty_database()
         if os.path.exists(self.storage_file):
             try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    print(f"Đã load {len(data.get('videos', []))} videos từ database")
-                    return data
+                data, self.snapshot_format = load_snapshot(self.storage_file)
             except Exception as e:
                 print(f"Lỗi khi load data: {e}")
-                return self._create_empty_database()
+                data = self._create_empty_database()
+        
+        with self._mutating():
+            self.data = data
+            self._rebuild_index()
+            self._verify_statistics()
+        
+        # Journal cũ chỉ còn khi đang (hoặc đã từng bị ngắt khi) compact - replay trước
+        replayed, _ = self._replay_journal(self.rotated_journal_file)
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._sync_journal_tail()
+        replayed += self._journal_entries
+        
+        print(f"Đã load {len(self._by_id)} videos từ database")
+        if replayed:
+            print(f"Đã replay {replayed} thay đổi từ journal")
+        
+        self._journal_entries = replayed
+        return data
+    
+    def _recover_rotated_journal(self):
+        """
+        Compaction trước đó bị ngắt giữa chừng (còn journal cũ) - ghi lại snapshot ngay
+        """
+        fd = self._compact_file_lock.try_exclusive()
+        if fd is None:
+            return  # Process khác đang compact
+        try:
+            if os.path.exists(self.rotated_journal_file):
+                with self.lock:
+                    videos = list(self.data['videos'])
+                    statistics = self._copy_statistics()
+                self._write_snapshot(videos, statistics)
+                os.remove(self.rotated_journal_file)
+        finally:
+            self._compact_file_lock.release(fd)
+    
+    def _replay_journal(self, journal_file: str, offset: int = 0) -> Tuple[int, int]:
+        """
+        Áp dụng các dòng journal lên self.data (put/del theo id nên replay lặp lại vẫn đúng)
+        
+        Returns:
+            (số dòng đã áp dụng, offset ngay sau dòng hoàn chỉnh cuối cùng)
+        """
+        if not os.path.exists(journal_file):
+            return 0, 0
+        
+        count = 0
+        with open(journal_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Dòng cuối bị ghi dở (crash) - không tính vào offset
+                    break
+                offset += len(line)
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    continue
+                
+                with self._mutating():
+                    if entry['op'] == 'put':
+                        self._apply_put(entry['video'])
+                    elif entry['op'] == 'del':
+                        self._apply_delete(entry['id'])
+                    
+                    # Counter được tính lại qua _apply_*; journal chỉ cần giữ thời điểm ghi
+                    last_updated = entry.get('last_updated') or entry.get('stats', {}).get('last_updated')
+                    if last_updated:
+                        self.data['statistics']['last_updated'] = last_updated
+                count += 1
+        return count, offset
+    
+    def _sync_journal_tail(self):
+        """
+        Replay phần journal được append sau offset đã biết
+        """
+        try:
+            journal_ino = os.stat(self.journal_file).st_ino
+        except FileNotFoundError:
+            return
+        if self._journal_ino is None:
+            self._journal_ino = journal_ino
+        count, self._journal_offset = self._replay_journal(self.journal_file, self._journal_offset)
+        self._journal_entries += count
+    
+    # --- đồng bộ giữa các process ---
+    
+    def _is_stale(self) -> bool:
+        """
+        Kiểm tra nhanh (chỉ stat) xem process khác đã ghi thêm dữ liệu chưa
+        """
+        if _stat_key(self.storage_file) != self._snapshot_key:
+            return True
+        try:
+            stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            return self._journal_ino is not None
+        return stat.st_ino != self._journal_ino or stat.st_size != self._journal_offset
+    
+    def _sync(self):
+        """
+        Đưa dữ liệu trong RAM về đúng thế hệ trên disk (gọi khi giữ file lock và self.lock)
+        """
+        if not self._is_stale():
+            return
+        
+        try:
+            journal_stat = os.stat(self.journal_file)
+        except FileNotFoundError:
+            journal_stat = None
+        
+        rotated = (
+            self._journal_ino is not None
+            and (journal_stat is None or journal_stat.st_ino != self._journal_ino)
+        )
+        if (_stat_key(self.storage_file) != self._snapshot_key or rotated
+                or (journal_stat is not None and journal_stat.st_size < self._journal_offset)):
+            # Process khác đã compact - load lại từ snapshot
+            self._load_data()
         else:
-            return self._create_empty_database()
+            self._sync_journal_tail()
+    
+    def _refresh(self):
+        """
+        Gọi trước khi đọc: chỉ lấy lock và replay khi trên disk có thay đổi
+        """
+        if self._is_stale():
+            with self._write_lock.shared(), self.lock:
+                self._sync()
+    
+    @contextmanager
+    def _mutating(self):
+        """
+        Đánh dấu khoảng writer đang sửa dữ liệu trong RAM (gọi khi giữ self.lock)
+        
+        Chỉ bao quanh phần sửa trong RAM (_apply_*) - đọc/ghi file, journal và
+        fsync nằm ngoài để reader không phải chờ I/O của writer.
+        """
+        self._seq += 1
+        try:
+            yield
+        finally:
+            self._seq += 1
+    
+    @contextmanager
+    def _writing(self):
+        """
+        Giữ file lock độc quyền + self.lock và đồng bộ dữ liệu trước khi ghi
+        """
+        with self._write_lock.exclusive(), self.lock:
+            self._sync()
+            self._truncate_partial_tail()
+            yield
+    
+    def _read(self, fn, attempts: int = 3):
+        """
+        Chạy fn() không lấy lock và trả kết quả nếu không có writer chen vào
+        
+        Sau `attempts` lần bị writer chen ngang thì đọc trong lock để không bị đói.
+        """
+        self._refresh()
+        for _ in range(attempts):
+            seq = self._seq
+            if seq % 2 == 0:
+                try:
+                    result = fn()
+                except Exception:
+                    # Đọc trúng trạng thái đang sửa dở (ví dụ dict đổi kích thước)
+                    if self._seq == seq:
+                        raise
+                else:
+                    if self._seq == seq:
+                        return result
+            self.read_retries += 1
+            time.sleep(0)  # Nhường GIL cho writer hoàn tất
+        
+        with self.lock:
+            self.locked_reads += 1
+            return fn()
+    
+    def _truncate_partial_tail(self):
+        # Dòng ghi dở của process bị crash nằm sau offset hợp lệ - cắt bỏ trước khi append
+        try:
+            if os.path.getsize(self.journal_file) > self._journal_offset:
+                self._close_journal()
+                os.truncate(self.journal_file, self._journal_offset)
+        except FileNotFoundError:
+            pass
+    
+    # --- index và counter (gọi khi đang giữ self.lock hoặc lúc load) ---
+    
+    @staticmethod
+    def _status_keys(video: Dict):
+        processing_status = video.get('processing_status') or 'unknown'
+        youtube_status = (video.get('youtube_info') or {}).get('status') or 'none'
+        return processing_status, youtube_status
+    
+    def _count(self, video: Dict, delta: int):
+        """
+        Cộng/trừ đóng góp của một record vào các counter - O(1)
+        """
+        statistics = self.data['statistics']
+        processing_status, youtube_status = self._status_keys(video)
+        
+        by_processing = statistics['processing_status']
+        by_processing[processing_status] = by_processing.get(processing_status, 0) + delta
+        if not by_processing[processing_status]:
+            del by_processing[processing_status]
+        
+        by_youtube = statistics['youtube_status']
+        by_youtube[youtube_status] = by_youtube.get(youtube_status, 0) + delta
+        if not by_youtube[youtube_status]:
+            del by_youtube[youtube_status]
+        
+        statistics['total_processed'] += delta
+        statistics['total_uploaded'] = by_youtube.get('success', 0)
+    
+    def _recount(self) -> Dict:
+        """
+        Đếm lại toàn bộ counter từ danh sách record
+        """
+        counters = {'total_processed': 0, 'total_uploaded': 0, 'processing_status': {}, 'youtube_status': {}}
+        for video in self._iter_videos():
+            processing_status, youtube_status = self._status_keys(video)
+            counters['processing_status'][processing_status] = counters['processing_status'].get(processing_status, 0) + 1
+            counters['youtube_status'][youtube_status] = counters['youtube_status'].get(youtube_status, 0) + 1
+            counters['total_processed'] += 1
+        counters['total_uploaded'] = counters['youtube_status'].get('success', 0)
+        return counters
+    
+    def _verify_statistics(self):
+        """
+        So counter đã lưu với kết quả đếm lại; dùng kết quả đếm lại nếu lệch
+        """
+        statistics = self.data['statistics']
+        counters = self._recount()
+        stored = {key: statistics.get(key) for key in counters}
+        if stored != counters:
+            # Database cũ (chưa có counter theo status) hoặc counter bị lệch
+            if 'processing_status' in statistics:
+                print(f"Statistics lệch so với dữ liệu, đã đếm lại: {stored} -> {counters}")
+            statistics.update(counters)
+    
+    def _copy_statistics(self) -> Dict:
+        statistics = dict(self.data['statistics'])
+        statistics['processing_status'] = dict(statistics['processing_status'])
+        statistics['youtube_status'] = dict(statistics['youtube_status'])
+        return statistics
+    
+    def _rebuild_index(self):
+        """
+        Dọn tombstone và dựng lại index id -> record / vị trí
+        """
+        # Tạo list mới thay vì sửa tại chỗ: snapshot đang ghi có thể giữ list cũ.
+        # Database cũ có thể đã bị sắp xếp giảm dần - sort ổn định một lần lúc load.
+        videos = sorted((v for v in self.data['videos'] if v is not None), key=self._date_key)
+        self.data['videos'] = videos
+        self._dates = [self._date_key(video) for video in videos]
+        self._by_id = {video['id']: video for video in videos}
+        self._positions = {video['id']: i for i, video in enumerate(videos)}
+        self._tombstones = 0
+        
+        self._by_processing, self._by_youtube, self._by_youtube_id, self._tokens = {}, {}, {}, {}
+        for video in videos:
+            self._index(video, True)
+    
+    @staticmethod
+    def _index_add(index: Dict[str, set], key: str, video_id: str):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = {video_id}
+        else:
+            ids.add(video_id)
+    
+    @staticmethod
+    def _index_remove(index: Dict[str, set], key: str, video_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(video_id)
+            if not ids:
+                del index[key]
+    
+    def _index(self, video: Dict, add: bool):
+        """
+        Thêm/bỏ một record khỏi các index phụ (status, YouTube id, token)
+        """
+        update = self._index_add if add else self._index_remove
+        video_id = video['id']
+        processing_status, youtube_status = self._status_keys(video)
+        update(self._by_processing, processing_status, video_id)
+        update(self._by_youtube, youtube_status, video_id)
+        for token in video_tokens(video):
+            update(self._tokens, token, video_id)
+        
+        yt_id = youtube_video_id(video)
+        if yt_id:
+            if add:
+                self._by_youtube_id[yt_id] = video_id
+            elif self._by_youtube_id.get(yt_id) == video_id:
+                del self._by_youtube_id[yt_id]
+    
+    @staticmethod
+    def _date_key(video: Dict) -> str:
+        return video.get('processing_date') or ''
+    
+    def _apply_put(self, video: Dict):
+        """
+        Thêm mới hoặc thay thế record theo id - O(1)
+        """
+        date = self._date_key(video)
+        pos = self._positions.get(video['id'])
+        if pos is not None and self._dates[pos] != date:
+            # Đổi processing_date làm thay đổi vị trí - xóa rồi thêm lại
+            self._apply_delete(video['id'])
+            pos = None
+        
+        if pos is not None:
+            self._count(self.data['videos'][pos], -1)
+            self._index(self.data['videos'][pos], False)
+            self.data['videos'][pos] = video
+        elif not self._dates or date >= self._dates[-1]:
+            # Trường hợp thường gặp: record mới nhất nằm cuối list
+            self._positions[video['id']] = len(self.data['videos'])
+            self.data['videos'].append(video)
+            self._dates.append(date)
+        else:
+            # Record cũ hơn record cuối (ví dụ đồng hồ bị chỉnh lùi) - chèn đúng chỗ rồi dựng lại vị trí
+            insert_at = bisect.bisect_right(self._dates, date)
+            self.data['videos'].insert(insert_at, video)
+            self._dates.insert(insert_at, date)
+            self._positions = {v['id']: i for i, v in enumerate(self.data['videos']) if v is not None}
+        self._by_id[video['id']] = video
+        self._count(video, 1)
+        self._index(video, True)
+    
+    def _apply_delete(self, video_id: str) -> bool:
+        """
+        Xóa record theo id bằng tombstone - O(1), dọn list theo lô
+        """
+        pos = self._positions.pop(video_id, None)
+        if pos is None:
+            return False
+        video = self._by_id.pop(video_id)
+        self._count(video, -1)
+        self._index(video, False)
+        self.data['videos'][pos] = None
+        self._tombstones += 1
+        
+        if self._tombstones > 1024 and self._tombstones * 2 > len(self.data['videos']):
+            self._rebuild_index()
+        return True
+    
+    def _iter_videos(self):
+        """
+        Duyệt các record còn sống (bỏ qua tombstone)
+        """
+        return (video for video in self.data['videos'] if video is not None)
     
     def _create_empty_database(self) -> Dict:
         """
@@ -54,38 +607,130 @@ class JsonStorageHandler:
             'statistics': {
                 'total_processed': 0,
                 'total_uploaded': 0,
+                'processing_status': {},
+                'youtube_status': {},
                 'last_updated': datetime.now().isoformat()
             }
         }
     
-    def _save_data(self) -> bool:
+    def _append_journal(self, entry: Dict) -> bool:
         """
-        Lưu dữ liệu vào file JSON
+        Ghi một thay đổi vào cuối journal (gọi trong _writing())
         """
         try:
-            with self.lock:
-                # Backup file cũ nếu tồn tại
-                if os.path.exists(self.storage_file):
-                    backup_file = f"{self.storage_file}.backup"
-                    if os.path.exists(backup_file):
-                        os.remove(backup_file)
-                    os.rename(self.storage_file, backup_file)
-                
-                # Cập nhật thời gian
-                self.data['statistics']['last_updated'] = datetime.now().isoformat()
-                
-                # Lưu file mới
-                with open(self.storage_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'ab')
+                self._journal_ino = os.fstat(self._journal.fileno()).st_ino
+            
+            line = _dumps(entry) + b'\n'
+            self._journal.write(line)
+            self._journal.flush()
+            self._journal_offset += len(line)
+            self._journal_entries += 1
+            
+            # Group commit: fsync ngay nếu đã quá interval, không thì hẹn timer
+            if time.time() - self._last_fsync >= self.fsync_interval:
+                self._fsync_journal()
+            elif self._fsync_timer is None:
+                self._fsync_timer = Timer(self.fsync_interval, self._timed_fsync)
+                self._fsync_timer.daemon = True
+                self._fsync_timer.start()
+            return True
+        except Exception as e:
+            print(f"Lỗi khi ghi journal: {e}")
+            return False
+    
+    def _close_journal(self):
+        if self._journal is not None:
+            self._fsync_journal()
+            self._journal.close()
+            self._journal = None
+    
+    def _fsync_journal(self):
+        if self._journal is not None:
+            os.fsync(self._journal.fileno())
+        self._last_fsync = time.time()
+    
+    def _timed_fsync(self):
+        with self.lock:
+            self._fsync_timer = None
+            try:
+                self._fsync_journal()
+            except Exception as e:
+                print(f"Lỗi khi fsync journal: {e}")
+    
+    def _commit(self, entry: Dict) -> bool:
+        """
+        Ghi journal cho một thay đổi và kích hoạt compaction nền khi cần
+        """
+        entry['last_updated'] = datetime.now().isoformat()
+        if not self._append_journal(entry):
+            return False
+        
+        self.data['statistics']['last_updated'] = entry['last_updated']
+        if self._journal_entries >= self.compact_threshold and not self._compacting:
+            self._compacting = True
+            Thread(target=self.compact, daemon=True).start()
+        return True
+    
+    def _write_snapshot(self, videos: List[Dict], statistics: Dict):
+        """
+        Ghi snapshot đầy đủ ra file tạm, fsync rồi rename đè file chính (atomic)
+        """
+        tmp_file = f"{self.storage_file}.tmp"
+        videos = [video for video in videos if video is not None]
+        with open(tmp_file, 'wb') as f:
+            dump_snapshot(f, videos, statistics, self.storage_format)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.storage_file)
+        self.snapshot_format = self.storage_format
+    
+    def compact(self) -> bool:
+        """
+        Ghi snapshot mới và bỏ journal đã được gộp vào snapshot
+        
+        Chỉ bước đổi journal và copy danh sách record (không copy nội dung)
+        nằm trong lock; phần serialize/ghi file chạy ngoài lock.
+        """
+        with self._compact_lock:
+            return self._compact()
+    
+    def _compact(self) -> bool:
+        try:
+            # Chỉ một process compact tại một thời điểm; process khác vẫn ghi được vào journal mới
+            with self._compact_file_lock.exclusive():
+                with self._writing():
+                    self._compacting = True
+                    self._close_journal()
+                    # Nếu lần compact trước lỗi thì journal cũ vẫn còn - giữ nguyên, không ghi đè
+                    if os.path.exists(self.journal_file) and not os.path.exists(self.rotated_journal_file):
+                        os.replace(self.journal_file, self.rotated_journal_file)
+                    self._journal_ino = None
+                    self._journal_offset = 0
+                    self._journal_entries = 0
+                    
+                    # Record không bao giờ bị sửa tại chỗ nên copy nông là đủ
+                    videos = list(self.data['videos'])
+                    statistics = self._copy_statistics()
                 
-                return True
+                self._write_snapshot(videos, statistics)
+                with self.lock:
+                    self._snapshot_key = _stat_key(self.storage_file)
+                if os.path.exists(self.rotated_journal_file):
+                    os.remove(self.rotated_journal_file)
+            return True
         except Exception as e:
-            print(f"Lỗi khi lưu data: {e}")
-            # Restore backup nếu có lỗi
-            backup_file = f"{self.storage_file}.backup"
-            if os.path.exists(backup_file):
-                os.rename(backup_file, self.storage_file)
+            print(f"Lỗi khi compact database: {e}")
             return False
+        finally:
+            self._compacting = False
+    
+    def _save_data(self) -> bool:
+        """
+        Lưu toàn bộ dữ liệu ra snapshot ngay lập tức
+        """
+        return self.compact()
     
     def save_video_info(self, video_data: Dict) -> Optional[str]:
         """
@@ -114,22 +759,15 @@ class JsonStorageHandler:
                 'metadata': video_data.get('metadata', {})
             }
             
-            # Thêm vào danh sách videos
-            self.data['videos'].append(document)
+            with self._writing():
+                # Ghi journal trước, chỉ thêm vào bộ nhớ (và counter) khi ghi thành công
+                if not self._commit({'op': 'put', 'video': document}):
+                    return None
+                with self._mutating():
+                    self._apply_put(document)
             
-            # Cập nhật statistics
-            self.data['statistics']['total_processed'] += 1
-            if document.get('youtube_info', {}).get('status') == 'success':
-                self.data['statistics']['total_uploaded'] += 1
-            
-            # Lưu vào file
-            if self._save_data():
-                print(f"Đã lưu thông tin video với ID: {video_id}")
-                return video_id
-            else:
-                # Rollback nếu lưu thất bại
-                self.data['videos'].pop()
-                return None
+            print(f"Đã lưu thông tin video với ID: {video_id}")
+            return video_id
                 
         except Exception as e:
             print(f"Lỗi khi lưu video info: {e}")
@@ -144,39 +782,66 @@ class JsonStorageHandler:
             youtube_data: Dict chứa thông tin YouTube
         """
         try:
-            # Tìm video theo ID
-            for video in self.data['videos']:
-                if video['id'] == video_id:
-                    # Cập nhật YouTube info
-                    video['youtube_info'] = youtube_data
-                    video['updated_at'] = datetime.now().isoformat()
-                    
-                    # Cập nhật statistics nếu upload thành công
-                    if youtube_data.get('status') == 'success':
-                        self.data['statistics']['total_uploaded'] += 1
-                    
-                    # Lưu vào file
-                    if self._save_data():
-                        print(f"Đã cập nhật YouTube info cho video {video_id}")
-                        return True
+            with self._writing():
+                video = self._by_id.get(video_id)
+                if video is None:
+                    print(f"Không tìm thấy video với ID: {video_id}")
                     return False
+                
+                # Tạo record mới thay vì sửa tại chỗ (snapshot đang ghi có thể giữ record cũ)
+                updated = {
+                    **video,
+                    'youtube_info': youtube_data,
+                    'updated_at': datetime.now().isoformat()
+                }
+                # Ghi journal (counter theo YouTube status được cập nhật trong _apply_put)
+                if not self._commit({'op': 'put', 'video': updated}):
+                    return False
+                with self._mutating():
+                    self._apply_put(updated)
             
-            print(f"Không tìm thấy video với ID: {video_id}")
-            return False
+            print(f"Đã cập nhật YouTube info cho video {video_id}")
+            return True
                 
         except Exception as e:
             print(f"Lỗi khi cập nhật YouTube info: {e}")
             return False
     
+    def update_youtube_info_many(self, updates: Dict[str, Dict]) -> int:
+        """
+        Cập nhật YouTube info cho nhiều video trong một lần giữ lock ghi
+        
+        Args:
+            updates: Dict video_id -> youtube_data
+        
+        Returns:
+            Số video đã cập nhật (bỏ qua id không còn trong database)
+        """
+        updated_count = 0
+        try:
+            with self._writing():
+                now = datetime.now().isoformat()
+                for video_id, youtube_data in updates.items():
+                    video = self._by_id.get(video_id)
+                    if video is None:
+                        continue
+                    updated = {**video, 'youtube_info': youtube_data, 'updated_at': now}
+                    if not self._commit({'op': 'put', 'video': updated}):
+                        break
+                    with self._mutating():
+                        self._apply_put(updated)
+                    updated_count += 1
+        except Exception as e:
+            print(f"Lỗi khi cập nhật YouTube info: {e}")
+        return updated_count
+    
     def get_video_by_id(self, video_id: str) -> Optional[Dict]:
         """
         Lấy thông tin video từ database bằng ID
         """
         try:
-            for video in self.data['videos']:
-                if video['id'] == video_id:
-                    return video
-            return None
+            self._refresh()
+            return self._by_id.get(video_id)  # dict.get là atomic - không cần seqlock
         except Exception as e:
             print(f"Lỗi khi query video: {e}")
             return None
@@ -189,23 +854,185 @@ class JsonStorageHandler:
             limit: Số lượng video tối đa cần lấy
         """
         try:
-            videos = self.data['videos']
-            # Sắp xếp theo thời gian xử lý mới nhất
-            videos.sort(key=lambda x: x.get('processing_date', ''), reverse=True)
+            # List đã theo thứ tự thời gian - chỉ cần duyệt ngược k phần tử cuối, không sort
+            return self._read(lambda: self._scan_newest(len(self.data['videos']) - 1, limit))
+        except Exception as e:
+            print(f"Lỗi khi query videos: {e}")
+            return []
+    
+    def _scan_newest(self, start: int, limit: Optional[int]) -> List[Dict]:
+        """
+        Lấy tối đa `limit` record từ vị trí start trở về trước (mới nhất trước)
+        """
+        videos = self.data['videos']
+        result = []
+        for pos in range(start, -1, -1):
+            if limit and len(result) >= limit:
+                break
+            if videos[pos] is not None:
+                result.append(videos[pos])
+        return result
+    
+    def _cursor_position(self, cursor: str, before: bool) -> int:
+        """
+        Đổi cursor (video id hoặc processing_date ISO) thành vị trí ranh giới trong list
+        """
+        pos = self._positions.get(cursor)
+        if pos is not None:
+            return pos if before else pos + 1
+        if before:
+            return bisect.bisect_left(self._dates, cursor)
+        return bisect.bisect_right(self._dates, cursor)
+    
+    def get_videos_page(self, limit: int = 20, before: Optional[str] = None,
+                        after: Optional[str] = None) -> List[Dict]:
+        """
+        Phân trang lịch sử theo keyset (mới nhất trước)
+        
+        Args:
+            limit: Số video mỗi trang
+            before: Video id hoặc processing_date - lấy các video cũ hơn cursor
+            after: Video id hoặc processing_date - lấy các video mới hơn cursor
+        
+        Returns:
+            List video, mới nhất trước. Dùng id của video cuối làm `before`
+            để lấy trang tiếp theo, id của video đầu làm `after` để quay lại.
+        """
+        def read_page():
+            if after is not None:
+                videos = self.data['videos']
+                result = []
+                for pos in range(self._cursor_position(after, before=False), len(videos)):
+                    if len(result) >= limit:
+                        break
+                    if videos[pos] is not None:
+                        result.append(videos[pos])
+                return result[::-1]
             
-            if limit:
-                return videos[:limit]
-            return videos
+            start = len(self.data['videos'])
+            if before is not None:
+                start = self._cursor_position(before, before=True)
+            return self._scan_newest(start - 1, limit)
+        
+        try:
+            return self._read(read_page)
         except Exception as e:
             print(f"Lỗi khi query videos: {e}")
             return []
     
+    def iter_videos(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                    processing_status: Optional[str] = None, youtube_status: Optional[str] = None):
+        """
+        Duyệt video theo thứ tự thời gian (cũ trước) với bộ lọc
+        
+        Mỗi lô tối đa ~ITER_BATCH record được cắt ra trong lock rồi duyệt ngoài lock.
+        Lô luôn gồm trọn các record cùng processing_date và lô sau bắt đầu sau ngày
+        đó, nên record chèn/xóa giữa các lô (list bị dịch vị trí) không làm bỏ sót
+        hay lặp record khác.
+        
+        Args:
+            date_from: Ngày/giờ ISO bắt đầu (bao gồm)
+            date_to: Ngày/giờ ISO kết thúc (bao gồm, '2025-12-31' lấy hết ngày đó)
+            processing_status: Chỉ lấy video có processing_status này
+            youtube_status: Chỉ lấy video có youtube_info.status này ('none' = chưa upload)
+        """
+        self._refresh()
+        upper = date_to + '\uffff' if date_to else None
+        last_date = None  # processing_date của record cuối lô trước
+        while True:
+            with self.lock:
+                dates = self._dates
+                if last_date is not None:
+                    start = bisect.bisect_right(dates, last_date)
+                else:
+                    start = bisect.bisect_left(dates, date_from) if date_from else 0
+                end = bisect.bisect_right(dates, upper) if upper else len(dates)
+                if start >= end:
+                    return
+                stop = min(end, start + self.ITER_BATCH)
+                stop = bisect.bisect_right(dates, dates[stop - 1])
+                batch = self.data['videos'][start:stop]
+                last_date = dates[stop - 1]
+            
+            for video in batch:
+                if video is None:
+                    continue
+                video_processing_status, video_youtube_status = self._status_keys(video)
+                if processing_status and video_processing_status != processing_status:
+                    continue
+                if youtube_status and video_youtube_status != youtube_status:
+                    continue
+                yield video
+    
+    def query(self, text: Optional[str] = None, processing_status: Optional[str] = None,
+              youtube_status: Optional[str] = None, youtube_video_id: Optional[str] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None,
+              limit: Optional[int] = 20, offset: int = 0) -> Tuple[int, List[Dict]]:
+        """
+        Tìm video qua các index phụ, mới nhất trước
+        
+        Args:
+            text: Các từ cần có trong tên file/tiêu đề (AND, không phân biệt hoa thường/dấu)
+            processing_status: Lọc theo processing_status
+            youtube_status: Lọc theo youtube_info.status ('none' = chưa upload)
+            youtube_video_id: Lọc theo YouTube video id
+            date_from, date_to: Khoảng processing_date ISO (bao gồm hai đầu)
+            limit: Số video mỗi trang (None = tất cả)
+            offset: Bỏ qua bao nhiêu video đầu
+        
+        Returns:
+            (tổng số video khớp, list video của trang)
+        """
+        date_to_key = date_to + '\uffff' if date_to else None
+        stop = None if limit is None else offset + limit
+        
+        def run_query():
+            candidates = []
+            if youtube_video_id:
+                video_id = self._by_youtube_id.get(youtube_video_id)
+                candidates.append({video_id} if video_id else set())
+            if processing_status:
+                candidates.append(self._by_processing.get(processing_status, set()))
+            if youtube_status:
+                candidates.append(self._by_youtube.get(youtube_status, set()))
+            for token in tokenize(text):
+                candidates.append(self._tokens.get(token, set()))
+            
+            videos = self.data['videos']
+            if not candidates:
+                # Chỉ lọc theo ngày (hoặc không lọc) - bisect trên _dates rồi duyệt ngược
+                start = bisect.bisect_left(self._dates, date_from) if date_from else 0
+                end = bisect.bisect_right(self._dates, date_to_key) if date_to_key else len(videos)
+                positions = [pos for pos in range(end - 1, start - 1, -1) if videos[pos] is not None]
+                return len(positions), [videos[pos] for pos in positions[offset:stop]]
+            
+            # Giao từ tập nhỏ nhất
+            candidates.sort(key=len)
+            ids = set(candidates[0]).intersection(*candidates[1:])
+            positions = []
+            for video_id in ids:
+                pos = self._positions.get(video_id)
+                if pos is None:
+                    continue
+                date = self._dates[pos]
+                if (date_from and date < date_from) or (date_to_key and date > date_to_key):
+                    continue
+                positions.append(pos)
+            positions.sort(reverse=True)
+            return len(positions), [videos[pos] for pos in positions[offset:stop]]
+        
+        try:
+            return self._read(run_query)
+        except Exception as e:
+            print(f"Lỗi khi tìm video: {e}")
+            return 0, []
+    
     def get_videos_by_status(self, status: str) -> List[Dict]:
         """
         Lấy video theo status xử lý
         """
         try:
-            return [v for v in self.data['videos'] if v.get('processing_status') == status]
+            return self.query(processing_status=status, limit=None)[1]
         except Exception as e:
             print(f"Lỗi khi query videos by status: {e}")
             return []
@@ -215,8 +1042,7 @@ class JsonStorageHandler:
         Lấy danh sách video đã upload lên YouTube
         """
         try:
-            return [v for v in self.data['videos'] 
-                   if v.get('youtube_info', {}).get('status') == 'success']
+            return self.query(youtube_status='success', limit=None)[1]
         except Exception as e:
             print(f"Lỗi khi query YouTube videos: {e}")
             return []
@@ -226,17 +1052,17 @@ class JsonStorageHandler:
         Xóa video khỏi database
         """
         try:
-            initial_count = len(self.data['videos'])
-            self.data['videos'] = [v for v in self.data['videos'] if v['id'] != video_id]
-            
-            if len(self.data['videos']) < initial_count:
-                # Cập nhật statistics
-                self.data['statistics']['total_processed'] -= 1
+            with self._writing():
+                if video_id not in self._by_id:
+                    return False
                 
-                if self._save_data():
-                    print(f"Đã xóa video {video_id} khỏi database")
-                    return True
-            return False
+                if not self._commit({'op': 'del', 'id': video_id}):
+                    return False
+                with self._mutating():
+                    self._apply_delete(video_id)
+            
+            print(f"Đã xóa video {video_id} khỏi database")
+            return True
         except Exception as e:
             print(f"Lỗi khi xóa video: {e}")
             return False
@@ -246,15 +1072,16 @@ class JsonStorageHandler:
         Lấy thống kê về videos trong database
         """
         try:
-            videos = self.data['videos']
+            # Đọc từ counter được cập nhật mỗi lần ghi - không duyệt danh sách video
+            statistics = self._read(self._copy_statistics)
             
             stats = {
-                'total_videos': len(videos),
-                'successful_processing': len([v for v in videos if v.get('processing_status') == 'success']),
-                'failed_processing': len([v for v in videos if v.get('processing_status') == 'error']),
-                'youtube_uploaded': len([v for v in videos if v.get('youtube_info', {}).get('status') == 'success']),
+                'total_videos': statistics['total_processed'],
+                'successful_processing': statistics['processing_status'].get('success', 0),
+                'failed_processing': statistics['processing_status'].get('error', 0),
+                'youtube_uploaded': statistics['youtube_status'].get('success', 0),
                 'youtube_pending': 0,
-                'last_updated': self.data['statistics'].get('last_updated', 'N/A')
+                'last_updated': statistics.get('last_updated', 'N/A')
             }
             
             stats['youtube_pending'] = stats['successful_processing'] - stats['youtube_uploaded']
@@ -272,7 +1099,9 @@ class JsonStorageHandler:
         try:
             import csv
             
-            if not self.data['videos']:
+            # Lấy snapshot nhất quán rồi ghi file ngoài lock
+            videos = self._read(lambda: list(self._iter_videos()))
+            if not videos:
                 print("Không có video nào để export")
                 return False
             
@@ -284,7 +1113,7 @@ class JsonStorageHandler:
                 writer = csv.writer(f)
                 writer.writerow(headers)
                 
-                for video in self.data['videos']:
+                for video in videos:
                     row = [
                         video.get('id', ''),
                         os.path.basename(video.get('input_video', '')),
@@ -296,7 +1125,7 @@ class JsonStorageHandler:
                     ]
                     writer.writerow(row)
             
-            print(f"Đã export {len(self.data['videos'])} videos ra file: {csv_file}")
+            print(f"Đã export {len(videos)} videos ra file: {csv_file}")
             return True
             
         except Exception as e:
@@ -307,6 +1136,14 @@ class JsonStorageHandler:
         """
         Đóng kết nối (compatibility với code cũ)
         """
-        # Lưu lần cuối trước khi đóng
-        self._save_data()
+        # Journal đã chứa mọi thay đổi - chỉ cần fsync, không ghi lại toàn bộ file.
+        # Chờ compaction nền (nếu có) ghi xong snapshot trước khi đóng.
+        with self._compact_lock, self.lock:
+            if self._fsync_timer is not None:
+                self._fsync_timer.cancel()
+                self._fsync_timer = None
+            if self._journal is not None:
+                self._fsync_journal()
+                self._journal.close()
+                self._journal = None
         print("Đã lưu và đóng JSON storage")
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Module quản lý upload session dạng resumable (chia chunk, upload lại được)
+
+Mỗi session gồm 2 file trong thư mục session:
+    <upload_id>.part  - dữ liệu, được ghi đúng vị trí offset của từng chunk
+    <upload_id>.json  - metadata: kích thước, các khoảng byte đã nhận, hạn dùng
+
+Các chunk có thể tới không theo thứ tự (client upload song song), nên session
+lưu danh sách các khoảng [start, end) đã nhận thay vì một offset duy nhất.
+"""
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from threading import Lock
+
+from .upload_ingest import SNIFF_BYTES, sniff_container
+
+
+_UPLOAD_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSessionError(Exception):
+    """Lỗi thao tác trên upload session (offset sai, quá kích thước, ...)"""
+
+
+class UploadSessionNotFound(UploadSessionError):
+    """Session không tồn tại hoặc đã hết hạn"""
+
+
+def _merge_range(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """
+    Thêm khoảng [start, end) vào danh sách khoảng đã sắp xếp và gộp các khoảng chạm nhau
+    """
+    merged = []
+    for r_start, r_end in sorted(ranges + [[start, end]]):
+        if merged and r_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], r_end)
+        else:
+            merged.append([r_start, r_end])
+    return merged
+
+
+class ResumableUploadStore:
+    def __init__(self, session_folder='temp/uploads', session_ttl=86400,
+                 max_upload_size=1024 * 1024 * 1024, max_chunk_size=64 * 1024 * 1024):
+        """
+        Khởi tạo kho upload session
+
+        Args:
+            session_folder: Thư mục chứa file .part và .json của các session
+            session_ttl: Số giây session còn hiệu lực kể từ lần ghi chunk cuối
+            max_upload_size: Kích thước file tối đa cho một session
+            max_chunk_size: Kích thước tối đa của một chunk
+        """
+        self.session_folder = session_folder
+        self.session_ttl = session_ttl
+        self.max_upload_size = max_upload_size
+        self.max_chunk_size = max_chunk_size
+        self.lock = Lock()
+        self._session_locks: Dict[str, Lock] = {}
+
+        if not os.path.exists(session_folder):
+            os.makedirs(session_folder)
+
+    # --- đường dẫn / metadata ---
+
+    def _data_path(self, upload_id: str) -> str:
+        return os.path.join(self.session_folder, f"{upload_id}.part")
+
+    def _meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.session_folder, f"{upload_id}.json")
+
+    def _session_lock(self, upload_id: str) -> Lock:
+        with self.lock:
+            return self._session_locks.setdefault(upload_id, Lock())
+
+    def _write_meta(self, session: Dict):
+        # Ghi file tạm rồi rename để metadata không bao giờ bị ghi dở
+        meta_path = self._meta_path(session['upload_id'])
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def _read_meta(self, upload_id: str) -> Optional[Dict]:
+        if not _UPLOAD_ID_RE.match(upload_id or ''):
+            return None
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _describe(session: Dict) -> Dict:
+        ranges = session['received']
+        offset = ranges[0][1] if ranges and ranges[0][0] == 0 else 0
+        return {
+            **session,
+            'offset': offset,
+            'complete': offset == session['size']
+        }
+
+    # --- thao tác session ---
+
+    def create_session(self, filename: str, size: int, metadata: Optional[Dict] = None) -> Dict:
+        """
+        Tạo upload session mới và cấp phát file .part
+
+        Args:
+            filename: Tên file gốc (đã secure_filename)
+            size: Tổng kích thước file (bytes)
+            metadata: Thông tin thêm client muốn lưu kèm
+
+        Returns:
+            Dict mô tả session
+        """
+        if size <= 0 or size > self.max_upload_size:
+            raise UploadSessionError(f'Invalid upload size: {size}')
+
+        self.cleanup_expired()
+
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        session = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': size,
+            'received': [],
+            'metadata': metadata or {},
+            'created_at': datetime.fromtimestamp(now).isoformat(),
+            'expires_at': now + self.session_ttl
+        }
+
+        with open(self._data_path(upload_id), 'wb') as f:
+            f.truncate(size)
+        self._write_meta(session)
+        return self._describe(session)
+
+    def get_session(self, upload_id: str) -> Optional[Dict]:
+        """
+        Lấy trạng thái session (None nếu không tồn tại hoặc đã hết hạn)
+        """
+        session = self._read_meta(upload_id)
+        if session is None:
+            return None
+        if session['expires_at'] < time.time():
+            self.delete_session(upload_id)
+            return None
+        return self._describe(session)
+
+    def write_chunk(self, upload_id: str, offset: int, stream, length: int,
+                    buffer_size: int = 1024 * 1024) -> Dict:
+        """
+        Ghi một chunk vào đúng vị trí trong file .part
+
+        Có thể gọi song song cho các offset khác nhau; chỉ bước cập nhật
+        metadata được tuần tự hóa theo session.
+
+        Args:
+            upload_id: ID session
+            offset: Vị trí byte bắt đầu của chunk
+            stream: File-like object để đọc dữ liệu chunk (request.stream)
+            length: Số byte của chunk
+        """
+        session = self.get_session(upload_id)
+        if session is None:
+            raise UploadSessionNotFound('Upload session not found')
+        if length <= 0 or length > self.max_chunk_size:
+            raise UploadSessionError(f'Invalid chunk size: {length}')
+        if offset < 0 or offset + length > session['size']:
+            raise UploadSessionError('Chunk outside of upload range')
+
+        written = 0
+        try:
+            with open(self._data_path(upload_id), 'r+b') as f:
+                f.seek(offset)
+                while written < length:
+                    data = stream.read(min(buffer_size, length - written))
+                    if not data:
+                        break
+                    f.write(data)
+                    written += len(data)
+        except Exception:
+            # Client ngắt kết nối giữa chunk (stream.read lỗi) - vẫn ghi nhận phần đã
+            # ghi xuống file để lần hỏi offset sau không báo thiếu
+            if written:
+                self._record_range(upload_id, offset, written)
+            raise
+
+        if written == 0:
+            raise UploadSessionError('Empty chunk')
+
+        # Chỉ ghi nhận phần đã thực sự nhận được (client có thể ngắt giữa chừng)
+        return self._describe(self._record_range(upload_id, offset, written))
+
+    def _record_range(self, upload_id: str, offset: int, written: int) -> Dict:
+        with self._session_lock(upload_id):
+            session = self._read_meta(upload_id)
+            if session is None:
+                raise UploadSessionNotFound('Upload session not found')
+            session['received'] = _merge_range(session['received'], offset, offset + written)
+            session['expires_at'] = time.time() + self.session_ttl
+            self._write_meta(session)
+        return session
+
+    def finalize_session(self, upload_id: str, dest_path: str) -> Dict:
+        """
+        Chuyển file đã upload đủ sang dest_path và xóa session
+
+        Returns:
+            Dict thông tin file (size, container)
+        """
+        with self._session_lock(upload_id):
+            session = self.get_session(upload_id)
+            if session is None:
+                raise UploadSessionNotFound('Upload session not found')
+            if not session['complete']:
+                raise UploadSessionError(
+                    f"Upload incomplete: {session['offset']}/{session['size']} bytes"
+                )
+
+            data_path = self._data_path(upload_id)
+            with open(data_path, 'rb') as f:
+                container = sniff_container(f.read(SNIFF_BYTES))
+
+            try:
+                os.replace(data_path, dest_path)
+            except OSError:
+                shutil.move(data_path, dest_path)
+            self.delete_session(upload_id)
+
+        return {
+            'bytes': session['size'],
+            'container': container,
+            'filename': session['filename']
+        }
+
+    def delete_session(self, upload_id: str) -> bool:
+        """
+        Xóa session và dữ liệu tạm
+        """
+        removed = False
+        for path in (self._data_path(upload_id), self._meta_path(upload_id)):
+            if os.path.exists(path):
+                os.remove(path)
+                removed = True
+        with self.lock:
+            self._session_locks.pop(upload_id, None)
+        return removed
+
+    def cleanup_expired(self) -> int:
+        """
+        Xóa các session đã hết hạn
+
+        Returns:
+            Số session đã xóa
+        """
+        now = time.time()
+        removed = 0
+        for entry in os.scandir(self.session_folder):
+            upload_id, ext = os.path.splitext(entry.name)
+            if ext == '.json':
+                session = self._read_meta(upload_id)
+                expired = session is None or session['expires_at'] < now
+            elif ext == '.part':
+                # File dữ liệu mồ côi (mất metadata) - xóa theo mtime
+                expired = (not os.path.exists(self._meta_path(upload_id))
+                           and entry.stat().st_mtime + self.session_ttl < now)
+            else:
+                continue
+            if expired and self.delete_session(upload_id):
+                removed += 1
+        return removed
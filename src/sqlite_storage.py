@@ -0,0 +1,511 @@
+"""
+Module lưu trữ thông tin video vào SQLite (WAL)
+
+Cùng public API với JsonStorageHandler nhưng dữ liệu nằm trong SQLite nên
+nhiều process (app.py, main.py) có thể đọc/ghi đồng thời mà không phải load
+toàn bộ database vào RAM. Mỗi record được lưu nguyên dạng JSON trong cột
+`data`; các trường hay dùng để lọc/sắp xếp được tách ra cột riêng có index.
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .video_search import tokenize, video_tokens
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    processing_status TEXT,
+    youtube_status TEXT,
+    processing_date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_processing_status ON videos (processing_status);
+CREATE INDEX IF NOT EXISTS idx_videos_youtube_status ON videos (youtube_status);
+DROP INDEX IF EXISTS idx_videos_processing_date;
+CREATE INDEX IF NOT EXISTS idx_videos_processing_date_id ON videos (processing_date, id);
+CREATE INDEX IF NOT EXISTS idx_videos_youtube_video_id ON videos (json_extract(data, '$.youtube_info.video_id'));
+CREATE TABLE IF NOT EXISTS video_tokens (
+    token TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (token, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_video_tokens_video_id ON video_tokens (video_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _row_values(document: Dict) -> tuple:
+    return (
+        document['id'],
+        document.get('processing_status'),
+        (document.get('youtube_info') or {}).get('status'),
+        document.get('processing_date'),
+        json.dumps(document, ensure_ascii=False, default=str)
+    )
+
+
+class SqliteStorageHandler:
+    def __init__(self, sqlite_file='data/videos_database.sqlite3', busy_timeout=30):
+        """
+        Khởi tạo SQLite Storage Handler
+
+        Args:
+            sqlite_file: Đường dẫn đến file SQLite
+            busy_timeout: Số giây chờ khi database đang bị process khác khóa ghi
+        """
+        self.sqlite_file = sqlite_file
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()  # Mỗi thread một connection
+
+        data_dir = os.path.dirname(sqlite_file)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        self._backfill_tokens(conn)
+        print(f"Đã khởi tạo SQLite storage: {self.sqlite_file}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_file, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _touch(self, conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+            (datetime.now().isoformat(),)
+        )
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        return [json.loads(row[0]) for row in self._connection().execute(sql, tuple(params))]
+
+    @staticmethod
+    def _index_tokens(conn: sqlite3.Connection, document: Dict):
+        """
+        Ghi lại inverted index token (tên file, tiêu đề) của một record
+        """
+        conn.execute('DELETE FROM video_tokens WHERE video_id = ?', (document['id'],))
+        conn.executemany(
+            'INSERT OR IGNORE INTO video_tokens (token, video_id) VALUES (?, ?)',
+            ((token, document['id']) for token in video_tokens(document))
+        )
+
+    def _backfill_tokens(self, conn: sqlite3.Connection):
+        """
+        Database tạo trước khi có bảng video_tokens - dựng index token một lần
+        """
+        if conn.execute('SELECT 1 FROM video_tokens LIMIT 1').fetchone():
+            return
+        if not conn.execute('SELECT 1 FROM videos LIMIT 1').fetchone():
+            return
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for (data,) in conn.execute('SELECT data FROM videos').fetchall():
+                self._index_tokens(conn, json.loads(data))
+        print("Đã dựng index tìm kiếm cho database SQLite")
+
+    def save_video_info(self, video_data: Dict) -> Optional[str]:
+        """
+        Lưu thông tin video vào SQLite
+
+        Args:
+            video_data: Dict chứa thông tin video
+
+        Returns:
+            ID của video đã được lưu
+        """
+        try:
+            video_id = str(uuid.uuid4())
+
+            document = {
+                'id': video_id,
+                'input_video': video_data.get('input_video'),
+                'output_video': video_data.get('output_video'),
+                'original_duration': video_data.get('original_duration'),
+                'final_duration': video_data.get('final_duration'),
+                'processing_status': video_data.get('status', 'unknown'),
+                'youtube_info': video_data.get('youtube_info', {}),
+                'processing_date': datetime.now().isoformat(),
+                'metadata': video_data.get('metadata', {})
+            }
+
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('INSERT INTO videos VALUES (?, ?, ?, ?, ?)', _row_values(document))
+                self._index_tokens(conn, document)
+                self._touch(conn)
+
+            print(f"Đã lưu thông tin video với ID: {video_id}")
+            return video_id
+        except Exception as e:
+            print(f"Lỗi khi lưu video info: {e}")
+            return None
+
+    def import_videos(self, videos: List[Dict], last_updated: Optional[str] = None) -> int:
+        """
+        Ghi hàng loạt record có sẵn id (dùng khi migrate từ JSON)
+
+        Returns:
+            Số record đã ghi
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?)',
+                (_row_values(video) for video in videos)
+            )
+            for video in videos:
+                self._index_tokens(conn, video)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)",
+                (last_updated or datetime.now().isoformat(),)
+            )
+        return len(videos)
+
+    def update_youtube_info(self, video_id: str, youtube_data: Dict) -> bool:
+        """
+        Cập nhật thông tin YouTube cho video
+
+        Args:
+            video_id: ID của video
+            youtube_data: Dict chứa thông tin YouTube
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                # Khóa ghi trước khi đọc để hai process không ghi đè lẫn nhau
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT data FROM videos WHERE id = ?', (video_id,)).fetchone()
+                if row is None:
+                    print(f"Không tìm thấy video với ID: {video_id}")
+                    return False
+
+                video = json.loads(row[0])
+                video['youtube_info'] = youtube_data
+                video['updated_at'] = datetime.now().isoformat()
+                conn.execute(
+                    'UPDATE videos SET youtube_status = ?, data = ? WHERE id = ?',
+                    (youtube_data.get('status'), json.dumps(video, ensure_ascii=False, default=str), video_id)
+                )
+                self._index_tokens(conn, video)  # Tiêu đề YouTube cũng được index
+                self._touch(conn)
+
+            print(f"Đã cập nhật YouTube info cho video {video_id}")
+            return True
+        except Exception as e:
+            print(f"Lỗi khi cập nhật YouTube info: {e}")
+            return False
+
+    def update_youtube_info_many(self, updates: Dict[str, Dict]) -> int:
+        """
+        Cập nhật YouTube info cho nhiều video trong một transaction
+
+        Args:
+            updates: Dict video_id -> youtube_data
+
+        Returns:
+            Số video đã cập nhật (bỏ qua id không còn trong database)
+        """
+        try:
+            conn = self._connection()
+            updated_count = 0
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                now = datetime.now().isoformat()
+                for video_id, youtube_data in updates.items():
+                    row = conn.execute('SELECT data FROM videos WHERE id = ?', (video_id,)).fetchone()
+                    if row is None:
+                        continue
+                    video = json.loads(row[0])
+                    video['youtube_info'] = youtube_data
+                    video['updated_at'] = now
+                    conn.execute(
+                        'UPDATE videos SET youtube_status = ?, data = ? WHERE id = ?',
+                        (youtube_data.get('status'), json.dumps(video, ensure_ascii=False, default=str), video_id)
+                    )
+                    self._index_tokens(conn, video)
+                    updated_count += 1
+                self._touch(conn)
+            return updated_count
+        except Exception as e:
+            print(f"Lỗi khi cập nhật YouTube info: {e}")
+            return 0
+
+    def get_video_by_id(self, video_id: str) -> Optional[Dict]:
+        """
+        Lấy thông tin video từ database bằng ID
+        """
+        try:
+            videos = self._query('SELECT data FROM videos WHERE id = ?', (video_id,))
+            return videos[0] if videos else None
+        except Exception as e:
+            print(f"Lỗi khi query video: {e}")
+            return None
+
+    def get_all_videos(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Lấy tất cả video từ database (mới nhất trước)
+
+        Args:
+            limit: Số lượng video tối đa cần lấy
+        """
+        try:
+            sql = 'SELECT data FROM videos ORDER BY processing_date DESC, id DESC'
+            if limit:
+                return self._query(sql + ' LIMIT ?', (limit,))
+            return self._query(sql)
+        except Exception as e:
+            print(f"Lỗi khi query videos: {e}")
+            return []
+
+    def get_videos_page(self, limit: int = 20, before: Optional[str] = None,
+                        after: Optional[str] = None) -> List[Dict]:
+        """
+        Phân trang lịch sử theo keyset (mới nhất trước)
+
+        Args:
+            limit: Số video mỗi trang
+            before: Video id hoặc processing_date - lấy các video cũ hơn cursor
+            after: Video id hoặc processing_date - lấy các video mới hơn cursor
+        """
+        try:
+            cursor = after if after is not None else before
+            if cursor is None:
+                return self.get_all_videos(limit=limit)
+
+            # Cursor là id thì so sánh theo cặp (processing_date, id) để không bỏ sót record trùng ngày
+            row = self._connection().execute(
+                'SELECT processing_date, id FROM videos WHERE id = ?', (cursor,)
+            ).fetchone()
+            if row is not None:
+                key, params = '(processing_date, id)', row
+            else:
+                key, params = 'processing_date', (cursor,)
+
+            if after is not None:
+                marks = ', '.join('?' * len(params))
+                videos = self._query(
+                    f'SELECT data FROM videos WHERE {key} > ({marks}) '
+                    'ORDER BY processing_date ASC, id ASC LIMIT ?', (*params, limit)
+                )
+                return videos[::-1]
+
+            marks = ', '.join('?' * len(params))
+            return self._query(
+                f'SELECT data FROM videos WHERE {key} < ({marks}) '
+                'ORDER BY processing_date DESC, id DESC LIMIT ?', (*params, limit)
+            )
+        except Exception as e:
+            print(f"Lỗi khi query videos: {e}")
+            return []
+
+    @staticmethod
+    def _where(text: Optional[str] = None, processing_status: Optional[str] = None,
+               youtube_status: Optional[str] = None, youtube_video_id: Optional[str] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None) -> Tuple[str, list]:
+        """
+        Dựng mệnh đề WHERE (kèm tham số) cho các bộ lọc, dùng index của từng cột
+        """
+        clauses, params = [], []
+        if date_from:
+            clauses.append('processing_date >= ?')
+            params.append(date_from)
+        if date_to:
+            clauses.append('processing_date <= ?')
+            params.append(date_to + '\uffff')
+        if processing_status:
+            clauses.append('processing_status = ?')
+            params.append(processing_status)
+        if youtube_status == 'none':
+            clauses.append('youtube_status IS NULL')
+        elif youtube_status:
+            clauses.append('youtube_status = ?')
+            params.append(youtube_status)
+        if youtube_video_id:
+            clauses.append("json_extract(data, '$.youtube_info.video_id') = ?")
+            params.append(youtube_video_id)
+        for token in sorted(tokenize(text)):
+            clauses.append('id IN (SELECT video_id FROM video_tokens WHERE token = ?)')
+            params.append(token)
+
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ''
+        return where, params
+
+    def query(self, text: Optional[str] = None, processing_status: Optional[str] = None,
+              youtube_status: Optional[str] = None, youtube_video_id: Optional[str] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None,
+              limit: Optional[int] = 20, offset: int = 0) -> Tuple[int, List[Dict]]:
+        """
+        Tìm video qua các index, mới nhất trước (cùng tham số với JsonStorageHandler.query)
+
+        Returns:
+            (tổng số video khớp, list video của trang)
+        """
+        try:
+            where, params = self._where(text, processing_status, youtube_status,
+                                        youtube_video_id, date_from, date_to)
+            total = self._connection().execute(f'SELECT COUNT(*) FROM videos {where}', params).fetchone()[0]
+            videos = self._query(
+                f'SELECT data FROM videos {where}ORDER BY processing_date DESC, id DESC LIMIT ? OFFSET ?',
+                (*params, -1 if limit is None else limit, offset)
+            )
+            return total, videos
+        except Exception as e:
+            print(f"Lỗi khi tìm video: {e}")
+            return 0, []
+
+    def iter_videos(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                    processing_status: Optional[str] = None, youtube_status: Optional[str] = None,
+                    batch_size: int = 500):
+        """
+        Duyệt video theo thứ tự thời gian (cũ trước) với bộ lọc, đọc theo lô bằng cursor
+
+        Args:
+            date_from: Ngày/giờ ISO bắt đầu (bao gồm)
+            date_to: Ngày/giờ ISO kết thúc (bao gồm, '2025-12-31' lấy hết ngày đó)
+            processing_status: Chỉ lấy video có processing_status này
+            youtube_status: Chỉ lấy video có youtube_info.status này ('none' = chưa upload)
+        """
+        where, params = self._where(date_from=date_from, date_to=date_to,
+                                    processing_status=processing_status, youtube_status=youtube_status)
+        cursor = self._connection().execute(
+            f'SELECT data FROM videos {where}ORDER BY processing_date ASC, id ASC', params
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def get_videos_by_status(self, status: str) -> List[Dict]:
+        """
+        Lấy video theo status xử lý
+        """
+        try:
+            return self._query('SELECT data FROM videos WHERE processing_status = ?', (status,))
+        except Exception as e:
+            print(f"Lỗi khi query videos by status: {e}")
+            return []
+
+    def get_youtube_uploaded_videos(self) -> List[Dict]:
+        """
+        Lấy danh sách video đã upload lên YouTube
+        """
+        try:
+            return self._query("SELECT data FROM videos WHERE youtube_status = 'success'")
+        except Exception as e:
+            print(f"Lỗi khi query YouTube videos: {e}")
+            return []
+
+    def delete_video(self, video_id: str) -> bool:
+        """
+        Xóa video khỏi database
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                deleted = conn.execute('DELETE FROM videos WHERE id = ?', (video_id,)).rowcount
+                if deleted:
+                    conn.execute('DELETE FROM video_tokens WHERE video_id = ?', (video_id,))
+                    self._touch(conn)
+
+            if deleted:
+                print(f"Đã xóa video {video_id} khỏi database")
+            return bool(deleted)
+        except Exception as e:
+            print(f"Lỗi khi xóa video: {e}")
+            return False
+
+    def get_statistics(self) -> Dict:
+        """
+        Lấy thống kê về videos trong database
+        """
+        try:
+            conn = self._connection()
+            count = lambda sql, *params: conn.execute(sql, params).fetchone()[0]
+            last_updated = conn.execute("SELECT value FROM meta WHERE key = 'last_updated'").fetchone()
+
+            stats = {
+                'total_videos': count('SELECT COUNT(*) FROM videos'),
+                'successful_processing': count('SELECT COUNT(*) FROM videos WHERE processing_status = ?', 'success'),
+                'failed_processing': count('SELECT COUNT(*) FROM videos WHERE processing_status = ?', 'error'),
+                'youtube_uploaded': count('SELECT COUNT(*) FROM videos WHERE youtube_status = ?', 'success'),
+                'youtube_pending': 0,
+                'last_updated': last_updated[0] if last_updated else 'N/A'
+            }
+
+            stats['youtube_pending'] = stats['successful_processing'] - stats['youtube_uploaded']
+
+            return stats
+
+        except Exception as e:
+            print(f"Lỗi khi lấy statistics: {e}")
+            return {}
+
+    def export_to_csv(self, csv_file: str = 'data/videos_export.csv') -> bool:
+        """
+        Export dữ liệu ra file CSV (đọc theo cursor, không load toàn bộ vào RAM)
+        """
+        try:
+            import csv
+
+            headers = ['ID', 'Input Video', 'Output Video', 'Duration', 'Status',
+                      'YouTube URL', 'Processing Date']
+
+            exported = 0
+            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(headers)
+
+                for (data,) in self._connection().execute('SELECT data FROM videos'):
+                    video = json.loads(data)
+                    writer.writerow([
+                        video.get('id', ''),
+                        os.path.basename(video.get('input_video') or ''),
+                        os.path.basename(video.get('output_video') or ''),
+                        f"{video.get('final_duration') or 0:.2f}s",
+                        video.get('processing_status', ''),
+                        (video.get('youtube_info') or {}).get('shorts_url', 'N/A'),
+                        (video.get('processing_date') or '')[:10]  # Chỉ lấy ngày
+                    ])
+                    exported += 1
+
+            if not exported:
+                os.remove(csv_file)
+                print("Không có video nào để export")
+                return False
+
+            print(f"Đã export {exported} videos ra file: {csv_file}")
+            return True
+
+        except Exception as e:
+            print(f"Lỗi khi export CSV: {e}")
+            return False
+
+    def close_connection(self):
+        """
+        Đóng connection của thread hiện tại
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+        print("Đã đóng SQLite storage")
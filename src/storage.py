@@ -0,0 +1,59 @@
+"""
+Module chọn storage backend theo cấu hình (DATA_CONFIG)
+"""
+import atexit
+from threading import Lock
+from typing import Dict
+
+from .json_storage import JsonStorageHandler
+from .sqlite_storage import SqliteStorageHandler
+
+
+STORAGE_BACKENDS = ('json', 'sqlite')
+
+
+def create_storage_handler(data_config: Dict):
+    """
+    Tạo storage handler theo DATA_CONFIG['backend']
+
+    Args:
+        data_config: Dict cấu hình (DATA_CONFIG trong config.py)
+
+    Returns:
+        JsonStorageHandler hoặc SqliteStorageHandler (cùng public API)
+    """
+    backend = data_config.get('backend', 'json')
+    if backend == 'sqlite':
+        return SqliteStorageHandler(data_config['sqlite_file'])
+    if backend == 'json':
+        return JsonStorageHandler(
+            data_config['storage_file'],
+            fsync_interval=data_config.get('journal_fsync_interval', 1.0),
+            compact_threshold=data_config.get('journal_compact_threshold', 1000),
+            storage_format=data_config.get('storage_format', 'json')
+        )
+    raise ValueError(f"Unknown storage backend: {backend} (supported: {', '.join(STORAGE_BACKENDS)})")
+
+
+_shared_handlers: Dict[tuple, object] = {}
+_shared_lock = Lock()
+
+
+def get_storage_handler(data_config: Dict):
+    """
+    Lấy storage handler dùng chung trong process (tạo lần đầu, các lần sau dùng lại)
+
+    Handler an toàn khi dùng từ nhiều thread; close_connection() trên handler
+    dùng chung chỉ flush dữ liệu, handler vẫn dùng tiếp được.
+    """
+    backend = data_config.get('backend', 'json')
+    path = data_config['sqlite_file'] if backend == 'sqlite' else data_config['storage_file']
+    key = (backend, path)
+
+    with _shared_lock:
+        handler = _shared_handlers.get(key)
+        if handler is None:
+            handler = create_storage_handler(data_config)
+            _shared_handlers[key] = handler
+            atexit.register(handler.close_connection)
+        return handler
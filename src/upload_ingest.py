@@ -0,0 +1,360 @@
+"""
+Module ghi file upload thẳng xuống thư mục input (streaming ingest)
+
+Thay vì để werkzeug spool toàn bộ multipart body vào file tạm rồi copy sang
+thư mục input, IngestFile nhận dữ liệu ngay khi parser đọc được, ghi theo
+block lớn vào file .part cạnh file đích, đồng thời tính hash và nhận diện
+container từ các byte đầu tiên. Khi request xử lý xong chỉ cần rename.
+
+Với MP4/MOV, Mp4Probe đọc thông tin video (thời lượng, kích thước) ngay khi box
+'moov' được nhận đủ - với file faststart (moov ở đầu) là trước khi upload xong.
+"""
+import hashlib
+import os
+import shutil
+import struct
+import time
+import uuid
+from typing import Dict, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil là optional, chỉ dùng để đo RSS
+    psutil = None
+
+
+# Số byte đầu tiên cần có để nhận diện container
+SNIFF_BYTES = 16
+
+VIDEO_EXTENSIONS = ('mp4', 'avi', 'mov', 'mkv', 'wmv', 'webm', 'flv')
+
+# Các box thường gặp ở đầu file QuickTime cũ không có 'ftyp'
+_QUICKTIME_BOXES = (b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot')
+
+
+class IngestRejected(Exception):
+    """Dữ liệu upload không phải container video được hỗ trợ"""
+
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Nhận diện container video từ các byte đầu file
+
+    Returns:
+        Tên container ('mp4', 'mov', 'matroska', 'avi', 'asf', 'flv') hoặc None
+    """
+    if len(header) >= 12 and header[4:8] == b'ftyp':
+        return 'mov' if header[8:12] == b'qt  ' else 'mp4'
+    if len(header) >= 8 and header[4:8] in _QUICKTIME_BOXES:
+        return 'mov'
+    if header.startswith(b'\x1a\x45\xdf\xa3'):
+        return 'matroska'  # mkv và webm
+    if len(header) >= 12 and header.startswith(b'RIFF') and header[8:12] == b'AVI ':
+        return 'avi'
+    if header.startswith(b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'):
+        return 'asf'  # wmv
+    if header.startswith(b'FLV'):
+        return 'flv'
+    return None
+
+
+# Box 'moov' lớn hơn mức này thì bỏ probe (không giữ quá nhiều trong RAM)
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+
+
+def _boxes(buf: bytes, start: int = 0, end: Optional[int] = None):
+    """
+    Duyệt các box ISO BMFF con trong buf[start:end] - yield (type, content_start, box_end)
+    """
+    end = len(buf) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', buf, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from('>Q', buf, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def parse_moov(moov: bytes) -> Dict:
+    """
+    Lấy thời lượng (mvhd) và kích thước track video (tkhd của track 'vide') từ nội dung box moov
+
+    Returns:
+        Dict có thể gồm duration (giây), width, height
+    """
+    info: Dict = {}
+    for box_type, start, end in _boxes(moov):
+        if box_type == b'mvhd' and start + 32 <= end:
+            if moov[start] == 1:
+                timescale, duration = struct.unpack_from('>IQ', moov, start + 20)
+            else:
+                timescale, duration = struct.unpack_from('>II', moov, start + 12)
+            if timescale:
+                info['duration'] = round(duration / timescale, 3)
+        elif box_type == b'trak' and 'width' not in info:
+            tkhd, handler = None, None
+            for child_type, child_start, child_end in _boxes(moov, start, end):
+                if child_type == b'tkhd':
+                    tkhd = (child_start, child_end)
+                elif child_type == b'mdia':
+                    for media_type, media_start, media_end in _boxes(moov, child_start, child_end):
+                        if media_type == b'hdlr' and media_start + 12 <= media_end:
+                            handler = moov[media_start + 8:media_start + 12]
+            if handler == b'vide' and tkhd is not None:
+                # width/height dạng 16.16 fixed-point, vị trí phụ thuộc version của tkhd
+                offset = tkhd[0] + (88 if moov[tkhd[0]] == 1 else 76)
+                if offset + 8 <= tkhd[1]:
+                    width, height = struct.unpack_from('>II', moov, offset)
+                    info['width'], info['height'] = width >> 16, height >> 16
+    return info
+
+
+class Mp4Probe:
+    """
+    Đọc thông tin MP4/MOV trong lúc dữ liệu đang tới: duyệt box cấp cao nhất,
+    chỉ giữ lại nội dung box 'moov' (bỏ qua mdat) và parse ngay khi nhận đủ
+    """
+
+    def __init__(self):
+        self.result: Optional[Dict] = None
+        self.failed = False
+        self.bytes_seen = 0
+        self._head = bytearray()
+        self._box_type = None
+        self._remaining = 0
+        self._moov = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None or self.failed
+
+    def feed(self, data: bytes):
+        view = memoryview(data)
+        i = 0
+        while i < len(view) and not self.done:
+            if self._box_type is None:
+                # Đang đọc header box: 8 byte, hoặc 16 byte khi size = 1 (largesize)
+                needed = 16 if self._head[:4] == b'\0\0\0\x01' else 8
+                take = min(needed - len(self._head), len(view) - i)
+                self._head += view[i:i + take]
+                i += take
+                if len(self._head) < (16 if self._head[:4] == b'\0\0\0\x01' else 8):
+                    continue
+                size, box_type = struct.unpack_from('>I4s', self._head)
+                if size == 1:
+                    size = struct.unpack_from('>Q', self._head, 8)[0]
+                if size < len(self._head) or (box_type == b'moov' and size > MAX_MOOV_BYTES):
+                    self.failed = True  # size = 0 (box tới hết file), dữ liệu hỏng hoặc moov quá lớn
+                    break
+                self._box_type = box_type
+                self._remaining = size - len(self._head)
+                self._moov = bytearray() if box_type == b'moov' else None
+                self._head = bytearray()
+            else:
+                take = min(self._remaining, len(view) - i)
+                if self._moov is not None:
+                    self._moov += view[i:i + take]
+                i += take
+                self._remaining -= take
+
+            if self._box_type is not None and self._remaining == 0:
+                if self._moov is not None:
+                    self.result = parse_moov(bytes(self._moov))
+                    self._moov = None
+                self._box_type = None
+        self.bytes_seen += i
+
+
+def _current_rss() -> int:
+    if psutil is None:
+        return 0
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class IngestFile:
+    def __init__(self, folder: str, filename: Optional[str] = None,
+                 chunk_size: int = 4 * 1024 * 1024):
+        """
+        File-like object mà werkzeug ghi multipart data vào
+
+        Args:
+            folder: Thư mục chứa file .part (nên là thư mục đích cuối cùng
+                    để bước commit chỉ là rename)
+            filename: Tên file client gửi lên, dùng để biết có cần kiểm tra
+                      header video hay không
+            chunk_size: Kích thước block ghi xuống disk
+        """
+        self.path = os.path.join(folder, f".ingest-{uuid.uuid4().hex}.part")
+        self.chunk_size = chunk_size
+        self.expect_video = bool(
+            filename and '.' in filename
+            and filename.rsplit('.', 1)[1].lower() in VIDEO_EXTENSIONS
+        )
+        self.committed = False
+
+        self._file = open(self.path, 'w+b', buffering=0)
+        self._buffer = bytearray()
+        self._header = b''
+        self._hash = hashlib.sha256()
+        self._probe = Mp4Probe()
+        self._started = time.time()
+
+        self.stats: Dict = {
+            'bytes': 0,
+            'disk_writes': 0,
+            'container': None,
+            'sha256': None,
+            'header_seconds': None,
+            'probe': None,
+            'probe_bytes': None,
+            'probe_seconds': None,
+            'seconds': None,
+            'peak_rss': _current_rss()
+        }
+
+    # --- phía ghi (werkzeug parser) ---
+
+    def write(self, data: bytes) -> int:
+        if len(self._header) < SNIFF_BYTES:
+            self._sniff(data)
+        if self._probe is not None:
+            self._feed_probe(data)
+
+        self._hash.update(data)
+        self._buffer += data
+        self.stats['bytes'] += len(data)
+
+        if len(self._buffer) >= self.chunk_size:
+            self._flush_buffer()
+        return len(data)
+
+    def _sniff(self, data: bytes):
+        self._header += data[:SNIFF_BYTES - len(self._header)]
+        if len(self._header) < SNIFF_BYTES:
+            return
+
+        self.stats['container'] = sniff_container(self._header)
+        self.stats['header_seconds'] = round(time.time() - self._started, 4)
+        if self.expect_video and self.stats['container'] is None:
+            raise IngestRejected('Uploaded data is not a supported video container')
+
+    def _feed_probe(self, data: bytes):
+        """
+        Probe MP4/MOV song song với lúc nhận dữ liệu; container khác thì dừng probe
+        """
+        if len(self._header) >= SNIFF_BYTES and self.stats['container'] not in ('mp4', 'mov'):
+            self._probe = None
+            return
+
+        self._probe.feed(data)
+        if not self._probe.done:
+            return
+        if self._probe.result:
+            self.stats['probe'] = self._probe.result
+            self.stats['probe_bytes'] = self._probe.bytes_seen
+            self.stats['probe_seconds'] = round(time.time() - self._started, 4)
+        self._probe = None
+
+    def _flush_buffer(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self.stats['disk_writes'] += 1
+            self._buffer.clear()
+            self.stats['peak_rss'] = max(self.stats['peak_rss'], _current_rss())
+
+    # --- phía đọc (FileStorage sau khi parse xong) ---
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        self._flush_buffer()
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell() + len(self._buffer)
+
+    def read(self, size: int = -1) -> bytes:
+        self._flush_buffer()
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        self._flush_buffer()
+        return self._file.readline(size)
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def flush(self):
+        self._flush_buffer()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self):
+        if not self._file.closed:
+            self._flush_buffer()
+            self._file.close()
+
+    # --- commit / discard ---
+
+    def commit(self, dest_path: str) -> Dict:
+        """
+        Chuyển file .part thành file đích (rename, không copy dữ liệu)
+
+        Returns:
+            Dict thống kê ingest (bytes, sha256, container, disk_writes, ...)
+        """
+        self.close()
+        try:
+            os.replace(self.path, dest_path)
+        except OSError:
+            # Khác filesystem (ví dụ input và temp mount riêng)
+            shutil.move(self.path, dest_path)
+        self.committed = True
+
+        self.stats['sha256'] = self._hash.hexdigest()
+        self.stats['seconds'] = round(time.time() - self._started, 4)
+        return dict(self.stats)
+
+    def discard(self):
+        """
+        Xóa file .part nếu request không dùng tới
+        """
+        self.close()
+        if not self.committed and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def commit_upload(file_storage, dest_path: str) -> Optional[Dict]:
+    """
+    Lưu một FileStorage xuống dest_path
+
+    Nếu file đã được stream vào IngestFile thì chỉ cần rename; các trường hợp
+    khác (ví dụ request không đi qua IngestRequest) fallback về save().
+
+    Returns:
+        Dict thống kê ingest hoặc None nếu dùng save()
+    """
+    stream = file_storage.stream
+    if isinstance(stream, IngestFile):
+        return stream.commit(dest_path)
+
+    file_storage.save(dest_path)
+    return None
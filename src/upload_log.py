@@ -0,0 +1,221 @@
+"""
+Module log upload dạng JSONL append-only (thay cho logs/direct_uploads.json)
+
+Mỗi upload thành công là một dòng JSON, được ghi bằng một lệnh write duy nhất
+trên file mở O_APPEND nên các process upload song song không ghi đè lên nhau
+và chi phí ghi không phụ thuộc độ dài lịch sử. File được xoay vòng theo kích
+thước (`max_bytes`) hoặc theo ngày (`rotate='daily'`); file cũ được đổi tên
+thành <tên>.<thời điểm>.jsonl và chỉ giữ `backup_count` file gần nhất.
+"""
+import glob
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from .file_lock import FileLock
+
+
+ROTATE_MODES = ('size', 'daily')
+
+
+class UploadLog:
+    def __init__(self, log_file='logs/direct_uploads.jsonl', max_bytes=10 * 1024 * 1024,
+                 rotate='size', backup_count=10):
+        """
+        Khởi tạo Upload Log
+
+        Args:
+            log_file: Đường dẫn file JSONL đang ghi
+            max_bytes: Kích thước tối đa trước khi xoay vòng (rotate='size', 0 = không giới hạn)
+            rotate: 'size' hoặc 'daily' (sang ngày mới thì bắt đầu file mới)
+            backup_count: Số file đã xoay vòng được giữ lại (0 = giữ tất cả)
+        """
+        if rotate not in ROTATE_MODES:
+            raise ValueError(f"Unsupported rotate mode: {rotate}")
+
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.rotate = rotate
+        self.backup_count = backup_count
+        self._lock = FileLock(log_file + '.lock')
+
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+    # --- ghi ---
+
+    def _should_rotate(self, incoming: int) -> bool:
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return False
+        if not stat.st_size:
+            return False
+        if self.rotate == 'daily':
+            return datetime.fromtimestamp(stat.st_mtime).date() != datetime.now().date()
+        return bool(self.max_bytes) and stat.st_size + incoming > self.max_bytes
+
+    def _rotated_files(self) -> List[str]:
+        """
+        Các file đã xoay vòng, cũ trước (tên chứa thời điểm nên sort theo tên là đủ)
+        """
+        stem, ext = os.path.splitext(self.log_file)
+        return sorted(glob.glob(f"{glob.escape(stem)}.*{ext}"))
+
+    def _do_rotate(self):
+        stem, ext = os.path.splitext(self.log_file)
+        if self.rotate == 'daily':
+            suffix = datetime.fromtimestamp(os.path.getmtime(self.log_file)).strftime('%Y%m%d')
+        else:
+            suffix = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        target = f"{stem}.{suffix}{ext}"
+        if os.path.exists(target):
+            # Trùng tên (daily log được tạo lại trong cùng ngày) - nối thêm thời điểm
+            target = f"{stem}.{suffix}-{datetime.now().strftime('%H%M%S-%f')}{ext}"
+        os.replace(self.log_file, target)
+
+        if self.backup_count:
+            for old_file in self._rotated_files()[:-self.backup_count]:
+                try:
+                    os.remove(old_file)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _encode(entry: Dict) -> bytes:
+        return json.dumps(entry, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+
+    def append(self, entry: Dict):
+        """
+        Ghi thêm một entry (một dòng, một lệnh write)
+        """
+        line = self._encode(entry)
+        # Lock chỉ để xoay vòng an toàn giữa các process; bản thân dòng được
+        # ghi nguyên vẹn nhờ O_APPEND + một lệnh write
+        with self._lock.exclusive():
+            if self._should_rotate(len(line)):
+                self._do_rotate()
+            fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                written = os.write(fd, line)
+                while written < len(line):  # Hiếm gặp (ví dụ bị signal ngắt giữa chừng)
+                    written += os.write(fd, line[written:])
+            finally:
+                os.close(fd)
+
+    # --- đọc ---
+
+    @staticmethod
+    def _parse(line: bytes) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            # Dòng hỏng (ví dụ bị cắt khi crash) - bỏ qua
+            return None
+
+    def files(self) -> List[str]:
+        """
+        Tất cả file log, cũ trước (file đang ghi nằm cuối)
+        """
+        files = self._rotated_files()
+        if os.path.exists(self.log_file):
+            files.append(self.log_file)
+        return files
+
+    def iter_entries(self, include_rotated: bool = True) -> Iterator[Dict]:
+        """
+        Duyệt các entry theo thứ tự ghi (cũ trước), đọc từng dòng
+        """
+        for log_file in (self.files() if include_rotated else [self.log_file]):
+            try:
+                with open(log_file, 'rb') as f:
+                    for line in f:
+                        entry = self._parse(line)
+                        if entry is not None:
+                            yield entry
+            except FileNotFoundError:
+                # File bị xoay vòng/xóa trong lúc đọc
+                continue
+
+    @classmethod
+    def _tail_file(cls, log_file: str, count: int, block_size: int = 64 * 1024) -> List[Dict]:
+        """
+        Đọc ngược từ cuối file theo block cho đến khi đủ `count` dòng
+        """
+        with open(log_file, 'rb') as f:
+            position = f.seek(0, os.SEEK_END)
+            data = b''
+            while position > 0 and data.count(b'\n') <= count:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                data = f.read(step) + data
+
+        lines = data.splitlines()
+        if position > 0:
+            lines = lines[1:]  # Dòng đầu có thể bị cắt giữa chừng
+        entries = [entry for entry in map(cls._parse, lines) if entry is not None]
+        return entries[-count:] if count else []
+
+    def tail(self, count: int = 20) -> List[Dict]:
+        """
+        `count` entry mới nhất (cũ trước, giống `tail -n`) - không đọc cả lịch sử
+        """
+        result: List[Dict] = []
+        for log_file in reversed(self.files()):
+            if len(result) >= count:
+                break
+            try:
+                result = self._tail_file(log_file, count - len(result)) + result
+            except FileNotFoundError:
+                continue
+        return result
+
+
+def convert_json_log(json_file: str, upload_log: UploadLog, keep_original: bool = False) -> int:
+    """
+    Chuyển log cũ (một JSON array) sang upload log JSONL
+
+    Chạy trong lock của upload log: nhiều thread/process cùng chuyển thì chỉ
+    process đầu tiên thấy file cũ. Entry cũ được ghi vào file tạm, nối thêm các
+    dòng đang có trong file log rồi rename vào chỗ - lịch sử cũ luôn đứng trước
+    và không có trạng thái ghi dở. Sau đó file gốc được đổi tên thành
+    <json_file>.migrated; nếu bị crash giữa hai lần rename thì lần chạy sau nhận
+    ra file log đã bắt đầu bằng đúng các entry cũ và chỉ đổi tên file gốc.
+
+    Returns:
+        Số entry đã chuyển (0 nếu file cũ không còn hoặc đã được chuyển trước đó)
+    """
+    with upload_log._lock.exclusive():
+        if not os.path.exists(json_file):
+            return 0
+
+        with open(json_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if not isinstance(entries, list):
+            raise ValueError(f"{json_file} không phải JSON array")
+
+        lines = [upload_log._encode(entry) for entry in entries]
+        log_file = upload_log.log_file
+        converted = False
+        if lines and os.path.exists(log_file):
+            with open(log_file, 'rb') as f:
+                converted = all(f.readline() == line for line in lines)
+
+        if not converted:
+            temp_file = log_file + '.converting'
+            with open(temp_file, 'wb') as out:
+                out.writelines(lines)
+                if os.path.exists(log_file):
+                    with open(log_file, 'rb') as current:
+                        shutil.copyfileobj(current, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp_file, log_file)
+
+        if not keep_original:
+            os.replace(json_file, json_file + '.migrated')
+        return 0 if converted else len(entries)
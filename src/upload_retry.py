@@ -0,0 +1,106 @@
+"""
+Module phân loại lỗi tạm thời khi upload YouTube và backoff có jitter
+
+Lỗi 5xx/429 của server và lỗi mạng (timeout, mất kết nối, lỗi DNS/httplib2)
+được coi là tạm thời: upload chờ rồi gửi tiếp từ byte server đã xác nhận
+(sau lỗi, next_chunk() tự hỏi server offset bằng PUT `bytes */size`). Các lỗi
+khác (4xx, lỗi đọc file...) dừng upload ngay.
+"""
+import http.client
+import random
+import socket
+import ssl
+from typing import Dict, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# ConnectionError gồm ConnectionResetError, BrokenPipeError, ConnectionAbortedError...
+RETRYABLE_EXCEPTIONS = (socket.timeout, TimeoutError, ConnectionError, ssl.SSLError,
+                        http.client.HTTPException)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Lỗi có phải lỗi tạm thời nên thử lại không
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUS_CODES
+    if isinstance(error, httplib2.HttpLib2Error):
+        # Lỗi có response (redirect, giải nén) là lỗi của request, không phải của mạng
+        return not isinstance(error, httplib2.HttpLib2ErrorWithResponse)
+    if isinstance(error, ssl.SSLCertVerificationError):
+        return False
+    return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+
+def http_status(error: BaseException) -> Optional[int]:
+    """
+    Status HTTP của lỗi response (HttpError của googleapiclient hoặc AsyncHTTPError), None nếu là lỗi mạng
+    """
+    if isinstance(error, HttpError):
+        return error.resp.status
+    status = getattr(error, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def describe_error(error: BaseException) -> str:
+    if http_status(error) is not None:
+        return f"HTTP {http_status(error)}"
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+class RetryBackoff:
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Exponential backoff có jitter cho một lần upload
+
+        Args:
+            max_retries: Số lần thử lại liên tiếp tối đa khi không có tiến triển
+                (đếm lại từ 0 sau mỗi chunk thành công)
+            base_delay: Thời gian chờ của lần thử lại đầu tiên (giây)
+            max_delay: Thời gian chờ tối đa mỗi lần
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt = 0
+        self.network_retries = 0
+        self.http_retries = 0
+        self.backoff_seconds = 0.0
+
+    def failed(self, error: BaseException) -> Optional[float]:
+        """
+        Ghi nhận lỗi tạm thời
+
+        Returns:
+            Số giây cần chờ trước khi thử lại, None nếu đã hết số lần thử
+        """
+        if self.attempt >= self.max_retries:
+            return None
+        self.attempt += 1
+        if http_status(error) is not None:
+            self.http_retries += 1
+        else:
+            self.network_retries += 1
+
+        # "Equal jitter": nửa cố định + nửa ngẫu nhiên - các upload lỗi cùng lúc
+        # không thử lại cùng một thời điểm
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.attempt - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        self.backoff_seconds += delay
+        return delay
+
+    def succeeded(self):
+        self.attempt = 0
+
+    def stats(self) -> Dict:
+        return {
+            'retries': self.network_retries + self.http_retries,
+            'network_retries': self.network_retries,
+            'http_retries': self.http_retries,
+            'backoff_seconds': round(self.backoff_seconds, 3)
+        }
@@ -0,0 +1,312 @@
+"""
+Module lập lịch upload YouTube theo quota và tốc độ request
+
+UploadScheduler chạy nhiều upload song song (giới hạn `max_concurrent`), điều
+tiết tốc độ request bằng token bucket và giữ sổ quota theo ngày (đơn vị quota
+của YouTube Data API). YouTubeUploader ghi vào sổ số unit thực tế của từng
+request (insert, thumbnails.set, list); trước mỗi upload scheduler giữ chỗ số
+unit sẽ dùng, và khi không còn đủ quota thì chờ đến lúc quota được reset (nửa
+đêm giờ Pacific) thay vì gửi request để nhận lỗi quotaExceeded. Unit upload ghi
+vào sổ được trừ vào phần đã giữ chỗ của chính upload đó (current_reservation)
+nên không bị tính hai lần.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .file_lock import FileLock
+
+try:
+    from zoneinfo import ZoneInfo
+    _PACIFIC = ZoneInfo('America/Los_Angeles')
+except Exception:  # Thiếu tzdata (Windows) - dùng UTC-8 cố định
+    from datetime import timezone
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+
+# Chi phí quota (unit) của các method YouTube Data API v3 mà project dùng
+QUOTA_COSTS = {
+    'videos.insert': 1600,
+    'thumbnails.set': 50,
+    'videos.list': 1,
+    'channels.list': 1
+}
+
+
+def upload_cost(thumbnail: bool = False) -> int:
+    """
+    Số unit một lần upload video (kèm thumbnail nếu có)
+    """
+    return QUOTA_COSTS['videos.insert'] + (QUOTA_COSTS['thumbnails.set'] if thumbnail else 0)
+
+
+def is_quota_error(result: Optional[Dict]) -> bool:
+    """
+    Kết quả upload_video() có phải lỗi hết quota không
+    """
+    if not result or result.get('status') == 'success':
+        return False
+    return result.get('reason') in ('quotaExceeded', 'dailyLimitExceeded') or \
+        'quotaExceeded' in (result.get('message') or '')
+
+
+class QuotaReservation:
+    def __init__(self, ledger: 'QuotaLedger', units: int):
+        """
+        Phần quota đã giữ chỗ cho một upload - `units` là số unit còn chưa dùng đến
+        """
+        self.ledger = ledger
+        self.units = units
+
+
+# Reservation của upload đang chạy trong context hiện tại (do UploadScheduler đặt)
+_current_reservation = contextvars.ContextVar('quota_reservation', default=None)
+
+
+def current_reservation() -> Optional[QuotaReservation]:
+    return _current_reservation.get()
+
+
+class QuotaLedger:
+    def __init__(self, ledger_file: Optional[str] = 'data/youtube_quota.json', daily_limit: int = 10000):
+        """
+        Sổ quota theo ngày (ngày tính theo giờ Pacific như YouTube)
+
+        Args:
+            ledger_file: File JSON lưu số unit đã dùng, dùng chung giữa các
+                process (None = chỉ giữ trong RAM)
+            daily_limit: Quota mỗi ngày của project
+        """
+        self.ledger_file = ledger_file
+        self.daily_limit = daily_limit
+        self.lock = threading.Lock()
+        self._file_lock = FileLock(ledger_file + '.lock') if ledger_file else None
+        self._state = {'date': self._today(), 'used': 0, 'by_method': {}}
+        self._held = 0  # Unit đang giữ chỗ cho các upload đang chạy trong process này
+
+        if ledger_file:
+            ledger_dir = os.path.dirname(ledger_file)
+            if ledger_dir and not os.path.exists(ledger_dir):
+                os.makedirs(ledger_dir)
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(_PACIFIC)
+
+    def _today(self) -> str:
+        return self._now().date().isoformat()
+
+    def seconds_until_reset(self) -> float:
+        """
+        Số giây đến lần reset quota tiếp theo (nửa đêm giờ Pacific)
+        """
+        now = self._now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1.0, (midnight - now).total_seconds())
+
+    def _load(self) -> Dict:
+        if self.ledger_file and os.path.exists(self.ledger_file):
+            try:
+                with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Lỗi khi đọc quota ledger: {e}")
+        if self._state.get('date') != self._today():
+            self._state = {'date': self._today(), 'used': 0, 'by_method': {}}
+        return self._state
+
+    def _save(self):
+        if not self.ledger_file:
+            return
+        tmp_file = f"{self.ledger_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_file, self.ledger_file)
+
+    def _update(self, fn):
+        with self.lock:
+            if self._file_lock is None:
+                return fn(self._load())
+            with self._file_lock.exclusive():
+                return fn(self._load())
+
+    def reserve(self, units: int) -> Optional[QuotaReservation]:
+        """
+        Giữ chỗ `units` unit nếu còn đủ quota hôm nay (gọi release() khi xong)
+
+        Returns:
+            QuotaReservation nếu đã giữ chỗ, None nếu không đủ
+        """
+        def apply(state):
+            if state['used'] + self._held + units > self.daily_limit:
+                return None
+            self._held += units
+            return QuotaReservation(self, units)
+        return self._update(apply)
+
+    def release(self, reservation: QuotaReservation):
+        """
+        Trả lại phần giữ chỗ chưa dùng đến
+        """
+        with self.lock:
+            self._held = max(0, self._held - reservation.units)
+            reservation.units = 0
+
+    def charge(self, method: str, count: int = 1, reservation: Optional[QuotaReservation] = None):
+        """
+        Ghi nhận request đã gửi lên API
+
+        Args:
+            reservation: Phần giữ chỗ của upload gửi request - unit được chuyển từ
+                giữ chỗ sang đã dùng thay vì cộng thêm
+        """
+        units = QUOTA_COSTS.get(method, 1) * count
+
+        def apply(state):
+            if reservation is not None and reservation.ledger is self:
+                taken = min(reservation.units, units)
+                reservation.units -= taken
+                self._held = max(0, self._held - taken)
+            state['used'] += units
+            state['by_method'][method] = state['by_method'].get(method, 0) + units
+            self._save()
+        self._update(apply)
+
+    def mark_exhausted(self):
+        """
+        API đã trả quotaExceeded - coi như hết quota đến lần reset tiếp theo
+        """
+        def apply(state):
+            state['used'] = max(state['used'], self.daily_limit)
+            self._save()
+        self._update(apply)
+
+    def remaining(self) -> int:
+        return self._update(lambda state: max(0, self.daily_limit - state['used'] - self._held))
+
+    def snapshot(self) -> Dict:
+        """
+        Trạng thái quota hôm nay (dùng cho log/metrics)
+        """
+        def read(state):
+            return {
+                'date': state['date'],
+                'used': state['used'],
+                'limit': self.daily_limit,
+                'remaining': max(0, self.daily_limit - state['used']),
+                'by_method': dict(state['by_method']),
+                'reset_in_seconds': int(self.seconds_until_reset())
+            }
+        return self._update(read)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Số request mỗi giây (<= 0 = không giới hạn)
+            capacity: Số request được gửi dồn tối đa (mặc định max(1, rate))
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """
+        Chờ đến khi có đủ token rồi lấy
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class UploadScheduler:
+    def __init__(self, max_concurrent: int = 2, requests_per_second: float = 0.5,
+                 ledger: Optional[QuotaLedger] = None, max_quota_waits: int = 1):
+        """
+        Khởi tạo Upload Scheduler
+
+        Args:
+            max_concurrent: Số upload chạy song song tối đa
+            requests_per_second: Tốc độ bắt đầu upload tối đa (token bucket)
+            ledger: Sổ quota (mặc định QuotaLedger() với file data/youtube_quota.json);
+                uploader dùng trong các task cần ghi vào cùng sổ này
+            max_quota_waits: Số lần tối đa một upload chờ qua lần reset quota
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.bucket = TokenBucket(requests_per_second)
+        self.ledger = ledger if ledger is not None else QuotaLedger()
+        self.max_quota_waits = max_quota_waits
+
+    def _wait_for_reset(self, label: str):
+        wait = self.ledger.seconds_until_reset()
+        resume_at = datetime.now() + timedelta(seconds=wait)
+        print(f"⏸️  Hết quota YouTube API - tạm dừng {label} đến {resume_at.strftime('%d/%m %H:%M')}")
+        time.sleep(wait)
+
+    def _run_one(self, label: str, fn: Callable[[], Dict], cost: int) -> Dict:
+        waits = 0
+        while True:
+            reservation = self.ledger.reserve(cost)
+            if reservation is None:
+                if waits >= self.max_quota_waits:
+                    return {'status': 'error', 'reason': 'quotaExceeded',
+                            'message': 'Hết quota YouTube API trong ngày'}
+                waits += 1
+                self._wait_for_reset(label)
+                continue
+
+            self.bucket.acquire()
+            token = _current_reservation.set(reservation)
+            try:
+                result = fn()
+            finally:
+                _current_reservation.reset(token)
+                self.ledger.release(reservation)
+            if not is_quota_error(result):
+                return result
+
+            # Sổ quota lệch với server (project dùng chung quota) - chờ reset rồi thử lại
+            self.ledger.mark_exhausted()
+            if waits >= self.max_quota_waits:
+                return result
+            waits += 1
+            self._wait_for_reset(label)
+
+    def run(self, tasks: Iterable[tuple]) -> List[Dict]:
+        """
+        Chạy các upload và trả kết quả theo đúng thứ tự đầu vào
+
+        Args:
+            tasks: Các tuple (label, fn, cost) - fn() thực hiện upload và trả
+                dict kết quả như YouTubeUploader.upload_video, cost là số unit quota
+
+        Returns:
+            List kết quả của fn theo thứ tự tasks
+        """
+        tasks = list(tasks)
+        with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+            futures = [executor.submit(self._run_one, label, fn, cost) for label, fn, cost in tasks]
+            results = []
+            for (label, _, _), future in zip(tasks, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'status': 'error', 'message': f'Lỗi upload {label}: {e}'})
+            return results
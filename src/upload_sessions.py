@@ -0,0 +1,172 @@
+"""
+Module lưu session resumable upload của YouTube ra đĩa (upload tiếp sau crash)
+
+Khi upload bắt đầu, YouTube trả về một session URI; mọi chunk sau đó được PUT
+vào URI này. Module lưu URI cùng định danh file (đường dẫn, kích thước, mtime,
+fingerprint phần đầu file) và offset server đã xác nhận vào
+<session_folder>/<key>.json. Lần upload sau của cùng file hỏi server khoảng
+byte đã nhận (PUT rỗng với Content-Range: bytes */<size>) rồi gửi tiếp từ đó
+thay vì bắt đầu lại từ byte 0.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+
+FINGERPRINT_BYTES = 1024 * 1024
+
+
+class UploadSessionExpired(Exception):
+    """Session URI không còn hợp lệ trên server (404/410) - phải upload lại từ đầu"""
+
+
+def file_identity(video_path: str) -> Dict:
+    """
+    Định danh file: đường dẫn thật, kích thước, mtime và sha1 của 1 MB đầu
+    """
+    path = os.path.realpath(video_path)
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        fingerprint = hashlib.sha1(f.read(FINGERPRINT_BYTES)).hexdigest()
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'fingerprint': fingerprint
+    }
+
+
+def query_upload_offset(http, resumable_uri: str, size: int) -> Tuple[int, Optional[Dict]]:
+    """
+    Hỏi server số byte đã nhận của một session
+
+    Args:
+        http: Object có request(uri, method, body, headers) kiểu httplib2, không tự
+            theo redirect 308 (như googleapiclient.http.build_http(), insert_request.http)
+        resumable_uri: Session URI
+        size: Kích thước file
+
+    Returns:
+        (offset đã xác nhận, resource video nếu upload đã hoàn tất trước đó)
+
+    Raises:
+        UploadSessionExpired: Session không còn trên server
+    """
+    resp, content = http.request(
+        resumable_uri, 'PUT', body=b'',
+        headers={'Content-Range': f'bytes */{size}', 'Content-Length': '0'}
+    )
+    status = int(resp.status)
+    if status in (200, 201):
+        return size, json.loads(content.decode('utf-8') if isinstance(content, bytes) else content)
+    if status == 308:
+        # Range: bytes=0-<last byte> ; không có header = chưa nhận byte nào
+        byte_range = resp.get('range')
+        if not byte_range:
+            return 0, None
+        return int(byte_range.rsplit('-', 1)[1]) + 1, None
+    if status in (404, 410):
+        raise UploadSessionExpired(f'Session upload hết hạn (HTTP {status})')
+    raise IOError(f'Không hỏi được trạng thái session upload: HTTP {status}')
+
+
+class UploadSessionStore:
+    def __init__(self, session_folder: str = 'data/youtube_sessions', session_ttl: int = 6 * 86400):
+        """
+        Khởi tạo kho session
+
+        Args:
+            session_folder: Thư mục lưu file session
+            session_ttl: Số giây một session còn được dùng lại (session URI
+                của YouTube hết hạn sau khoảng một tuần)
+        """
+        self.session_folder = session_folder
+        self.session_ttl = session_ttl
+        if not os.path.exists(session_folder):
+            os.makedirs(session_folder)
+        else:
+            self.cleanup_expired()
+
+    @staticmethod
+    def session_key(identity: Dict) -> str:
+        raw = f"{identity['path']}:{identity['size']}:{identity['mtime_ns']}:{identity['fingerprint']}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.session_folder, f"{key}.json")
+
+    def load(self, identity: Dict) -> Optional[Dict]:
+        """
+        Session còn dùng được của file (None nếu chưa có hoặc đã hết hạn)
+
+        Metadata (title, mô tả) đã được gửi lúc tạo session nên video upload
+        tiếp giữ metadata của lần đầu.
+        """
+        key = self.session_key(identity)
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - session.get('created', 0) > self.session_ttl:
+            self.delete(identity)
+            return None
+        return session
+
+    def save(self, identity: Dict, resumable_uri: str, offset: int, title: Optional[str] = None):
+        """
+        Ghi session (file tạm rồi rename để không bao giờ đọc phải file ghi dở)
+        """
+        key = self.session_key(identity)
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                created = json.load(f).get('created')
+        except (OSError, ValueError):
+            created = None
+
+        session = {
+            'resumable_uri': resumable_uri,
+            'offset': offset,
+            'file': identity,
+            'title': title,
+            'created': created or time.time(),
+            'updated_at': datetime.now().isoformat()
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(session, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def delete(self, identity: Dict):
+        try:
+            os.remove(self._path(self.session_key(identity)))
+        except FileNotFoundError:
+            pass
+
+    def cleanup_expired(self) -> int:
+        """
+        Xóa các session quá hạn
+
+        Returns:
+            Số session đã xóa
+        """
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.session_folder):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.session_folder, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    created = json.load(f).get('created', 0)
+                if now - created > self.session_ttl:
+                    os.remove(path)
+                    removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
@@ -0,0 +1,59 @@
+"""
+Module tách token tìm kiếm cho video (tên file, tiêu đề)
+
+Token được chuẩn hóa về chữ thường, bỏ dấu tiếng Việt, nên tìm "tieu de"
+cũng khớp "Tiêu đề". Dùng chung cho inverted index của JSON và SQLite backend.
+"""
+import os
+import re
+import unicodedata
+from typing import Dict, Set
+
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """
+    Chữ thường, bỏ dấu (NFKD + bỏ combining mark), đ -> d
+    """
+    text = unicodedata.normalize('NFKD', text.lower().replace('đ', 'd'))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Tách text thành tập token; tên file còn được giữ nguyên phần tên (không đuôi)
+    """
+    if not text:
+        return set()
+    text = normalize(str(text))
+    tokens = set(_TOKEN_RE.findall(text))
+    # "my_video_01" -> thêm "my", "video", "01" để tìm theo từng phần
+    for token in list(tokens):
+        if '_' in token:
+            tokens.update(part for part in token.split('_') if part)
+    return {token for token in tokens if len(token) > 1 or token.isdigit()}
+
+
+def video_tokens(video: Dict) -> Set[str]:
+    """
+    Token của một record: tên file input/output và các tiêu đề
+    """
+    metadata = video.get('metadata') or {}
+    youtube_info = video.get('youtube_info') or {}
+    tokens = set()
+    for value in (
+        os.path.basename(video.get('input_video') or ''),
+        os.path.basename(video.get('output_video') or ''),
+        metadata.get('input_filename'),
+        metadata.get('title'),
+        youtube_info.get('title')
+    ):
+        if value:
+            tokens |= tokenize(value)
+    return tokens
+
+
+def youtube_video_id(video: Dict):
+    return (video.get('youtube_info') or {}).get('video_id')
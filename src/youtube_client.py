@@ -0,0 +1,172 @@
+"""
+Module quản lý YouTube API client dùng chung trong process
+
+Trước đây mỗi lần upload tạo một YouTubeUploader mới: unpickle token.pickle,
+có thể refresh token, build('youtube', 'v3') (đọc + parse discovery document
+~370 KB) và mở HTTP connection mới. Module này giữ:
+
+- discovery document đã parse, load một lần cho cả process
+- một YouTubeUploader dùng chung (get_shared_uploader), tạo lần đầu khi cần
+- pool các service đã build: mỗi service giữ một httplib2.Http với connection
+  keep-alive; thread lấy service từ pool và trả lại khi thread kết thúc, nên
+  các upload sau (kể cả trên thread mới) dùng lại connection đã mở
+"""
+import json
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+
+_discovery_lock = threading.Lock()
+_discovery_documents: Dict[tuple, Dict] = {}
+
+
+def discovery_document(service: str = 'youtube', version: str = 'v3') -> Dict:
+    """
+    Discovery document tĩnh (đi kèm google-api-python-client) đã parse, cache theo process
+    """
+    key = (service, version)
+    with _discovery_lock:
+        document = _discovery_documents.get(key)
+        if document is None:
+            content = get_static_doc(service, version)
+            if content is None:
+                raise ValueError(f"Không có discovery document tĩnh cho {service} {version}")
+            document = json.loads(content)
+            _discovery_documents[key] = document
+        return document
+
+
+def build_youtube_service(credentials, api_root: Optional[str] = None):
+    """
+    Build YouTube service từ discovery document đã cache (không đọc/parse lại file)
+
+    Args:
+        credentials: OAuth credentials
+        api_root: Gốc URL của API thay cho https://youtube.googleapis.com/ (ví dụ
+            server giả lập http://127.0.0.1:8090/ trong benchmarks/fake_youtube_api.py);
+            cả request thường lẫn upload đều đi tới địa chỉ này
+    """
+    document = discovery_document()
+    if api_root:
+        api_root = api_root.rstrip('/') + '/'
+        document = dict(document, rootUrl=api_root, mtlsRootUrl=api_root)
+    # build_from_document bổ sung tham số vào document lúc build - build tuần tự
+    with _discovery_lock:
+        return build_from_document(document, credentials=credentials)
+
+
+class ServicePool:
+    def __init__(self, factory):
+        """
+        Pool các YouTube service (mỗi service một HTTP connection keep-alive)
+
+        Args:
+            factory: Hàm không tham số build service mới khi pool rỗng
+        """
+        self.factory = factory
+        self.lock = threading.Lock()
+        self._idle: List = []
+        self._local = threading.local()
+        self.created = 0
+        self.reused = 0
+
+    def current(self):
+        """
+        Service gắn với thread hiện tại (lấy từ pool hoặc build mới)
+        """
+        service = getattr(self._local, 'service', None)
+        if service is not None:
+            return service
+
+        with self.lock:
+            if self._idle:
+                service = self._idle.pop()
+                self.reused += 1
+        if service is None:
+            service = self.factory()
+            with self.lock:
+                self.created += 1
+
+        self._local.service = service
+        # Thread kết thúc (object thread bị thu hồi) thì trả service về pool
+        weakref.finalize(threading.current_thread(), self._release, service)
+        return service
+
+    def bind(self, service):
+        """
+        Gắn service có sẵn cho thread hiện tại (None = bỏ gắn)
+        """
+        self._local.service = service
+
+    def _release(self, service):
+        with self.lock:
+            self._idle.append(service)
+
+    def clear(self):
+        with self.lock:
+            self._idle.clear()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'created': self.created, 'reused': self.reused, 'idle': len(self._idle)}
+
+
+_shared_lock = threading.Lock()
+_shared_uploaders: Dict[tuple, object] = {}
+
+
+def _shared_key(youtube_config: Dict) -> tuple:
+    return (youtube_config['client_secrets_file'], youtube_config['credentials_file'],
+            youtube_config.get('api_root'))
+
+
+def get_shared_uploader(youtube_config: Dict, quota_ledger=None):
+    """
+    Lấy YouTubeUploader dùng chung trong process (tạo lần đầu, các lần sau dùng lại)
+
+    Nếu lần trước xác thực thất bại (chưa có token) thì thử tạo lại.
+
+    Args:
+        youtube_config: Dict cấu hình (YOUTUBE_CONFIG trong config.py)
+        quota_ledger: QuotaLedger ghi nhận quota (mặc định tạo theo cấu hình)
+    """
+    from .upload_scheduler import QuotaLedger
+    from .youtube_uploader import YouTubeUploader
+
+    key = _shared_key(youtube_config)
+    with _shared_lock:
+        uploader = _shared_uploaders.get(key)
+        if uploader is None or not uploader.authenticated:
+            if quota_ledger is None and youtube_config.get('quota_ledger_file'):
+                quota_ledger = QuotaLedger(youtube_config['quota_ledger_file'],
+                                           youtube_config.get('daily_quota', 10000))
+            uploader = YouTubeUploader(
+                client_secrets_file=youtube_config['client_secrets_file'],
+                credentials_file=youtube_config['credentials_file'],
+                chunk_size=youtube_config.get('upload_chunk_size', 8 * 1024 * 1024),
+                max_chunk_size=youtube_config.get('upload_max_chunk_size', 64 * 1024 * 1024),
+                quota_ledger=quota_ledger,
+                session_folder=youtube_config.get('upload_session_folder', 'data/youtube_sessions'),
+                api_root=youtube_config.get('api_root'),
+                max_retries=youtube_config.get('upload_max_retries', 5),
+                retry_base_delay=youtube_config.get('upload_retry_base_delay', 1.0),
+                metadata_cache_ttl=youtube_config.get('metadata_cache_ttl', 300),
+                upload_engine=youtube_config.get('upload_engine', 'googleapiclient')
+            )
+            _shared_uploaders[key] = uploader
+        return uploader
+
+
+def reset_shared_uploader(youtube_config: Optional[Dict] = None):
+    """
+    Bỏ uploader dùng chung (ví dụ sau khi đổi token.pickle); None = bỏ tất cả
+    """
+    with _shared_lock:
+        if youtube_config is None:
+            _shared_uploaders.clear()
+        else:
+            _shared_uploaders.pop(_shared_key(youtube_config), None)
@@ -0,0 +1,138 @@
+"""
+Module đọc metadata/thống kê video YouTube theo lô và cache theo thời gian
+
+videos.list nhận tối đa 50 id mỗi request và mỗi request tốn 1 unit quota dù
+hỏi 1 hay 50 video - gộp id thành lô 50 và cache kết quả trong `ttl` giây để
+dashboard/CLI không gọi API một lần cho mỗi dòng.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .video_search import youtube_video_id
+
+
+MAX_IDS_PER_REQUEST = 50
+
+
+def batched(items: List, size: int = MAX_IDS_PER_REQUEST) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def video_details_from_item(item: Dict) -> Dict:
+    """
+    Chuyển một item của videos.list thành dict thông tin video
+    """
+    snippet = item.get('snippet', {})
+    statistics = item.get('statistics', {})
+    return {
+        'video_id': item['id'],
+        'title': snippet.get('title'),
+        'description': snippet.get('description'),
+        'published_at': snippet.get('publishedAt'),
+        'view_count': statistics.get('viewCount', 0),
+        'like_count': statistics.get('likeCount', 0),
+        'comment_count': statistics.get('commentCount', 0),
+        'privacy_status': item.get('status', {}).get('privacyStatus')
+    }
+
+
+class TTLCache:
+    def __init__(self, ttl: float = 300, max_entries: int = 10000):
+        """
+        Cache key -> value hết hạn sau `ttl` giây (an toàn khi dùng từ nhiều thread)
+
+        Args:
+            ttl: Số giây một entry còn dùng được (<= 0 = không cache)
+            max_entries: Số entry tối đa - đầy thì bỏ các entry cũ nhất
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+
+    def lookup(self, key) -> Tuple[bool, Any]:
+        """
+        Returns:
+            (có trong cache và còn hạn, value) - value có thể là None (đã biết là không có)
+        """
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            return True, entry[1]
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.max_entries:
+                # Dict giữ thứ tự thêm vào - entry đầu là entry cũ nhất
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+
+def refresh_youtube_stats(storage_handler, uploader) -> Dict:
+    """
+    Cập nhật thống kê (view, like, comment, privacy) cho mọi video đã upload
+
+    Gọi videos.list theo lô 50 id (bỏ qua cache) rồi ghi vào youtube_info của
+    từng video trong một lần ghi database.
+
+    Args:
+        storage_handler: JsonStorageHandler hoặc SqliteStorageHandler
+        uploader: YouTubeUploader đã xác thực
+
+    Returns:
+        Dict tổng kết: videos, api_calls (số lệnh videos.list thành công), updated,
+        missing (không còn trên YouTube), failed (id thuộc lô bị lỗi)
+    """
+    videos = storage_handler.get_youtube_uploaded_videos()
+    by_youtube_id: Dict[str, List[Dict]] = {}
+    for video in videos:
+        youtube_id = youtube_video_id(video)
+        if youtube_id:
+            by_youtube_id.setdefault(youtube_id, []).append(video)
+
+    youtube_ids = list(by_youtube_id)
+    request_stats = {'api_calls': 0}
+    details = uploader.get_videos_details(youtube_ids, use_cache=False, stats=request_stats)
+
+    refreshed_at = datetime.now().isoformat()
+    updates: Dict[str, Dict] = {}
+    missing = 0
+    for youtube_id, stored in by_youtube_id.items():
+        if youtube_id not in details:
+            continue  # Lô bị lỗi - giữ nguyên thống kê cũ
+        info = details[youtube_id]
+        if info is None:
+            missing += len(stored)
+            continue
+        for video in stored:
+            updates[video['id']] = {
+                **video['youtube_info'],
+                'view_count': info['view_count'],
+                'like_count': info['like_count'],
+                'comment_count': info['comment_count'],
+                'privacy_status': info['privacy_status'] or video['youtube_info'].get('privacy_status'),
+                'stats_updated_at': refreshed_at
+            }
+
+    updated = storage_handler.update_youtube_info_many(updates) if updates else 0
+    return {
+        'videos': len(videos),
+        'api_calls': request_stats['api_calls'],
+        'updated': updated,
+        'missing': missing,
+        'failed': len(youtube_ids) - len(details)
+    }
@@ -1,12 +1,13 @@
 """
 Module upload video lên YouTube Shorts - Hỗ trợ cả Windows và Linux
 """
+import asyncio
 import os
-import random
 import time
 import sys
 import re
-from googleapiclient.discovery import build
+import threading
+import weakref
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -15,19 +16,60 @@ from google.oauth2.credentials import Credentials
 import pickle
 import json
 
+from .async_upload import AsyncHTTPError, AsyncYouTubeClient, EventLoopThread, is_async_retryable
+from .adaptive_upload import AdaptiveChunkSize, AdaptiveMediaFileUpload, timed_next_chunk
+from .upload_scheduler import UploadScheduler, current_reservation, upload_cost
+from .upload_retry import RetryBackoff, describe_error, is_retryable_error
+from .upload_sessions import UploadSessionStore, UploadSessionExpired, file_identity, query_upload_offset
+from .youtube_client import ServicePool, build_youtube_service
+from .youtube_metadata import TTLCache, batched, video_details_from_item
+
 
 class YouTubeUploader:
-    def __init__(self, client_secrets_file='client_secrets.json', credentials_file='token.pickle'):
+    def __init__(self, client_secrets_file='client_secrets.json', credentials_file='token.pickle',
+                 chunk_size=8 * 1024 * 1024, max_chunk_size=64 * 1024 * 1024, quota_ledger=None,
+                 session_folder='data/youtube_sessions', api_root=None, max_retries=5,
+                 retry_base_delay=1.0, metadata_cache_ttl=300, upload_engine='googleapiclient'):
         """
         Khởi tạo YouTube Uploader
         
         Args:
             client_secrets_file: File chứa client secrets từ Google Console
             credentials_file: File lưu credentials đã xác thực
+            chunk_size: Kích thước chunk upload ban đầu (được điều chỉnh theo thông lượng)
+            max_chunk_size: Kích thước chunk upload tối đa
+            quota_ledger: QuotaLedger tùy chọn để ghi nhận quota của các lệnh đọc (list)
+            session_folder: Thư mục lưu session resumable upload để upload tiếp
+                sau khi bị ngắt (None = không lưu)
+            api_root: Gốc URL của YouTube Data API (None = Google; dùng để trỏ
+                tới server giả lập khi benchmark/test)
+            max_retries: Số lần thử lại liên tiếp tối đa khi gặp lỗi tạm thời (5xx, lỗi mạng)
+            retry_base_delay: Thời gian chờ lần thử lại đầu tiên, tăng gấp đôi mỗi lần (giây)
+            metadata_cache_ttl: Số giây cache kết quả get_video_details/get_my_channels (0 = không cache)
+            upload_engine: 'googleapiclient' (mỗi upload một thread chờ next_chunk) hoặc
+                'asyncio' (mọi upload chạy trên một event loop, xem src/async_upload.py)
         """
         self.client_secrets_file = client_secrets_file
         self.credentials_file = credentials_file
-        self.youtube = None
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.quota_ledger = quota_ledger
+        self.sessions = UploadSessionStore(session_folder) if session_folder else None
+        # httplib2 không thread-safe - mỗi thread dùng service (HTTP connection
+        # keep-alive) riêng, lấy từ pool và trả lại khi thread kết thúc
+        self.api_root = api_root
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self._video_cache = TTLCache(metadata_cache_ttl)
+        self._channel_cache = TTLCache(metadata_cache_ttl)
+        self._pool = ServicePool(lambda: build_youtube_service(self._credentials, api_root))
+        self._credentials = None
+        self._refresh_lock = threading.Lock()
+        self.upload_engine = upload_engine
+        # Engine asyncio: một event loop nền + một AsyncYouTubeClient (pool kết nối) cho mỗi loop
+        self._event_loop_thread = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
         self.SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
         
         # Các category ID phổ biến trên YouTube
@@ -36,6 +78,121 @@ class YouTubeUploader:
         # Authenticate và build service
         self._authenticate()
     
+    @property
+    def authenticated(self):
+        return self._credentials is not None
+    
+    @property
+    def youtube(self):
+        """
+        YouTube service của thread hiện tại (None nếu chưa xác thực)
+        """
+        if self._credentials is None:
+            return None
+        self._ensure_fresh_credentials()
+        return self._pool.current()
+    
+    @youtube.setter
+    def youtube(self, service):
+        self._pool.bind(service)
+    
+    def _ensure_fresh_credentials(self):
+        """
+        Refresh access token khi hết hạn - chỉ một thread refresh, các thread khác chờ rồi dùng token mới
+        """
+        creds = self._credentials
+        if creds.valid or not creds.refresh_token:
+            return
+        with self._refresh_lock:
+            if creds.valid:  # Thread khác vừa refresh xong
+                return
+            try:
+                print("Đang refresh token...")
+                creds.refresh(Request())
+                print("Token đã được refresh thành công")
+                self._save_credentials(creds)
+            except Exception as e:
+                print(f"Không thể refresh token: {e}")
+    
+    def access_token(self):
+        """
+        Access token còn hạn (refresh nếu cần) cho các request không qua googleapiclient
+        """
+        self._ensure_fresh_credentials()
+        return self._credentials.token
+    
+    def _save_credentials(self, creds):
+        """
+        Lưu credentials cho lần sau (file tạm rồi rename - process khác không đọc phải file ghi dở)
+        """
+        try:
+            tmp_file = f"{self.credentials_file}.tmp"
+            with open(tmp_file, 'wb') as token:
+                pickle.dump(creds, token)
+            os.replace(tmp_file, self.credentials_file)
+            print(f"Đã lưu credentials vào {self.credentials_file}")
+        except Exception as e:
+            print(f"Cảnh báo: Không thể lưu credentials: {e}")
+    
+    def _charge_quota(self, method, count=1, reservation=None):
+        if self.quota_ledger is not None:
+            self.quota_ledger.charge(method, count, reservation or current_reservation())
+    
+    def _resume_session(self, insert_request, identity, file_size):
+        """
+        Gắn session đã lưu của file vào insert_request và đặt offset theo server
+        
+        Returns:
+            (offset tiếp tục, resource video nếu lần trước thực ra đã upload xong)
+        """
+        if self.sessions is None:
+            return 0, None
+        session = self.sessions.load(identity)
+        if not session:
+            return 0, None
+        
+        try:
+            offset, response = query_upload_offset(insert_request.http, session['resumable_uri'], file_size)
+        except UploadSessionExpired as e:
+            print(f"{e} - upload lại từ đầu")
+            self.sessions.delete(identity)
+            return 0, None
+        except Exception as e:
+            # Không hỏi được server - giữ session cho lần sau, lần này upload session mới
+            print(f"Không kiểm tra được session upload cũ: {e}")
+            return 0, None
+        
+        insert_request.resumable_uri = session['resumable_uri']
+        insert_request.resumable_progress = offset
+        print(f"Tiếp tục upload từ {offset / (1024*1024):.2f} MB / {file_size / (1024*1024):.2f} MB")
+        return offset, response
+    
+    def _save_session(self, insert_request, identity, title):
+        self._store_session(identity, insert_request.resumable_uri, insert_request.resumable_progress, title)
+    
+    def _store_session(self, identity, resumable_uri, offset, title):
+        if self.sessions is None or not resumable_uri:
+            return
+        try:
+            self.sessions.save(identity, resumable_uri, offset, title)
+        except OSError as e:
+            print(f"Cảnh báo: Không thể lưu session upload: {e}")
+    
+    def _drop_session(self, identity):
+        if self.sessions is not None:
+            self.sessions.delete(identity)
+    
+    @staticmethod
+    def _error_reason(error):
+        """
+        Lấy reason (ví dụ quotaExceeded, uploadLimitExceeded) từ HttpError
+        """
+        try:
+            details = json.loads(error.content.decode('utf-8'))['error']['errors']
+            return details[0].get('reason')
+        except Exception:
+            return None
+    
     def _authenticate(self):
         """
         Xác thực với YouTube API - Hỗ trợ cả Windows và Linux
@@ -80,16 +237,12 @@ class YouTubeUploader:
                     return False
             
             # Lưu credentials cho lần sau
-            try:
-                with open(self.credentials_file, 'wb') as token:
-                    pickle.dump(creds, token)
-                print(f"Đã lưu credentials vào {self.credentials_file}")
-            except Exception as e:
-                print(f"Cảnh báo: Không thể lưu credentials: {e}")
+            self._save_credentials(creds)
         
         # Build YouTube service
         try:
-            self.youtube = build('youtube', 'v3', credentials=creds)
+            self._pool.bind(build_youtube_service(creds, self.api_root))
+            self._credentials = creds
             print("Đã xác thực thành công với YouTube API")
             return True
         except Exception as e:
@@ -139,52 +292,20 @@ class YouTubeUploader:
         Returns:
             Dict chứa thông tin video đã upload hoặc error
         """
+        if self.upload_engine == 'asyncio':
+            return self._event_loop().run(self.upload_video_async(
+                video_path, title, description, tags, category_id,
+                privacy_status, thumbnail_path, notify_subscribers,
+                quota_reservation=current_reservation()))
+        
         if not self.youtube:
             return {'status': 'error', 'message': 'Chưa xác thực với YouTube API'}
         
         if not os.path.exists(video_path):
             return {'status': 'error', 'message': f'Không tìm thấy video: {video_path}'}
         
-        # Validate privacy status
-        if privacy_status not in self.VALID_PRIVACY_STATUSES:
-            privacy_status = 'private'  # Default safe option
-        
-        # Chuẩn bị metadata cho video
-        if tags is None:
-            tags = []
-        
-        # Đảm bảo tags là list và không có duplicate
-        tags = list(set(tags)) if isinstance(tags, list) else []
-        
-        # Thêm hashtag #Shorts để video được nhận diện là YouTube Shorts
-        if 'Shorts' not in tags:
-            tags.append('Shorts')
-        
-        # Đảm bảo title không quá dài và clean text
-        if len(title) > 100:
-            title = title[:97] + '...'
-        
-        # Clean text để tránh lỗi encoding
-        title = self._clean_text(title)
-        description = self._clean_text(description)
-        
-        # Thêm #Shorts vào description nếu chưa có
-        if '#Shorts' not in description:
-            description = description + '\n\n#Shorts'
-        
-        body = {
-            'snippet': {
-                'title': title,
-                'description': description,
-                'tags': tags,
-                'categoryId': str(category_id)
-            },
-            'status': {
-                'privacyStatus': privacy_status,
-                'selfDeclaredMadeForKids': False,
-                'notifySubscribers': notify_subscribers
-            }
-        }
+        title, description, tags, privacy_status, body = self._prepare_metadata(
+            title, description, tags, category_id, privacy_status, notify_subscribers)
         
         # Chuẩn bị file upload
         try:
@@ -193,12 +314,9 @@ class YouTubeUploader:
             if file_size > 2 * 1024 * 1024 * 1024:  # 2GB warning
                 print(f"Cảnh báo: File size {file_size / (1024*1024*1024):.2f}GB có thể upload chậm")
             
-            media = MediaFileUpload(
-                video_path,
-                chunksize=1024*1024,  # 1MB chunks for better progress tracking
-                resumable=True,
-                mimetype='video/*'
-            )
+            # Chunk size được điều chỉnh theo thông lượng đo được sau mỗi chunk
+            chunk_control = AdaptiveChunkSize(self.chunk_size, maximum=self.max_chunk_size)
+            media = AdaptiveMediaFileUpload(video_path, chunk_control, mimetype='video/*')
         except Exception as e:
             return {'status': 'error', 'message': f'Lỗi khi chuẩn bị file upload: {str(e)}'}
         
@@ -218,69 +336,74 @@ class YouTubeUploader:
                 media_body=media
             )
             
-            # Execute upload với resumable upload
-            response = None
-            retry = 0
-            max_retries = 5
+            # Session URI + offset được lưu sau mỗi chunk; lần upload sau của cùng
+            # file (process restart, lỗi mạng) hỏi server rồi gửi tiếp từ offset đó
+            identity = file_identity(video_path)
+            resumed_from, response = self._resume_session(insert_request, identity, file_size)
+            if insert_request.resumable_uri is None:
+                self._charge_quota('videos.insert')
+            # Lỗi tạm thời (5xx, timeout, mất kết nối) không bỏ các chunk đã gửi:
+            # chờ backoff rồi next_chunk() hỏi server offset đã nhận và gửi tiếp từ đó
+            backoff = RetryBackoff(self.max_retries, self.retry_base_delay)
             
             while response is None:
                 try:
-                    status, response = insert_request.next_chunk()
+                    status, response = timed_next_chunk(insert_request, chunk_control, file_size)
+                    backoff.succeeded()
                     if status:
+                        self._save_session(insert_request, identity, title)
                         progress = int(status.progress() * 100)
-                        print(f"Đã upload {progress}%")
+                        print(f"Đã upload {progress}% (chunk {chunk_control.size // 1024} KB)")
                         
-                except HttpError as e:
-                    if e.resp.status in [500, 502, 503, 504]:
-                        # Retry với exponential backoff
-                        print(f"HTTP {e.resp.status} error, đang thử lại...")
-                        retry += 1
-                        if retry > max_retries:
+                except Exception as e:
+                    if not is_retryable_error(e):
+                        if isinstance(e, HttpError):
+                            if 400 <= e.resp.status < 500:
+                                # Session bị server từ chối - lần sau phải tạo session mới
+                                self._drop_session(identity)
                             return {
                                 'status': 'error',
-                                'message': f'Upload thất bại sau {max_retries} lần thử: HTTP {e.resp.status}'
+                                'reason': self._error_reason(e),
+                                'message': f'HTTP Error {e.resp.status}: {e.content.decode("utf-8", errors="ignore")}',
+                                **backoff.stats()
                             }
-                        sleep_time = (2 ** retry) + (random.randint(0, 1000) / 1000)
-                        print(f"Đợi {sleep_time:.1f}s trước khi thử lại...")
-                        time.sleep(sleep_time)
-                    else:
+                        # Lỗi khác/process bị ngắt: session đã lưu, lần upload sau sẽ gửi tiếp
+                        self._save_session(insert_request, identity, title)
                         return {
                             'status': 'error',
-                            'message': f'HTTP Error {e.resp.status}: {e.content.decode("utf-8", errors="ignore")}'
+                            'resumable': bool(insert_request.resumable_uri),
+                            'message': f'Lỗi không xác định: {str(e)}',
+                            **backoff.stats()
                         }
-                except Exception as e:
-                    return {
-                        'status': 'error',
-                        'message': f'Lỗi không xác định: {str(e)}'
-                    }
+                    
+                    # Chunk nhỏ hơn cho các lần gửi sau
+                    chunk_control.record_error()
+                    self._save_session(insert_request, identity, title)
+                    sleep_time = backoff.failed(e)
+                    if sleep_time is None:
+                        return {
+                            'status': 'error',
+                            'resumable': bool(insert_request.resumable_uri),
+                            'message': f'Upload thất bại sau {self.max_retries} lần thử: {describe_error(e)}',
+                            **backoff.stats()
+                        }
+                    print(f"{describe_error(e)}, thử lại lần {backoff.attempt}/{self.max_retries} "
+                          f"sau {sleep_time:.1f}s (đã nhận {insert_request.resumable_progress / (1024*1024):.2f} MB)")
+                    time.sleep(sleep_time)
+            
+            self._drop_session(identity)
             
             if response is not None:
-                video_id = response.get('id')
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                shorts_url = f"https://youtube.com/shorts/{video_id}"
-                
-                print(f"Upload thành công!")
-                print(f"Video ID: {video_id}")
-                print(f"URL: {video_url}")
-                print(f"Shorts URL: {shorts_url}")
+                result = self._upload_result(response.get('id'), title, description, tags, privacy_status,
+                                             file_size, resumed_from, chunk_control, backoff)
                 
                 # Upload thumbnail nếu có
                 if thumbnail_path and os.path.exists(thumbnail_path):
-                    thumbnail_result = self._upload_thumbnail(video_id, thumbnail_path)
+                    thumbnail_result = self._upload_thumbnail(result['video_id'], thumbnail_path)
                     if not thumbnail_result:
                         print("Cảnh báo: Upload thumbnail thất bại, nhưng video đã upload thành công")
                 
-                return {
-                    'status': 'success',
-                    'video_id': video_id,
-                    'video_url': video_url,
-                    'shorts_url': shorts_url,
-                    'title': title,
-                    'description': description,
-                    'tags': tags,
-                    'privacy_status': privacy_status,
-                    'file_size': file_size
-                }
+                return result
             
         except Exception as e:
             error_message = f'Lỗi upload: {str(e)}'
@@ -290,6 +413,90 @@ class YouTubeUploader:
                 'message': error_message
             }
     
+    def _upload_result(self, video_id, title, description, tags, privacy_status,
+                       file_size, resumed_from, chunk_control, backoff):
+        """
+        In kết quả và tạo dict trả về của một upload thành công (dùng chung cho hai engine)
+        """
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        shorts_url = f"https://youtube.com/shorts/{video_id}"
+        
+        upload_stats = chunk_control.stats()
+        print(f"Upload thành công!")
+        print(f"Video ID: {video_id}")
+        if backoff.stats()['retries']:
+            print(f"Thử lại {backoff.stats()['retries']} lần, chờ {backoff.backoff_seconds:.1f}s")
+        if upload_stats['upload_mb_per_second'] is not None:
+            print(f"Tốc độ: {upload_stats['upload_mb_per_second']:.2f} MB/s "
+                  f"({upload_stats['upload_seconds']:.1f}s, {upload_stats['chunk_count']} chunk)")
+        print(f"URL: {video_url}")
+        print(f"Shorts URL: {shorts_url}")
+        
+        return {
+            'status': 'success',
+            'video_id': video_id,
+            'video_url': video_url,
+            'shorts_url': shorts_url,
+            'title': title,
+            'description': description,
+            'tags': tags,
+            'privacy_status': privacy_status,
+            'file_size': file_size,
+            'resumed_from': resumed_from,
+            **upload_stats,
+            **backoff.stats()
+        }
+    
+    def _prepare_metadata(self, title, description, tags, category_id, privacy_status, notify_subscribers):
+        """
+        Chuẩn hóa title/description/tags/privacy và tạo body cho videos.insert
+        
+        Returns:
+            (title, description, tags, privacy_status, body)
+        """
+        # Validate privacy status
+        if privacy_status not in self.VALID_PRIVACY_STATUSES:
+            privacy_status = 'private'  # Default safe option
+        
+        # Chuẩn bị metadata cho video
+        if tags is None:
+            tags = []
+        
+        # Đảm bảo tags là list và không có duplicate
+        tags = list(set(tags)) if isinstance(tags, list) else []
+        
+        # Thêm hashtag #Shorts để video được nhận diện là YouTube Shorts
+        if 'Shorts' not in tags:
+            tags.append('Shorts')
+        
+        # Đảm bảo title không quá dài và clean text
+        if len(title) > 100:
+            title = title[:97] + '...'
+        
+        # Clean text để tránh lỗi encoding
+        title = self._clean_text(title)
+        description = self._clean_text(description)
+        
+        # Thêm #Shorts vào description nếu chưa có
+        if '#Shorts' not in description:
+            description = description + '\n\n#Shorts'
+        
+        body = {
+            'snippet': {
+                'title': title,
+                'description': description,
+                'tags': tags,
+                'categoryId': str(category_id)
+            },
+            'status': {
+                'privacyStatus': privacy_status,
+                'selfDeclaredMadeForKids': False,
+                'notifySubscribers': notify_subscribers
+            }
+        }
+        
+        return title, description, tags, privacy_status, body
+    
     def _clean_text(self, text):
         """
         Clean text để tránh lỗi encoding
@@ -306,17 +513,10 @@ class YouTubeUploader:
         Upload thumbnail cho video
         """
         try:
-            # Validate thumbnail file
-            if not os.path.exists(thumbnail_path):
-                print(f"Thumbnail không tồn tại: {thumbnail_path}")
-                return False
-            
-            # Check file size (thumbnail max 2MB)
-            thumb_size = os.path.getsize(thumbnail_path)
-            if thumb_size > 2 * 1024 * 1024:
-                print(f"Thumbnail quá lớn: {thumb_size / (1024*1024):.2f}MB (max 2MB)")
+            if not self._valid_thumbnail(thumbnail_path):
                 return False
             
+            self._charge_quota('thumbnails.set')
             self.youtube.thumbnails().set(
                 videoId=video_id,
                 media_body=MediaFileUpload(thumbnail_path)
@@ -330,15 +530,253 @@ class YouTubeUploader:
             print(f"Lỗi khi upload thumbnail: {e}")
             return False
     
-    def get_my_channels(self):
+    @staticmethod
+    def _valid_thumbnail(thumbnail_path):
+        # Validate thumbnail file
+        if not os.path.exists(thumbnail_path):
+            print(f"Thumbnail không tồn tại: {thumbnail_path}")
+            return False
+        
+        # Check file size (thumbnail max 2MB)
+        thumb_size = os.path.getsize(thumbnail_path)
+        if thumb_size > 2 * 1024 * 1024:
+            print(f"Thumbnail quá lớn: {thumb_size / (1024*1024):.2f}MB (max 2MB)")
+            return False
+        return True
+    
+    def _event_loop(self):
+        """
+        Event loop nền của engine asyncio (tạo ở lần dùng đầu tiên)
+        """
+        with self._async_lock:
+            if self._event_loop_thread is None:
+                self._event_loop_thread = EventLoopThread()
+            return self._event_loop_thread
+    
+    def _async_client(self):
+        """
+        AsyncYouTubeClient của event loop đang chạy - mọi upload trên loop dùng chung pool kết nối
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = AsyncYouTubeClient(self.access_token, self.api_root)
+            return client
+    
+    def stop_async_engine(self):
+        """
+        Đóng kết nối và dừng event loop nền của engine asyncio (lần upload sau tạo lại)
+        """
+        with self._async_lock:
+            loop_thread, self._event_loop_thread = self._event_loop_thread, None
+            client = self._async_clients.pop(loop_thread.loop, None) if loop_thread else None
+        if loop_thread is not None:
+            if client is not None:
+                loop_thread.loop.call_soon_threadsafe(client.pool.close)
+            loop_thread.stop()
+    
+    async def _resume_session_async(self, client, identity, file_size):
+        """
+        Như _resume_session cho engine asyncio
+        
+        Returns:
+            (session URI hoặc None, offset tiếp tục, resource video nếu lần trước đã upload xong)
+        """
+        if self.sessions is None:
+            return None, 0, None
+        session = self.sessions.load(identity)
+        if not session:
+            return None, 0, None
+        
+        try:
+            offset, response = await client.query_offset(session['resumable_uri'], file_size)
+        except UploadSessionExpired as e:
+            print(f"{e} - upload lại từ đầu")
+            self.sessions.delete(identity)
+            return None, 0, None
+        except Exception as e:
+            print(f"Không kiểm tra được session upload cũ: {describe_error(e)}")
+            return None, 0, None
+        
+        print(f"Tiếp tục upload từ {offset / (1024*1024):.2f} MB / {file_size / (1024*1024):.2f} MB")
+        return session['resumable_uri'], offset, response
+    
+    async def upload_video_async(self, video_path, title, description, tags=None, category_id='22',
+                                 privacy_status='public', thumbnail_path=None, notify_subscribers=False,
+                                 quota_reservation=None):
+        """
+        Upload video bằng engine asyncio - cùng tham số và dict kết quả với upload_video
+        
+        Nhiều upload chạy đồng thời trên một event loop, dùng chung pool kết nối;
+        chunk được gửi thẳng từ file. Session lưu đĩa, retry, quota và chunk thích
+        ứng giống engine googleapiclient.
+        
+        quota_reservation: Phần quota UploadScheduler đã giữ chỗ cho upload này
+        (coroutine chạy trên thread của event loop, không thấy context của scheduler)
+        """
+        quota_reservation = quota_reservation or current_reservation()
+        if not self.authenticated:
+            return {'status': 'error', 'message': 'Chưa xác thực với YouTube API'}
+        
+        if not os.path.exists(video_path):
+            return {'status': 'error', 'message': f'Không tìm thấy video: {video_path}'}
+        
+        title, description, tags, privacy_status, body = self._prepare_metadata(
+            title, description, tags, category_id, privacy_status, notify_subscribers)
+        
+        try:
+            video_file = open(video_path, 'rb')
+        except OSError as e:
+            return {'status': 'error', 'message': f'Lỗi khi chuẩn bị file upload: {str(e)}'}
+        
+        loop = asyncio.get_running_loop()
+        client = self._async_client()
+        file_size = os.fstat(video_file.fileno()).st_size
+        if file_size > 2 * 1024 * 1024 * 1024:  # 2GB warning
+            print(f"Cảnh báo: File size {file_size / (1024*1024*1024):.2f}GB có thể upload chậm")
+        chunk_control = AdaptiveChunkSize(self.chunk_size, maximum=self.max_chunk_size)
+        backoff = RetryBackoff(self.max_retries, self.retry_base_delay)
+        
+        print(f"Đang upload video: {title}")
+        print(f"File: {video_path}")
+        print(f"Size: {file_size / (1024*1024):.2f} MB")
+        print(f"Privacy: {privacy_status}")
+        
+        with video_file:
+            identity = await loop.run_in_executor(None, file_identity, video_path)
+            session_uri, offset, response = await self._resume_session_async(client, identity, file_size)
+            resumed_from = offset
+            # Sau lỗi tạm thời phải hỏi server offset đã nhận trước khi gửi tiếp
+            resync = False
+            
+            while response is None:
+                try:
+                    if session_uri is None:
+                        await loop.run_in_executor(None, self._charge_quota, 'videos.insert', 1, quota_reservation)
+                        session_uri = await client.create_session(body, file_size)
+                        self._store_session(identity, session_uri, offset, title)
+                    if resync:
+                        offset, response = await client.query_offset(session_uri, file_size)
+                        resync = False
+                        continue
+                    
+                    chunk_size = chunk_control.size
+                    started = time.monotonic()
+                    new_offset, response = await client.put_chunk(
+                        session_uri, video_file, offset, min(chunk_size, file_size - offset), file_size)
+                    chunk_control.record_chunk(max(0, new_offset - offset), time.monotonic() - started, chunk_size)
+                    offset = new_offset
+                    backoff.succeeded()
+                    if response is None:
+                        self._store_session(identity, session_uri, offset, title)
+                        print(f"Đã upload {int(offset * 100 / file_size)}% (chunk {chunk_control.size // 1024} KB)")
+                
+                except Exception as e:
+                    if not is_async_retryable(e):
+                        if isinstance(e, AsyncHTTPError):
+                            if 400 <= e.status < 500:
+                                # Session bị server từ chối - lần sau phải tạo session mới
+                                self._drop_session(identity)
+                            return {
+                                'status': 'error',
+                                'reason': self._error_reason(e),
+                                'message': f'HTTP Error {e.status}: {e.content.decode("utf-8", errors="ignore")}',
+                                **backoff.stats()
+                            }
+                        if isinstance(e, UploadSessionExpired):
+                            self._drop_session(identity)
+                            return {'status': 'error', 'message': str(e), **backoff.stats()}
+                        # Lỗi khác: session đã lưu, lần upload sau sẽ gửi tiếp
+                        self._store_session(identity, session_uri, offset, title)
+                        return {
+                            'status': 'error',
+                            'resumable': bool(session_uri),
+                            'message': f'Lỗi không xác định: {str(e)}',
+                            **backoff.stats()
+                        }
+                    
+                    # Chunk nhỏ hơn cho các lần gửi sau
+                    chunk_control.record_error()
+                    self._store_session(identity, session_uri, offset, title)
+                    resync = session_uri is not None
+                    sleep_time = backoff.failed(e)
+                    if sleep_time is None:
+                        return {
+                            'status': 'error',
+                            'resumable': bool(session_uri),
+                            'message': f'Upload thất bại sau {self.max_retries} lần thử: {describe_error(e)}',
+                            **backoff.stats()
+                        }
+                    print(f"{describe_error(e)}, thử lại lần {backoff.attempt}/{self.max_retries} "
+                          f"sau {sleep_time:.1f}s (đã nhận {offset / (1024*1024):.2f} MB)")
+                    await asyncio.sleep(sleep_time)
+        
+        self._drop_session(identity)
+        result = self._upload_result(response.get('id'), title, description, tags, privacy_status,
+                                     file_size, resumed_from, chunk_control, backoff)
+        
+        # Upload thumbnail nếu có
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            if not await self._upload_thumbnail_async(client, result['video_id'], thumbnail_path,
+                                                      quota_reservation):
+                print("Cảnh báo: Upload thumbnail thất bại, nhưng video đã upload thành công")
+        
+        return result
+    
+    async def _upload_thumbnail_async(self, client, video_id, thumbnail_path, quota_reservation=None):
+        """
+        Upload thumbnail cho video (engine asyncio)
+        """
+        if not self._valid_thumbnail(thumbnail_path):
+            return False
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._charge_quota, 'thumbnails.set', 1, quota_reservation)
+            await client.set_thumbnail(video_id, thumbnail_path)
+            print(f"Đã upload thumbnail cho video {video_id}")
+            return True
+        except Exception as e:
+            print(f"Lỗi khi upload thumbnail: {describe_error(e)}")
+            return False
+    
+    def upload_videos_concurrently(self, uploads, max_concurrent=None):
+        """
+        Upload nhiều video cùng lúc trên event loop của engine asyncio - thread gọi
+        hàm chỉ chờ kết quả, không cần một thread cho mỗi upload
+        
+        Args:
+            uploads: List dict tham số của upload_video (video_path, title, description, ...)
+            max_concurrent: Số upload chạy đồng thời tối đa (None = tất cả)
+        
+        Returns:
+            List kết quả (dict như upload_video) theo thứ tự của uploads
+        """
+        async def run_all():
+            limit = asyncio.Semaphore(max_concurrent or max(1, len(uploads)))
+            
+            async def run_one(kwargs):
+                async with limit:
+                    return await self.upload_video_async(**kwargs)
+            
+            return await asyncio.gather(*(run_one(kwargs) for kwargs in uploads))
+        
+        return self._event_loop().run(run_all())
+    
+    def get_my_channels(self, use_cache=True):
         """
-        Lấy thông tin các channel của user
+        Lấy thông tin các channel của user (cache metadata_cache_ttl giây)
         """
+        if use_cache:
+            found, channels = self._channel_cache.lookup('mine')
+            if found:
+                return channels
         try:
             response = self.youtube.channels().list(
                 part='snippet,statistics',
                 mine=True
             ).execute()
+            self._charge_quota('channels.list')
             
             channels = []
             for item in response.get('items', []):
@@ -352,40 +790,64 @@ class YouTubeUploader:
                 }
                 channels.append(channel_info)
             
+            self._channel_cache.set('mine', channels)
             return channels
         except Exception as e:
             print(f"Lỗi khi lấy thông tin channel: {e}")
             return []
     
-    def get_video_details(self, video_id):
+    def get_videos_details(self, video_ids, use_cache=True, stats=None):
         """
-        Lấy thông tin chi tiết của một video
+        Lấy thông tin chi tiết nhiều video - gộp tối đa 50 id mỗi lệnh videos.list
+        
+        Args:
+            video_ids: List YouTube video id
+            use_cache: Dùng kết quả đã cache (metadata_cache_ttl giây) nếu có
+            stats: Dict tùy chọn - stats['api_calls'] được cộng số lệnh videos.list
+                đã gửi và nhận được response
+        
+        Returns:
+            Dict video_id -> thông tin video (None nếu video không còn/không xem được);
+            id thuộc lô bị lỗi không có trong dict
         """
-        try:
-            response = self.youtube.videos().list(
-                part='snippet,statistics,status',
-                id=video_id
-            ).execute()
+        details = {}
+        pending = []
+        for video_id in dict.fromkeys(video_ids):  # Bỏ trùng, giữ thứ tự
+            if not video_id:
+                continue
+            found, info = self._video_cache.lookup(video_id) if use_cache else (False, None)
+            if found:
+                details[video_id] = info
+            else:
+                pending.append(video_id)
+        
+        for batch in batched(pending):
+            try:
+                response = self.youtube.videos().list(
+                    part='snippet,statistics,status',
+                    id=','.join(batch)
+                ).execute()
+                self._charge_quota('videos.list')
+                if stats is not None:
+                    stats['api_calls'] = stats.get('api_calls', 0) + 1
+            except Exception as e:
+                print(f"Lỗi khi lấy thông tin video: {e}")
+                continue
             
-            if response['items']:
-                item = response['items'][0]
-                return {
-                    'video_id': item['id'],
-                    'title': item['snippet']['title'],
-                    'description': item['snippet']['description'],
-                    'published_at': item['snippet']['publishedAt'],
-                    'view_count': item['statistics'].get('viewCount', 0),
-                    'like_count': item['statistics'].get('likeCount', 0),
-                    'comment_count': item['statistics'].get('commentCount', 0),
-                    'privacy_status': item['status']['privacyStatus']
-                }
-            return None
-        except Exception as e:
-            print(f"Lỗi khi lấy thông tin video: {e}")
-            return None
+            items = {item['id']: video_details_from_item(item) for item in response.get('items', [])}
+            for video_id in batch:
+                details[video_id] = items.get(video_id)
+                self._video_cache.set(video_id, details[video_id])
+        return details
+    
+    def get_video_details(self, video_id, use_cache=True):
+        """
+        Lấy thông tin chi tiết của một video
+        """
+        return self.get_videos_details([video_id], use_cache).get(video_id)
 
 
-def batch_upload_videos(video_folder, uploader, metadata_file='video_metadata.json'):
+def batch_upload_videos(video_folder, uploader, metadata_file='video_metadata.json', scheduler=None):
     """
     Upload nhiều video từ một folder
     
@@ -393,6 +855,8 @@ def batch_upload_videos(video_folder, uploader, metadata_file='video_metadata.js
         video_folder: Folder chứa video
         uploader: Instance của YouTubeUploader
         metadata_file: File JSON chứa metadata cho mỗi video
+        scheduler: UploadScheduler (giới hạn song song, tốc độ request, quota);
+            mặc định UploadScheduler() với sổ quota data/youtube_quota.json
     """
     # Load metadata nếu có
     metadata = {}
@@ -400,20 +864,25 @@ def batch_upload_videos(video_folder, uploader, metadata_file='video_metadata.js
         with open(metadata_file, 'r', encoding='utf-8') as f:
             metadata = json.load(f)
     
-    results = []
+    if scheduler is None:
+        scheduler = UploadScheduler(ledger=uploader.quota_ledger)
+    if uploader.quota_ledger is None:
+        uploader.quota_ledger = scheduler.ledger
+    
     video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv']
+    filenames = [filename for filename in sorted(os.listdir(video_folder))
+                 if any(filename.lower().endswith(ext) for ext in video_extensions)]
     
-    for filename in os.listdir(video_folder):
-        if any(filename.lower().endswith(ext) for ext in video_extensions):
-            video_path = os.path.join(video_folder, filename)
-            
-            # Lấy metadata cho video này hoặc dùng default
-            video_meta = metadata.get(filename, {})
-            title = video_meta.get('title', f'Video {filename.split(".")[0]}')
-            description = video_meta.get('description', 'YouTube Shorts video')
-            tags = video_meta.get('tags', ['Shorts'])
-            
-            # Upload video
+    def make_task(filename):
+        video_path = os.path.join(video_folder, filename)
+        
+        # Lấy metadata cho video này hoặc dùng default
+        video_meta = metadata.get(filename, {})
+        title = video_meta.get('title', f'Video {filename.split(".")[0]}')
+        description = video_meta.get('description', 'YouTube Shorts video')
+        tags = video_meta.get('tags', ['Shorts'])
+        
+        def upload():
             result = uploader.upload_video(
                 video_path=video_path,
                 title=title,
@@ -421,18 +890,19 @@ def batch_upload_videos(video_folder, uploader, metadata_file='video_metadata.js
                 tags=tags,
                 privacy_status='public'
             )
-            
-            results.append({
-                'filename': filename,
-                'upload_result': result
-            })
-            
-            # Delay giữa các upload để tránh rate limit
             if result['status'] == 'success':
                 print(f"✓ Upload thành công: {filename}")
             else:
                 print(f"✗ Upload thất bại: {filename} - {result.get('message', 'Unknown error')}")
-            
-            time.sleep(10)  # Wait 10 seconds between uploads
+            return result
+        
+        return filename, upload, upload_cost()
+    
+    # Scheduler thay cho sleep cố định giữa các upload: chạy song song trong
+    # giới hạn, điều tiết tốc độ và chờ reset khi hết quota
+    upload_results = scheduler.run(make_task(filename) for filename in filenames)
     
-    return results
+    return [
+        {'filename': filename, 'upload_result': result}
+        for filename, result in zip(filenames, upload_results)
+    ]
@@ -0,0 +1,133 @@
+/*
+ * Resumable chunked upload client for /api/uploads
+ *
+ * Usage:
+ *   resumableUpload(file, {onProgress: function(loaded, total) {...}})
+ *       .then(function(uploadId) { return finalizeUpload(uploadId, formData); });
+ *
+ * The upload id is remembered in localStorage per file (name, size, mtime), so
+ * picking the same file again after a dropped connection only sends the
+ * chunks the server does not have yet.
+ */
+(function(window) {
+    const STORAGE_PREFIX = 'video80s-upload:';
+    const DEFAULT_PARALLEL = 3;
+    const MAX_RETRIES = 5;
+
+    function storageKey(file) {
+        return STORAGE_PREFIX + file.name + ':' + file.size + ':' + file.lastModified;
+    }
+
+    function jsonOrError(response) {
+        return response.json().catch(function() { return {}; }).then(function(body) {
+            if (!response.ok) {
+                throw new Error(body.error || ('HTTP ' + response.status));
+            }
+            return body;
+        });
+    }
+
+    function sleep(ms) {
+        return new Promise(function(resolve) { setTimeout(resolve, ms); });
+    }
+
+    function openSession(file) {
+        const saved = window.localStorage.getItem(storageKey(file));
+        const resume = saved
+            ? fetch('/api/uploads/' + saved).then(function(r) { return r.ok ? r.json() : null; })
+            : Promise.resolve(null);
+
+        return resume.then(function(session) {
+            if (session) {
+                return session;
+            }
+            return fetch('/api/uploads', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({filename: file.name, size: file.size})
+            }).then(jsonOrError).then(function(created) {
+                window.localStorage.setItem(storageKey(file), created.upload_id);
+                return created;
+            });
+        });
+    }
+
+    function isReceived(ranges, start, end) {
+        return ranges.some(function(r) { return r[0] <= start && end <= r[1]; });
+    }
+
+    function putChunk(uploadId, file, start, end, attempt) {
+        return fetch('/api/uploads/' + uploadId, {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/octet-stream',
+                'Upload-Offset': String(start)
+            },
+            body: file.slice(start, end)
+        }).then(jsonOrError).catch(function(error) {
+            if (attempt >= MAX_RETRIES) {
+                throw error;
+            }
+            // Exponential backoff with jitter, then retry the same chunk
+            const delay = Math.min(30000, 1000 * Math.pow(2, attempt)) * (0.5 + Math.random() / 2);
+            return sleep(delay).then(function() {
+                return putChunk(uploadId, file, start, end, attempt + 1);
+            });
+        });
+    }
+
+    function resumableUpload(file, options) {
+        options = options || {};
+        const parallel = options.parallel || DEFAULT_PARALLEL;
+        const onProgress = options.onProgress || function() {};
+
+        return openSession(file).then(function(session) {
+            const chunkSize = options.chunkSize || session.chunk_size;
+            const pending = [];
+            let loaded = 0;
+
+            for (let start = 0; start < file.size; start += chunkSize) {
+                const end = Math.min(start + chunkSize, file.size);
+                if (isReceived(session.received || [], start, end)) {
+                    loaded += end - start;
+                } else {
+                    pending.push([start, end]);
+                }
+            }
+            onProgress(loaded, file.size);
+
+            function worker() {
+                const chunk = pending.shift();
+                if (!chunk) {
+                    return Promise.resolve();
+                }
+                return putChunk(session.upload_id, file, chunk[0], chunk[1], 0).then(function() {
+                    loaded += chunk[1] - chunk[0];
+                    onProgress(loaded, file.size);
+                    return worker();
+                });
+            }
+
+            const workers = [];
+            for (let i = 0; i < parallel; i++) {
+                workers.push(worker());
+            }
+            return Promise.all(workers).then(function() { return session.upload_id; });
+        });
+    }
+
+    function finalizeUpload(uploadId, formData, file) {
+        return fetch('/api/uploads/' + uploadId + '/finalize', {
+            method: 'POST',
+            body: formData
+        }).then(jsonOrError).then(function(result) {
+            if (file) {
+                window.localStorage.removeItem(storageKey(file));
+            }
+            return result;
+        });
+    }
+
+    window.resumableUpload = resumableUpload;
+    window.finalizeUpload = finalizeUpload;
+})(window);